@@ -0,0 +1,573 @@
+"""
+Columnar in-memory copy of the ascent data used by the statistics.
+
+Every statistic is an aggregation over ascent ⋈ boulder ⋈ crag ⋈ area ⋈
+grade. The join is loaded once per process into NumPy arrays and new rows
+are appended as the scraper adds them, so the statistics are answered
+with bincounts and masks instead of database aggregations.
+
+Appending only sees new ids. When existing rows change (the data revision
+moves) or on the periodic rebuild of the refresh loop, everything is
+loaded again.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from functools import cached_property
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from helper import round_half_up
+from models.ascent import STYLE_FLAGS, Ascent
+from models.boulder import Boulder
+from models.crag import Crag
+from models.data_revision import DataRevision
+from models.grade import Grade
+
+LOAD_BATCH_SIZE = 50_000
+# Weight of the mean rating in Bayesian ratings, in ascents
+BAYESIAN_PRIOR_ASCENTS = 10
+
+
+@dataclass(frozen=True)
+class AscentColumns:
+    # One row per boulder, sorted by id
+    boulder_id: np.ndarray  # int32
+    boulder_grade: np.ndarray  # int16 grade correspondence
+    boulder_crag_id: np.ndarray  # int32
+    boulder_area_id: np.ndarray  # int32
+    boulder_rating: np.ndarray  # float64, NaN when not rated
+
+    # One row per ascent
+    ascent_boulder: np.ndarray  # int32 row in the boulder columns
+    user_id: np.ndarray  # int32
+    log_date: np.ndarray  # int32 days since 1970-01-01
+    grade: np.ndarray  # int16 boulder grade correspondence
+    crag_id: np.ndarray  # int32
+    area_id: np.ndarray  # int32
+    style: np.ndarray  # int32 STYLE_FLAGS bitmask
+    log_grade: np.ndarray  # int16 logged grade correspondence, -1 if unknown
+
+    last_ascent_id: int = 0
+    # DataRevision the rows were loaded at
+    data_revision: int = 0
+    # time.monotonic() of the last full load
+    loaded_at: float = 0
+
+    @property
+    def version(self) -> tuple:
+        """Changes whenever the columns hold different data."""
+        return (
+            self.last_ascent_id,
+            self.boulder_count,
+            self.data_revision,
+            self.loaded_at,
+        )
+
+    @property
+    def boulder_count(self) -> int:
+        return len(self.boulder_id)
+
+    @property
+    def ascent_count(self) -> int:
+        return len(self.ascent_boulder)
+
+    # Masks
+    def boulder_mask(self, area_ids=None, crag_ids=None) -> np.ndarray:
+        """Boolean mask over the boulder rows in the given scope."""
+        mask = np.ones(self.boulder_count, dtype=bool)
+        if area_ids is not None:
+            mask &= np.isin(self.boulder_area_id, area_ids)
+        if crag_ids is not None:
+            mask &= np.isin(self.boulder_crag_id, crag_ids)
+        return mask
+
+    def ascent_mask(
+        self,
+        area_ids=None,
+        crag_ids=None,
+        min_grade: int = None,
+        boulder_ids=None,
+    ) -> np.ndarray:
+        """Boolean mask over the ascent rows in the given scope."""
+        mask = np.ones(self.ascent_count, dtype=bool)
+        if boulder_ids is not None:
+            mask &= np.isin(self.boulder_id[self.ascent_boulder], boulder_ids)
+        if area_ids is not None:
+            mask &= np.isin(self.area_id, area_ids)
+        if crag_ids is not None:
+            mask &= np.isin(self.crag_id, crag_ids)
+        if min_grade is not None:
+            mask &= self.grade >= min_grade
+        return mask
+
+    # Aggregations
+    @cached_property
+    def boulder_ascents(self) -> np.ndarray:
+        """Total ascent count aligned with the boulder rows."""
+        return self.ascents_per_boulder()
+
+    def ascents_per_boulder(self, ascent_mask=None) -> np.ndarray:
+        """Ascent count aligned with the boulder rows."""
+        boulders = self.ascent_boulder
+        if ascent_mask is not None:
+            boulders = boulders[ascent_mask]
+        return np.bincount(boulders, minlength=self.boulder_count)
+
+    @cached_property
+    def boulder_first_log_date(self) -> np.ndarray:
+        """Day of the first ascent aligned with the boulder rows."""
+        first = np.full(self.boulder_count, np.iinfo(np.int32).max, np.int32)
+        np.minimum.at(first, self.ascent_boulder, self.log_date)
+        return first
+
+    def trending_scores(self, window_days: int, today: date):
+        """
+        Ascents of the last window_days days and how they compare to the
+        boulder's long-term rate, aligned with the boulder rows.
+
+        The trend is recent / (expected + 1), expected being the ascents
+        the window would get at the rate logged before it.
+        """
+        start = _epoch_days(today) - window_days
+        recent = self.ascents_per_boulder(self.log_date > start)
+        before = self.boulder_ascents - recent
+        history_days = np.maximum(
+            start - self.boulder_first_log_date.astype(np.int64), window_days
+        )
+        expected = before / history_days * window_days
+        return recent, recent / (expected + 1)
+
+    def bayesian_rating(
+        self, prior_ascents: int = BAYESIAN_PRIOR_ASCENTS
+    ) -> np.ndarray:
+        """
+        Ratings shrunk towards the mean rating, aligned with the boulder rows.
+
+        A boulder rated R with v ascents scores (v * R + m * C) / (v + m)
+        where C is the mean rating and m the prior weight, so a few ascents
+        are not enough to top a ranking. NaN when the boulder is not rated.
+        """
+        ratings = self.boulder_rating
+        rated = ~np.isnan(ratings)
+        if not rated.any():
+            return ratings.copy()
+        mean = ratings[rated].mean()
+        ascents = self.boulder_ascents
+        return (ascents * ratings + prior_ascents * mean) / (
+            ascents + prior_ascents
+        )
+
+    def boulder_values(self, values, boulder_ids, default=0) -> dict:
+        """
+        Map boulder ids to their entry in a boulder-aligned array, in order.
+
+        Boulders added since the columns were loaded (e.g. by a refresh in
+        another process) have no row yet and map to default.
+        """
+        boulder_ids = np.asarray(boulder_ids, dtype=np.int64)
+        rows = np.searchsorted(self.boulder_id, boulder_ids)
+        found = rows < self.boulder_count
+        found[found] = self.boulder_id[rows[found]] == boulder_ids[found]
+
+        result = dict.fromkeys(boulder_ids.tolist(), default)
+        result.update(
+            zip(boulder_ids[found].tolist(), values[rows[found]].tolist())
+        )
+        return result
+
+    def boulders_per_grade(self, boulder_mask=None) -> dict:
+        grades = self.boulder_grade
+        if boulder_mask is not None:
+            grades = grades[boulder_mask]
+        return _count_values(grades)
+
+    def ascents_per_grade(self, ascent_mask=None) -> dict:
+        grades = self.grade
+        if ascent_mask is not None:
+            grades = grades[ascent_mask]
+        return _count_values(grades)
+
+    def boulders_per_crag(self, boulder_mask=None) -> dict:
+        crags = self.boulder_crag_id
+        if boulder_mask is not None:
+            crags = crags[boulder_mask]
+        return _count_values(crags)
+
+    def ascents_per_crag(self, ascent_mask=None) -> dict:
+        crags = self.crag_id
+        if ascent_mask is not None:
+            crags = crags[ascent_mask]
+        return _count_values(crags)
+
+    def style_counts(self, ascent_mask=None) -> dict:
+        """Number of ascents flagged with each style of STYLE_FLAGS."""
+        styles = self.style
+        if ascent_mask is not None:
+            styles = styles[ascent_mask]
+        return {
+            flag: int(np.count_nonzero(styles & (1 << bit)))
+            for bit, flag in enumerate(STYLE_FLAGS)
+        }
+
+    def boulder_style_counts(self) -> np.ndarray:
+        """Ascents flagged with each style, one row per boulder."""
+        return np.stack(
+            [
+                self.ascents_per_boulder((self.style & (1 << bit)) != 0)
+                for bit in range(len(STYLE_FLAGS))
+            ],
+            axis=1,
+        )
+
+    def logged_grade_histograms(self, slots: int) -> np.ndarray:
+        """
+        Logged grade counts, one row per boulder and one column per grade
+        correspondence below slots.
+        """
+        known = (self.log_grade >= 0) & (self.log_grade < slots)
+        cells = self.ascent_boulder[known].astype(np.int64) * slots
+        cells += self.log_grade[known]
+        return np.bincount(
+            cells, minlength=self.boulder_count * slots
+        ).reshape(self.boulder_count, slots)
+
+    def style_mask(self, styles) -> np.ndarray:
+        """Boolean mask over the ascent rows flagged with all the styles."""
+        required = sum(1 << STYLE_FLAGS.index(style) for style in styles)
+        return (self.style & required) == required
+
+    def ascents_per_area(self, ascent_mask=None) -> dict:
+        areas = self.area_id
+        if ascent_mask is not None:
+            areas = areas[ascent_mask]
+        return _count_values(areas)
+
+    def area_grade_matrix(self, area_ids, slots: int):
+        """
+        Boulders per area and grade in one grouping of the boulder rows.
+
+        Returns:
+            An (areas, slots) matrix of boulder counts per grade
+            correspondence and the ascents of each area, rows in area_ids
+            order
+        """
+        area_ids = np.asarray(area_ids, dtype=np.int64)
+        order = np.argsort(area_ids)
+        in_areas = np.isin(self.boulder_area_id, area_ids)
+        rows = order[
+            np.searchsorted(area_ids[order], self.boulder_area_id[in_areas])
+        ]
+        cells = rows * slots + self.boulder_grade[in_areas]
+        boulders = np.bincount(
+            cells, minlength=len(area_ids) * slots
+        ).reshape(len(area_ids), slots)
+        ascents = np.bincount(
+            rows,
+            weights=self.boulder_ascents[in_areas],
+            minlength=len(area_ids),
+        )
+        return boulders, ascents.astype(np.int64)
+
+    def boulders_per_rating(self, bucket: float) -> dict:
+        """Rated boulder counts keyed by the lower bound of their bucket."""
+        ratings = self.boulder_rating[~np.isnan(self.boulder_rating)]
+        return _count_values(np.floor(ratings / bucket) * bucket)
+
+    def average_grade(self, boulder_mask=None) -> int | None:
+        """Rounded average grade correspondence of the boulders."""
+        grades = self.boulder_grade
+        if boulder_mask is not None:
+            grades = grades[boulder_mask]
+        if not len(grades):
+            return None
+        return round_half_up(grades.mean())
+
+    def ascents_per_grade_and_month(self) -> dict:
+        """Ascent counts keyed by (grade correspondence, month)."""
+        months = self._log_dates().astype("datetime64[M]").astype(np.int64)
+        return _count_pairs(self.grade, months % 12 + 1)
+
+    def ascents_per_grade_and_year(self) -> dict:
+        """Ascent counts keyed by (grade correspondence, year)."""
+        years = self._log_dates().astype("datetime64[Y]").astype(np.int64)
+        return _count_pairs(self.grade, years + 1970)
+
+    # Rankings
+    def top_boulders(self, scores, candidates, limit: int = None) -> list:
+        """
+        Ids of the candidate boulders with the highest scores.
+
+        Args:
+            scores: Score aligned with the boulder rows (NaN ranks last)
+            candidates: Boolean mask over the boulder rows
+            limit: Number of boulders to return, all of them if None
+
+        Returns:
+            Boulder ids ordered by score descending, then id
+        """
+        rows = np.flatnonzero(candidates)
+        keys = _descending(scores[rows])
+        if limit is not None and len(rows) > limit:
+            # Partial selection, ties on the cut go to the lowest ids
+            threshold = np.partition(keys, limit - 1)[limit - 1]
+            keep = np.flatnonzero(keys < threshold)
+            ties = np.flatnonzero(keys == threshold)[: limit - len(keep)]
+            keep = np.concatenate([keep, ties])
+            rows, keys = rows[keep], keys[keep]
+        order = np.lexsort((self.boulder_id[rows], keys))
+        return self.boulder_id[rows[order]].tolist()
+
+    def top_boulders_per_grade(
+        self, scores, candidates, limit: int = None
+    ) -> dict:
+        """Same as top_boulders(), for each grade correspondence."""
+        rows = np.flatnonzero(candidates)
+        grades = self.boulder_grade[rows]
+        order = np.lexsort(
+            (self.boulder_id[rows], _descending(scores[rows]), grades)
+        )
+        rows, grades = rows[order], grades[order]
+
+        result = {}
+        boundaries = np.flatnonzero(np.diff(grades)) + 1
+        for group in np.split(rows, boundaries):
+            if not len(group):
+                continue
+            grade = int(self.boulder_grade[group[0]])
+            result[grade] = self.boulder_id[group[:limit]].tolist()
+        return result
+
+    def _log_dates(self) -> np.ndarray:
+        return self.log_date.astype("datetime64[D]")
+
+
+def _epoch_days(day: date) -> int:
+    return (day - date(1970, 1, 1)).days
+
+
+def _descending(scores) -> np.ndarray:
+    """Sort keys ranking high scores first and NaN last."""
+    keys = -np.asarray(scores, dtype=np.float64)
+    keys[np.isnan(keys)] = np.inf
+    return keys
+
+
+def _count_values(values) -> dict:
+    unique, counts = np.unique(values, return_counts=True)
+    return dict(zip(unique.tolist(), counts.tolist()))
+
+
+def _count_pairs(first, second) -> dict:
+    pairs, counts = np.unique(
+        np.stack([first.astype(np.int64), second]), axis=1, return_counts=True
+    )
+    return {
+        (int(a), int(b)): int(count)
+        for a, b, count in zip(pairs[0], pairs[1], counts)
+    }
+
+
+def _load_boulders(db: Session, after_id: int = 0) -> dict:
+    result = db.execute(
+        select(
+            Boulder.id,
+            Grade.correspondence,
+            Boulder.crag_id,
+            Crag.area_id,
+            Boulder.rating,
+        )
+        .join(Boulder.grade)
+        .join(Boulder.crag)
+        .where(Boulder.id > after_id)
+        .order_by(Boulder.id)
+    ).all()
+
+    ids, grades, crags, areas, ratings = zip(*result) if result else ([],) * 5
+    return {
+        "boulder_id": np.array(ids, dtype=np.int32),
+        "boulder_grade": np.array(grades, dtype=np.int16),
+        "boulder_crag_id": np.array(crags, dtype=np.int32),
+        "boulder_area_id": np.array(areas, dtype=np.int32),
+        "boulder_rating": np.array(
+            [np.nan if rating is None else rating for rating in ratings],
+            dtype=np.float64,
+        ),
+    }
+
+
+def _load_ascents(db: Session, after_id: int = 0) -> dict:
+    result = db.execute(
+        select(
+            Ascent.id,
+            Ascent.boulder_id,
+            Ascent.user_id,
+            Ascent.log_date,
+            Ascent.style_mask,
+            Ascent.log_grade_id,
+        )
+        .where(Ascent.id > after_id)
+        .order_by(Ascent.id)
+        .execution_options(yield_per=LOAD_BATCH_SIZE)
+    )
+
+    chunks = []
+    for partition in result.partitions():
+        ids, boulders, users, log_dates, styles, log_grades = zip(*partition)
+        chunks.append(
+            (
+                np.array(ids, dtype=np.int64),
+                np.array(boulders, dtype=np.int32),
+                np.array(users, dtype=np.int32),
+                np.array(log_dates, dtype="datetime64[D]").astype(np.int32),
+                np.array(styles, dtype=np.int32),
+                np.array(
+                    [-1 if grade is None else grade for grade in log_grades],
+                    dtype=np.int64,
+                ),
+            )
+        )
+
+    if not chunks:
+        return None
+    ids, boulders, users, log_dates, styles, log_grade_ids = (
+        np.concatenate(column) for column in zip(*chunks)
+    )
+    return {
+        "last_ascent_id": int(ids[-1]),
+        "boulder_id": boulders,
+        "user_id": users,
+        "log_date": log_dates,
+        "style": styles,
+        "log_grade": _grade_correspondences(db, log_grade_ids),
+    }
+
+
+def _grade_correspondences(db: Session, grade_ids) -> np.ndarray:
+    """Map grade ids to their correspondence, -1 for unknown ids."""
+    grades = db.execute(select(Grade.id, Grade.correspondence)).all()
+    size = max([grade_id for grade_id, _ in grades] + [int(grade_ids.max())])
+    lookup = np.full(size + 2, -1, dtype=np.int16)
+    for grade_id, correspondence in grades:
+        lookup[grade_id] = correspondence
+    # Unknown ids (-1) read the last slot, which stays -1
+    return lookup[grade_ids]
+
+
+def _build_columns(
+    db: Session, previous: AscentColumns = None
+) -> AscentColumns:
+    """
+    Load the rows added since previous, everything if None or if existing
+    rows changed since previous was loaded.
+    """
+    data_revision = DataRevision.get_revision(db)
+    if previous is not None and previous.data_revision != data_revision:
+        previous = None
+
+    last_ascent_id = previous.last_ascent_id if previous else 0
+    last_boulder_id = (
+        int(previous.boulder_id[-1])
+        if previous is not None and previous.boulder_count
+        else 0
+    )
+
+    # Ascents first: boulders loaded afterwards cover all their boulder_ids
+    ascents = _load_ascents(db, after_id=last_ascent_id)
+    boulders = _load_boulders(db, after_id=last_boulder_id)
+
+    if previous is not None:
+        if ascents is None and not len(boulders["boulder_id"]):
+            return previous
+        boulders = {
+            name: np.concatenate([getattr(previous, name), values])
+            for name, values in boulders.items()
+        }
+
+    if ascents is None:
+        ascents = {
+            "last_ascent_id": last_ascent_id,
+            "boulder_id": np.empty(0, dtype=np.int32),
+            "user_id": np.empty(0, dtype=np.int32),
+            "log_date": np.empty(0, dtype=np.int32),
+            "style": np.empty(0, dtype=np.int32),
+            "log_grade": np.empty(0, dtype=np.int16),
+        }
+
+    # Map each ascent to its boulder row, dropping ascents of unknown boulders
+    rows = np.searchsorted(boulders["boulder_id"], ascents["boulder_id"])
+    rows = np.minimum(rows, max(len(boulders["boulder_id"]) - 1, 0))
+    known = (
+        boulders["boulder_id"][rows] == ascents["boulder_id"]
+        if len(boulders["boulder_id"])
+        else np.zeros(len(rows), dtype=bool)
+    )
+    rows = rows[known].astype(np.int32)
+
+    new_ascents = {
+        "ascent_boulder": rows,
+        "user_id": ascents["user_id"][known],
+        "log_date": ascents["log_date"][known],
+        "grade": boulders["boulder_grade"][rows],
+        "crag_id": boulders["boulder_crag_id"][rows],
+        "area_id": boulders["boulder_area_id"][rows],
+        "style": ascents["style"][known],
+        "log_grade": ascents["log_grade"][known],
+    }
+    if previous is not None:
+        new_ascents = {
+            name: np.concatenate([getattr(previous, name), values])
+            for name, values in new_ascents.items()
+        }
+
+    return AscentColumns(
+        **boulders,
+        **new_ascents,
+        last_ascent_id=ascents["last_ascent_id"],
+        data_revision=data_revision,
+        loaded_at=previous.loaded_at if previous else time.monotonic(),
+    )
+
+
+class AscentAnalytics:
+    """Keeps this process' AscentColumns in sync with the database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns = None
+
+    def get_columns(self, db: Session) -> AscentColumns:
+        """Current columns, loading them on first use."""
+        columns = self._columns
+        if columns is None:
+            with self._lock:
+                if self._columns is None:
+                    self._columns = _build_columns(db)
+                columns = self._columns
+        return columns
+
+    def refresh(self, db: Session) -> AscentColumns:
+        """Append the boulders and ascents added since the last refresh."""
+        with self._lock:
+            self._columns = _build_columns(db, previous=self._columns)
+            return self._columns
+
+    def rebuild(self, db: Session) -> AscentColumns:
+        """
+        Load everything again, catching up with changes to existing rows
+        made without bumping the data revision.
+        """
+        with self._lock:
+            self._columns = _build_columns(db)
+            return self._columns
+
+
+ascent_analytics = AscentAnalytics()
+
+
+def get_ascent_columns(db: Session) -> AscentColumns:
+    return ascent_analytics.get_columns(db)
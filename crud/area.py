@@ -1,17 +1,36 @@
-from sqlalchemy import and_, desc, func, select
-from sqlalchemy.orm import Session, joinedload, selectinload, contains_eager
+from datetime import date
+from typing import List
+
+import numpy as np
+from sqlalchemy import desc, select
+from sqlalchemy.orm import Session, contains_eager
+from analytics import get_ascent_columns
+from crud.scope_stats import get_scope_stats
+from database import get_keyset_page
+from helper import round_half_up
 from models.area import Area
 from models.boulder import Boulder
 from models.crag import Crag
 from models.grade import Grade
-from models.ascent import Ascent
-from schemas.area import AreaStats
-from schemas.boulder import BoulderWithAscentCount
-from schemas.grade import GradeDistribution
+from schemas.area import (
+    AreaComparison,
+    AreaComparisonRow,
+    AreaDetailWithCragCounts,
+    AreaPage,
+    AreaStats,
+)
+from schemas.crag import CragWithCounts
 
+AREA_PAGE_SIZE = 100
 
-def get_all_areas(db: Session, skip: int = 0, limit: int = None):
-    return db.scalars(select(Area).offset(skip).limit(limit))
+
+def get_all_areas(
+    db: Session, cursor: str = None, limit: int = AREA_PAGE_SIZE
+):
+    areas, next_cursor = get_keyset_page(
+        db, select(Area), (Area.id,), cursor, limit
+    )
+    return AreaPage(areas=areas, next_cursor=next_cursor)
 
 
 def get_area(db: Session, slug: str):
@@ -19,198 +38,128 @@ def get_area(db: Session, slug: str):
         select(Area)
         .outerjoin(Area.crags)
         .where(Area.slug == slug)
-        .where(Crag.boulders.any())
+        .where(Crag.boulders_count > 0)
         .options(contains_eager(Area.crags))
     )
 
 
 def get_area_with_counts_for_crags(db: Session, slug: str):
-    boulder_count_subq = (
-        select(func.count(Boulder.id))
-        .where(Boulder.crag_id == Crag.id)
-        .correlate(Crag)
-        .scalar_subquery()
-    ).label("boulders")
-
-    ascent_count_subq = (
-        select(func.count(Ascent.user_id))
-        .select_from(Ascent)
-        .join(Boulder, Boulder.id == Ascent.boulder_id)
-        .where(Boulder.crag_id == Crag.id)
-        .correlate(Crag)
-        .scalar_subquery()
-    ).label("ascents")
-
-    results = (
-        db.execute(
-            select(Area, Crag, boulder_count_subq, ascent_count_subq)
-            .outerjoin(Area.crags)
-            .where(Area.slug == slug)
-            .where(Crag.boulders.any())
-            .options(contains_eager(Area.crags))
-            .order_by(desc(ascent_count_subq))
-        )
-        .unique()
-        .all()
-    )
-
-    if not results:
+    area = db.scalar(select(Area).where(Area.slug == slug))
+    if not area:
         return None
 
-    area = results[0][0]
+    # Only crags with boulders, most climbed first
+    crags = db.scalars(
+        select(Crag)
+        .where(Crag.area_id == area.id, Crag.boulders_count > 0)
+        .order_by(desc(Crag.ascents_count), Crag.id)
+    ).all()
+    if not crags:
+        return None
 
-    # Create a mapping of crag_id to counts
-    crag_counts = {}
-    for row in results:
-        crag = row[1]
-        crag_counts[crag.id] = {
-            "boulder_count": row[2],
-            "ascent_count": row[3],
+    return AreaDetailWithCragCounts.model_validate(
+        {
+            **area.__dict__,
+            "crags": [
+                CragWithCounts.model_validate(
+                    {
+                        **crag.__dict__,
+                        "boulder_count": crag.boulders_count,
+                        "ascent_count": crag.ascents_count,
+                    }
+                )
+                for crag in crags
+            ],
         }
-
-    # Add counts to the already-loaded crags
-    for crag in area.crags:
-        if crag.id in crag_counts:
-            crag.boulder_count = crag_counts[crag.id]["boulder_count"]
-            crag.ascent_count = crag_counts[crag.id]["ascent_count"]
-
-    return area
+    )
 
 
-def get_boulders_from_area(db: Session, slug: str):
-    return db.scalars(
+def get_boulders_from_area(db: Session, slug: str, yield_per: int = None):
+    query = (
         select(Boulder)
         .join(Boulder.crag)
-        .where(Crag.area.has(Area.slug == slug))
+        .join(Crag.area)
+        .where(Area.slug == slug)
     )
+    if yield_per:
+        # Server-side cursor, fetched yield_per rows at a time
+        query = query.execution_options(yield_per=yield_per)
+    return db.scalars(query)
 
 
-def get_area_stats(db: Session, area_slug: str):
+def get_area_stats(
+    db: Session, area_slug: str, date_from: date = None, date_to: date = None
+):
+    """
+    Statistics of the area. With a date range, the total ascents and the
+    most climbed boulders only count the ascents logged in that range.
+    """
+    stats = get_scope_stats(db, "area", area_slug, date_from, date_to)
+    if stats is None:
+        return None
+    # None for an area without boulders
     area = get_area_with_counts_for_crags(db, area_slug)
-    number_of_boulder = get_area_number_of_boulders(db, area_slug)
-    grade_distribution = get_area_grade_distribution(db, area_slug)
-    most_climbed_boulders = get_area_most_climbed_boulders(db, area_slug)
-    average_grade = get_area_average_grade(db, area_slug)
-    ascents = get_area_total_ascents(db, area_slug)
-    best_rated_boulders = get_area_best_rated(db, area_slug)
-    return AreaStats(
-        area=area,
-        number_of_boulders=number_of_boulder,
-        grade_distribution=grade_distribution,
-        most_climbed_boulders=most_climbed_boulders,
-        average_grade=average_grade,
-        ascents=ascents,
-        best_rated_boulders=best_rated_boulders,
+    if area is None:
+        return None
+    return AreaStats(area=area, **stats)
+
+
+def get_area_comparison(db: Session, slugs: List[str]):
+    """
+    Boulder and ascent totals, average grade and grade distribution of
+    several areas, side by side. Unknown slugs are skipped.
+    """
+    areas_by_slug = {
+        area.slug: area
+        for area in db.scalars(select(Area).where(Area.slug.in_(slugs)))
+    }
+    areas = list(
+        {slug: areas_by_slug[slug] for slug in slugs if slug in areas_by_slug}
+        .values()
     )
+    if not areas:
+        return None
 
-
-def get_area_name_from_slug(db: Session, area_slug: str):
-    return db.scalar(select(Area.name).where(Area.slug == area_slug))
-
-
-def get_area_number_of_boulders(db: Session, area_slug: str):
-    return db.scalar(
-        select(func.count(Boulder.id))
-        .join(Boulder.crag)
-        .where(Crag.area.has(Area.slug == area_slug))
+    grades = Grade.get_all_by_correspondence(db)
+    slots = max(grades, default=0) + 1
+    columns = get_ascent_columns(db)
+    boulders, ascents = columns.area_grade_matrix(
+        [area.id for area in areas], slots
     )
 
-
-def get_area_grade_distribution(db: Session, area_slug: str):
-    result = db.execute(
-        select(Grade, func.count(Boulder.id))
-        .select_from(Grade)
-        .outerjoin(Boulder, Boulder.grade_id == Grade.id)
-        .outerjoin(Crag, Boulder.crag_id == Crag.id)
-        .outerjoin(Area, Crag.area_id == Area.id)
-        .where(and_(Grade.correspondence >= 12, Area.slug == area_slug))
-        .group_by(Grade.id)
-    ).all()
-
-    return [
-        GradeDistribution(grade=grade, boulders=boulders)
-        for grade, boulders in result
+    # Same grades as the area stats, where any of the areas has a boulder
+    shown = [
+        correspondence
+        for correspondence in sorted(grades)
+        if correspondence >= 12 and boulders[:, correspondence].any()
     ]
+    boulder_counts = boulders.sum(axis=1)
+    average_grades = round_half_up(
+        boulders @ np.arange(slots) / np.maximum(boulder_counts, 1)
+    )
 
-
-def get_area_most_climbed_boulders(
-    db: Session, area_slug: str, limit: int = 20
-):
-    result = (
-        db.execute(
-            select(
-                Boulder,
-                func.count(Ascent.user_id).label("ascents"),
-            )
-            .join(Boulder.crag)
-            .join(Boulder.ascents)
-            .where(Crag.area.has(Area.slug == area_slug))
-            .options(
-                selectinload(Boulder.grade),
-                selectinload(Boulder.crag).selectinload(Crag.area),
+    return AreaComparison(
+        grades=[grades[correspondence] for correspondence in shown],
+        areas=[
+            AreaComparisonRow(
+                area=area,
+                number_of_boulders=int(boulder_counts[row]),
+                ascents=int(ascents[row]),
+                average_grade=(
+                    grades.get(int(average_grades[row]))
+                    if boulder_counts[row]
+                    else None
+                ),
+                boulders_per_grade=boulders[row, shown].tolist(),
             )
-            .group_by(Boulder)
-            .order_by(desc("ascents"))
-            .limit(limit)
-        )
-        .unique()
-        .all()
+            for row, area in enumerate(areas)
+        ],
     )
 
-    return [
-        BoulderWithAscentCount.from_query_result(boulder, ascents)
-        for boulder, ascents in result
-    ]
-
-
-def get_area_average_grade(db: Session, area_slug: str):
-    subquery = (
-        select(func.avg(Grade.correspondence))
-        .select_from(Boulder)
-        .join(Boulder.grade)
-        .join(Boulder.crag)
-        .where(Crag.area.has(Area.slug == area_slug))
-    ).scalar_subquery()
-
-    result = db.scalar(
-        select(Grade).where(Grade.correspondence == func.round(subquery))
-    )
-
-    if not result:
-        return None
-    return result
-
-
-def get_area_total_ascents(db: Session, area_slug: str):
-    return db.scalar(
-        select(func.count(Ascent.user_id))
-        .join(Boulder, Boulder.id == Ascent.boulder_id)
-        .join(Boulder.crag)
-        .where(Crag.area.has(Area.slug == area_slug))
-    )
 
+def get_area_name_from_slug(db: Session, area_slug: str):
+    return db.scalar(select(Area.name).where(Area.slug == area_slug))
 
-def get_area_best_rated(db: Session, area_slug: str):
-    result = (
-        db.execute(
-            select(Boulder, func.count(Ascent.user_id).label("ascents"))
-            .join(Ascent, Boulder.id == Ascent.boulder_id)
-            .join(Boulder.crag)
-            .where(Crag.area.has(Area.slug == area_slug))
-            .options(
-                selectinload(Boulder.grade),
-                selectinload(Boulder.crag).selectinload(Crag.area),
-            )
-            .group_by(Boulder.id)
-            .having(func.count(Ascent.user_id) >= 15)
-            .order_by(desc(Boulder.rating))
-            .limit(20)
-        )
-        .unique()
-        .all()
-    )
 
-    return [
-        BoulderWithAscentCount.from_query_result(boulder, ascents)
-        for boulder, ascents in result
-    ]
+def get_area_ids_from_slug(db: Session, area_slug: str):
+    return db.scalars(select(Area.id).where(Area.slug == area_slug)).all()
@@ -1,96 +1,143 @@
-from sqlalchemy import select, func, cast, Float, Numeric, case
-from sqlalchemy.orm import Session, joinedload
-from database import MONTH_LIST
+from datetime import date
+from typing import List
+
+import numpy as np
+from sqlalchemy import select, desc, Float
+from sqlalchemy.orm import Session, joinedload, selectinload
+from analytics import get_ascent_columns
+from crud.rollup import get_ascents_per_period_in_range
+from crud.seasonality import get_season_histograms
+from database import MONTH_LIST, get_keyset_page
+from helper import get_percentage
 from models.boulder import Boulder
 from models.ascent import Ascent
+from models.boulder_style_profile import BoulderStyleProfile
 from models.crag import Crag
-from schemas.boulder import BoulderWithFullDetail
-from schemas.ascent import AscentsPerMonthWithGeneral
+from schemas.boulder import (
+    BoulderAscentPage,
+    BoulderPage,
+    BoulderWithAscentCount,
+    BoulderWithFullDetail,
+)
+from schemas.ascent import AscentsPerMonthWithGeneral, StyleProfile
+
+ASCENT_PAGE_SIZE = 50
+BOULDER_PAGE_SIZE = 20
+# Refresh step storing Boulder.bayesian_rating
+BAYESIAN_RATING = "bayesian_rating"
+
+
+def get_all_boulders(
+    db: Session, cursor: str = None, limit: int = BOULDER_PAGE_SIZE
+):
+    boulders, next_cursor = get_keyset_page(
+        db, select(Boulder), (Boulder.id,), cursor, limit
+    )
+    return BoulderPage(boulders=boulders, next_cursor=next_cursor)
+
+
+def get_boulders_by_ids(db: Session, boulder_ids: List[int]):
+    """Fetch boulders with their grade, crag and area, in the given order."""
+    if not boulder_ids:
+        return []
+
+    boulders = db.scalars(
+        select(Boulder)
+        .where(Boulder.id.in_(boulder_ids))
+        .options(
+            selectinload(Boulder.grade),
+            selectinload(Boulder.crag).selectinload(Crag.area),
+        )
+    ).all()
+
+    boulders_by_id = {boulder.id: boulder for boulder in boulders}
+    return [
+        boulders_by_id[boulder_id]
+        for boulder_id in boulder_ids
+        if boulder_id in boulders_by_id
+    ]
 
 
-def get_all_boulders(db: Session, skip: int = 0, limit: int = 20):
-    return db.scalars(select(Boulder).offset(skip).limit(limit)).all()
+def get_boulders_batch(
+    db: Session, boulder_ids: List[int] = None, slugs: List[str] = None
+):
+    """
+    BoulderWithAscentCount of the boulders requested by id or by slug, in
+    request order. Unknown boulders are skipped.
+    """
+    if not boulder_ids and slugs:
+        ids_by_slug = dict(
+            db.execute(
+                select(Boulder.slug, Boulder.id).where(Boulder.slug.in_(slugs))
+            ).all()
+        )
+        boulder_ids = [
+            ids_by_slug[slug] for slug in slugs if slug in ids_by_slug
+        ]
+    boulders = get_boulders_by_ids(db, boulder_ids)
 
+    columns = get_ascent_columns(db)
+    ascents = columns.boulder_values(
+        columns.boulder_ascents, [boulder.id for boulder in boulders]
+    )
 
-def get_boulder(db: Session, slug: str):
+    return [
+        BoulderWithAscentCount.from_query_result(boulder, ascents[boulder.id])
+        for boulder in boulders
+    ]
+
+
+def get_best_rated_boulder_ids(
+    db: Session,
+    area_ids=None,
+    crag_ids=None,
+    grade_id: int = None,
+    limit: int = 20,
+):
+    """Ids of the boulders with the highest Bayesian rating, best first."""
+    query = select(Boulder.id).where(Boulder.bayesian_rating.isnot(None))
+    if grade_id is not None:
+        query = query.where(Boulder.grade_id == grade_id)
+    if crag_ids is not None:
+        query = query.where(Boulder.crag_id.in_(crag_ids))
+    if area_ids is not None:
+        query = query.join(Boulder.crag).where(Crag.area_id.in_(area_ids))
+    return db.scalars(
+        query.order_by(desc(Boulder.bayesian_rating), Boulder.id).limit(limit)
+    ).all()
+
+
+def get_boulders_with_ascent_count(db: Session, ascents: dict):
+    """BoulderWithAscentCount for each {boulder_id: ascents}, in order."""
+    return [
+        BoulderWithAscentCount.from_query_result(boulder, ascents[boulder.id])
+        for boulder in get_boulders_by_ids(db, list(ascents))
+    ]
+
+
+def get_boulder(
+    db: Session, slug: str, date_from: date = None, date_to: date = None
+):
     boulder = db.scalar(
         select(Boulder)
         .where(Boulder.slug == slug)
         .options(
             joinedload(Boulder.grade),
-            joinedload(Boulder.crag),
             joinedload(Boulder.crag).joinedload(Crag.area),
-            joinedload(Boulder.ascents),
-            joinedload(Boulder.ascents).joinedload(Ascent.user),
         )
     )
+    if boulder is None:
+        return None
 
-    # Total ascents for percentage calculation
-    boulder_total_repeats = (
-        select(func.count(Ascent.user_id))
-        .where(Ascent.boulder_id == boulder.id)
-        .scalar_subquery()
-    )
-    total_ascents = select(func.count(Ascent.boulder_id)).scalar_subquery()
-
-    # Monthly ascent distribution
-    aggregated_ascents = (
-        db.execute(
-            select(
-                func.extract("month", Ascent.log_date).label("month"),
-                func.round(
-                    (
-                        case(
-                            (
-                                boulder_total_repeats == 0,
-                                0,
-                            ),  # Handling division by 0
-                            else_=(
-                                func.count(
-                                    case(
-                                        (
-                                            Ascent.boulder_id == boulder.id,
-                                            1,
-                                        )
-                                    )
-                                )
-                                * 100
-                                / cast(boulder_total_repeats, Numeric)
-                            ),
-                        )
-                    ),
-                ).label("boulder"),
-                func.round(
-                    (
-                        func.count(Ascent.user_id)
-                        * 100
-                        / cast(total_ascents, Numeric)
-                    ),
-                    1,
-                ).label("general"),
-            )
-            .group_by("month")
-            .order_by("month")
+    if date_from or date_to:
+        aggregated_ascents = get_boulder_ascents_per_month_in_range(
+            db, boulder.id, date_from, date_to
         )
-        .mappings()
-        .all()
-    )
-
-    # Convert to dict for easy lookup
-    ascents_by_month = {int(row["month"]): row for row in aggregated_ascents}
+    else:
+        aggregated_ascents = get_boulder_ascents_per_month(db, boulder.id)
 
-    aggregated_ascents = [
-        AscentsPerMonthWithGeneral(
-            month=MONTH_LIST[month],
-            boulder=float(
-                ascents_by_month.get(month + 1, {}).get("boulder", 0)
-            ),
-            general=float(
-                ascents_by_month.get(month + 1, {}).get("general", 0)
-            ),
-        )
-        for month in range(12)
-    ]
+    profile = db.get(BoulderStyleProfile, boulder.id)
+    first_page = get_boulder_ascent_page(db, boulder.id)
 
     return BoulderWithFullDetail(
         id=boulder.id,
@@ -102,6 +149,98 @@ def get_boulder(db: Session, slug: str):
         crag=boulder.crag,
         area=boulder.crag.area,
         grade=boulder.grade,
-        ascents=boulder.ascents,
+        ascent_count=boulder.ascents_count,
+        ascents=first_page.ascents,
+        ascents_next_cursor=first_page.next_cursor,
         aggregated_ascents=aggregated_ascents,
+        style_profile=(
+            StyleProfile.from_vector(profile.ascents, profile.vector)
+            if profile
+            else None
+        ),
+    )
+
+
+def get_boulder_ascents(
+    db: Session, slug: str, cursor: str = None, limit: int = ASCENT_PAGE_SIZE
+):
+    boulder_id = db.scalar(select(Boulder.id).where(Boulder.slug == slug))
+    if boulder_id is None:
+        return None
+    return get_boulder_ascent_page(db, boulder_id, cursor, limit)
+
+
+def get_boulder_ascent_page(
+    db: Session,
+    boulder_id: int,
+    cursor: str = None,
+    limit: int = ASCENT_PAGE_SIZE,
+):
+    """
+    One page of the ascents of a boulder, newest first.
+
+    Pages are keyed on (log_date, id) so reading a page is an index range
+    scan whatever its depth. Raises ValueError on a malformed cursor.
+    """
+    ascents, next_cursor = get_keyset_page(
+        db,
+        select(Ascent)
+        .where(Ascent.boulder_id == boulder_id)
+        .options(selectinload(Ascent.user), selectinload(Ascent.log_grade)),
+        (Ascent.log_date, Ascent.id),
+        cursor,
+        limit,
+        descending=True,
     )
+    return BoulderAscentPage(ascents=ascents, next_cursor=next_cursor)
+
+
+def get_boulder_ascents_per_month(db: Session, boulder_id: int):
+    """Monthly distribution of the ascents of a boulder and of all boulders."""
+    no_ascents = np.zeros(12, dtype=np.int32)
+    boulder_ascents = get_season_histograms(db, "boulder", [boulder_id]).get(
+        boulder_id, no_ascents
+    )
+    general_ascents = get_season_histograms(db, "global", [0]).get(
+        0, no_ascents
+    )
+    boulder_total = int(boulder_ascents.sum())
+    general_total = int(general_ascents.sum())
+
+    return [
+        AscentsPerMonthWithGeneral(
+            month=MONTH_LIST[month],
+            boulder=get_percentage(
+                int(boulder_ascents[month]), boulder_total, ndigits=0
+            ),
+            general=get_percentage(int(general_ascents[month]), general_total),
+        )
+        for month in range(12)
+    ]
+
+
+def get_boulder_ascents_per_month_in_range(
+    db: Session, boulder_id: int, date_from: date = None, date_to: date = None
+):
+    """Monthly distribution of the ascents logged in the date range."""
+    boulder_ascents = get_ascents_per_period_in_range(
+        db, "month", date_from, date_to, boulder_ids=[boulder_id]
+    )
+    general_ascents = get_ascents_per_period_in_range(
+        db, "month", date_from, date_to
+    )
+    boulder_total = sum(boulder_ascents.values())
+    general_total = sum(general_ascents.values())
+
+    return [
+        AscentsPerMonthWithGeneral(
+            month=MONTH_LIST[month],
+            boulder=get_percentage(
+                boulder_ascents.get(month + 1, 0), boulder_total, ndigits=0
+            ),
+            general=get_percentage(
+                general_ascents.get(month + 1, 0), general_total
+            ),
+        )
+        for month in range(12)
+    ]
@@ -0,0 +1,284 @@
+"""
+Climber statistics of the scopes.
+
+Distinct climber counts come from the HyperLogLog sketches of
+climber_sketch, kept per scope and month and folded in incrementally from
+the new ascents like the rollups. A count over any months and any number
+of scopes merges the matching sketches. Top climbers come from the
+user_scope_rollup table.
+"""
+
+from datetime import date
+
+import numpy as np
+from sqlalchemy import delete, desc, func, select, tuple_
+from sqlalchemy.orm import Session
+
+import hyperloglog
+from crud.area import get_area_ids_from_slug
+from crud.crag import get_crag_ids_from_slug
+from crud.rollup import get_new_ascent_range
+from database import upsert
+from models.ascent import Ascent
+from models.boulder import Boulder
+from models.climber_sketch import ClimberSketch
+from models.crag import Crag
+from models.grade import Grade
+from models.refresh_state import RefreshState
+from models.user import User
+from models.user_scope_rollup import UserScopeRollup
+from schemas.user import DistinctClimbers, ScopeClimber
+
+CLIMBER_SKETCHES = "climber_sketch"
+SKETCH_SCOPES = ("global", "area", "crag", "boulder")
+SKETCH_BATCH_SIZE = 5_000
+LOAD_BATCH_SIZE = 50_000
+
+# Group keys pack the scope id above the month index, counted from January
+# of year 1 so that no month is negative
+_MONTH_BITS = 20
+_FIRST_MONTH = np.datetime64("0001-01", "M").astype(np.int64)
+
+
+def update_climber_sketches(db: Session, data_version: str):
+    """Merge the climbers of the ascents added since the last run."""
+    state = RefreshState.get_for_update(db, CLIMBER_SKETCHES)
+    last_ascent_id, max_ascent_id = get_new_ascent_range(db, state)
+    if max_ascent_id <= last_ascent_id:
+        return
+
+    ascents = _load_ascents(db, last_ascent_id, max_ascent_id)
+    if ascents is not None:
+        hashes = hyperloglog.hash_values(ascents["user_id"])
+        for scope in SKETCH_SCOPES:
+            scope_ids = (
+                np.zeros_like(ascents["month"])
+                if scope == "global"
+                else ascents[f"{scope}_id"]
+            )
+            keys = (scope_ids << _MONTH_BITS) | (
+                ascents["month"] - _FIRST_MONTH
+            )
+            _merge_sketches(db, scope, keys, hashes)
+
+    state.last_ascent_id = max_ascent_id
+
+
+def rebuild_climber_sketches(db: Session):
+    """Rebuild the sketches from scratch (e.g. after ascents moved)."""
+    state = RefreshState.get_for_update(db, CLIMBER_SKETCHES)
+    db.execute(delete(ClimberSketch))
+    state.last_ascent_id = None
+    update_climber_sketches(db, data_version=None)
+    db.commit()
+
+
+def _load_ascents(db: Session, after_id: int, until_id: int):
+    result = db.execute(
+        select(
+            Ascent.user_id,
+            Ascent.log_date,
+            Ascent.boulder_id,
+            Boulder.crag_id,
+            Crag.area_id,
+        )
+        .join(Boulder, Boulder.id == Ascent.boulder_id)
+        .join(Crag, Crag.id == Boulder.crag_id)
+        .where(Ascent.id > after_id, Ascent.id <= until_id)
+        .execution_options(yield_per=LOAD_BATCH_SIZE)
+    )
+
+    chunks = []
+    for partition in result.partitions():
+        users, log_dates, boulders, crags, areas = zip(*partition)
+        chunks.append(
+            (
+                np.array(users, dtype=np.int64),
+                np.array(log_dates, dtype="datetime64[M]").astype(np.int64),
+                np.array(boulders, dtype=np.int64),
+                np.array(crags, dtype=np.int64),
+                np.array(areas, dtype=np.int64),
+            )
+        )
+
+    if not chunks:
+        return None
+    names = ("user_id", "month", "boulder_id", "crag_id", "area_id")
+    return {
+        name: np.concatenate(column)
+        for name, column in zip(names, zip(*chunks))
+    }
+
+
+def _merge_sketches(db: Session, scope: str, keys, hashes):
+    """Merge the new registers of each key into the stored sketches."""
+    batch = []
+    for key, registers in hyperloglog.sketch_groups(keys, hashes):
+        month = np.datetime64(
+            int(key & ((1 << _MONTH_BITS) - 1)) + int(_FIRST_MONTH), "M"
+        )
+        first_day = month.astype("datetime64[D]").item()
+        batch.append((key >> _MONTH_BITS, first_day, registers))
+        if len(batch) >= SKETCH_BATCH_SIZE:
+            _store_sketches(db, scope, batch)
+            batch = []
+    _store_sketches(db, scope, batch)
+
+
+def _store_sketches(db: Session, scope: str, batch: list):
+    if not batch:
+        return
+    stored = {
+        (sketch.scope_id, sketch.month): hyperloglog.from_bytes(
+            sketch.registers
+        )
+        for sketch in db.scalars(
+            select(ClimberSketch).where(
+                ClimberSketch.scope == scope,
+                tuple_(ClimberSketch.scope_id, ClimberSketch.month).in_(
+                    [(scope_id, month) for scope_id, month, _ in batch]
+                ),
+            )
+        )
+    }
+
+    upsert(
+        db,
+        ClimberSketch,
+        [
+            {
+                "scope": scope,
+                "scope_id": scope_id,
+                "month": month,
+                "registers": hyperloglog.to_bytes(
+                    hyperloglog.merge(
+                        [registers, stored.get((scope_id, month), registers)]
+                    )
+                ),
+            }
+            for scope_id, month, registers in batch
+        ],
+        index_elements=["scope", "scope_id", "month"],
+        replace=("registers",),
+    )
+
+
+def get_distinct_climbers(
+    db: Session,
+    scope: str = "global",
+    scope_ids=(0,),
+    date_from: date = None,
+    date_to: date = None,
+):
+    """
+    Estimated number of distinct climbers of the scopes.
+
+    The sketches are monthly, so the range covers whole months: every
+    month that overlaps [date_from, date_to].
+    """
+    query = select(ClimberSketch.registers).where(
+        ClimberSketch.scope == scope,
+        ClimberSketch.scope_id.in_(scope_ids),
+    )
+    if date_from:
+        query = query.where(ClimberSketch.month >= date_from.replace(day=1))
+    if date_to:
+        query = query.where(ClimberSketch.month <= date_to)
+
+    registers = hyperloglog.merge(
+        hyperloglog.from_bytes(sketch) for sketch in db.scalars(query)
+    )
+    return DistinctClimbers(
+        climbers=hyperloglog.estimate(registers),
+        relative_error=round(float(hyperloglog.RELATIVE_ERROR), 4),
+    )
+
+
+def get_area_distinct_climbers(
+    db: Session, area_slug: str, date_from: date = None, date_to: date = None
+):
+    area_ids = get_area_ids_from_slug(db, area_slug)
+    if not area_ids:
+        return None
+    return get_distinct_climbers(db, "area", area_ids, date_from, date_to)
+
+
+def get_crag_distinct_climbers(
+    db: Session, crag_slug: str, date_from: date = None, date_to: date = None
+):
+    crag_ids = get_crag_ids_from_slug(db, crag_slug)
+    if not crag_ids:
+        return None
+    return get_distinct_climbers(db, "crag", crag_ids, date_from, date_to)
+
+
+def get_boulder_distinct_climbers(
+    db: Session, slug: str, date_from: date = None, date_to: date = None
+):
+    boulder_id = db.scalar(select(Boulder.id).where(Boulder.slug == slug))
+    if boulder_id is None:
+        return None
+    return get_distinct_climbers(
+        db, "boulder", [boulder_id], date_from, date_to
+    )
+
+
+def get_top_climbers(
+    db: Session,
+    scope: str,
+    scope_ids,
+    rank_by: str = "ascents",
+    limit: int = 20,
+):
+    """
+    Most active climbers of the scopes, or those who climbed the hardest
+    when rank_by is "grade".
+    """
+    ascents = func.sum(UserScopeRollup.ascents).label("ascents")
+    max_grade = func.max(UserScopeRollup.max_grade).label("max_grade")
+    if rank_by == "grade":
+        order = (desc(max_grade), desc(ascents))
+    else:
+        order = (desc(ascents), desc(max_grade))
+
+    rows = db.execute(
+        select(User, ascents, max_grade)
+        .join(User, User.id == UserScopeRollup.user_id)
+        .where(
+            UserScopeRollup.scope == scope,
+            UserScopeRollup.scope_id.in_(scope_ids),
+        )
+        .group_by(User.id)
+        .order_by(*order, User.id)
+        .limit(limit)
+    ).all()
+
+    grades = Grade.get_all_by_correspondence(db)
+    return [
+        ScopeClimber(
+            id=user.id,
+            name=user.name,
+            url=user.url,
+            ascents=user_ascents,
+            max_grade=grades[user_max_grade],
+        )
+        for user, user_ascents, user_max_grade in rows
+    ]
+
+
+def get_area_top_climbers(
+    db: Session, area_slug: str, rank_by: str = "ascents", limit: int = 20
+):
+    area_ids = get_area_ids_from_slug(db, area_slug)
+    if not area_ids:
+        return None
+    return get_top_climbers(db, "area", area_ids, rank_by, limit)
+
+
+def get_crag_top_climbers(
+    db: Session, crag_slug: str, rank_by: str = "ascents", limit: int = 20
+):
+    crag_ids = get_crag_ids_from_slug(db, crag_slug)
+    if not crag_ids:
+        return None
+    return get_top_climbers(db, "crag", crag_ids, rank_by, limit)
@@ -0,0 +1,143 @@
+"""
+Consensus grades from the grades the climbers logged.
+
+A batch step stores per boulder the histogram of the logged grades, the
+median logged grade and how far their mean is from the boulder's grade.
+"""
+
+import numpy as np
+from sqlalchemy import delete, desc, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from analytics import get_ascent_columns
+from crud.area import get_area_ids_from_slug
+from crud.boulder import get_boulders_with_ascent_count
+from models.boulder import Boulder
+from models.boulder_grade_consensus import BoulderGradeConsensus
+from models.crag import Crag
+from models.grade import Grade
+from schemas.boulder import MisgradedBoulder
+from schemas.grade import GradeConsensus, GradeVotes
+
+# Logged grades needed before a boulder can rank as under/over-graded
+MIN_GRADE_VOTES = 10
+
+
+def rebuild_grade_consensus(db: Session, data_version: str):
+    """Rebuild the logged grade histogram of every boulder with ascents."""
+    columns = get_ascent_columns(db)
+    grades = Grade.get_all_by_correspondence(db)
+    slots = max(grades, default=0) + 1
+
+    histograms = columns.logged_grade_histograms(slots)
+    votes = histograms.sum(axis=1)
+    voted = np.flatnonzero(votes)
+    histograms, votes = histograms[voted], votes[voted]
+
+    # Lower median: first grade where the cumulative votes reach half
+    medians = np.argmax(
+        histograms.cumsum(axis=1) * 2 >= votes[:, None], axis=1
+    )
+    offsets = (
+        histograms @ np.arange(slots) / votes - columns.boulder_grade[voted]
+    )
+
+    rows = [
+        {
+            "boulder_id": boulder_id,
+            "votes": count,
+            "consensus_grade_id": grades[median].id,
+            "grade_offset": round(offset, 4),
+            "histogram": histogram.astype(np.int32).tobytes(),
+        }
+        for boulder_id, count, median, offset, histogram in zip(
+            columns.boulder_id[voted].tolist(),
+            votes.tolist(),
+            medians.tolist(),
+            offsets.tolist(),
+            histograms,
+        )
+    ]
+    db.execute(delete(BoulderGradeConsensus))
+    if rows:
+        db.execute(insert(BoulderGradeConsensus), rows)
+
+
+def get_boulder_grade_consensus(db: Session, slug: str):
+    boulder_id = db.scalar(select(Boulder.id).where(Boulder.slug == slug))
+    if boulder_id is None:
+        return None
+
+    consensus = db.scalar(
+        select(BoulderGradeConsensus)
+        .where(BoulderGradeConsensus.boulder_id == boulder_id)
+        .options(selectinload(BoulderGradeConsensus.consensus_grade))
+    )
+    if consensus is None:
+        return GradeConsensus(votes=0, grade_offset=0, histogram=[])
+
+    grades = Grade.get_all_by_correspondence(db)
+    return GradeConsensus(
+        votes=consensus.votes,
+        consensus_grade=consensus.consensus_grade,
+        grade_offset=consensus.grade_offset,
+        histogram=[
+            GradeVotes(grade=grades[correspondence], votes=votes)
+            for correspondence, votes in enumerate(consensus.counts.tolist())
+            if votes and correspondence in grades
+        ],
+    )
+
+
+def get_misgraded_boulders(
+    db: Session,
+    direction: str = "under",
+    min_votes: int = MIN_GRADE_VOTES,
+    area_slug: str = None,
+    limit: int = 20,
+):
+    """
+    Boulders whose logged grades are the furthest from their grade.
+
+    Under-graded boulders are logged harder than their grade (positive
+    offset), over-graded ones easier.
+    """
+    query = (
+        select(BoulderGradeConsensus)
+        .where(BoulderGradeConsensus.votes >= min_votes)
+        .options(selectinload(BoulderGradeConsensus.consensus_grade))
+    )
+    if direction == "under":
+        query = query.where(BoulderGradeConsensus.grade_offset > 0).order_by(
+            desc(BoulderGradeConsensus.grade_offset)
+        )
+    else:
+        query = query.where(BoulderGradeConsensus.grade_offset < 0).order_by(
+            BoulderGradeConsensus.grade_offset
+        )
+    if area_slug:
+        query = (
+            query.join(Boulder, Boulder.id == BoulderGradeConsensus.boulder_id)
+            .join(Boulder.crag)
+            .where(Crag.area_id.in_(get_area_ids_from_slug(db, area_slug)))
+        )
+    consensus = {
+        row.boulder_id: row
+        for row in db.scalars(
+            query.order_by(BoulderGradeConsensus.boulder_id).limit(limit)
+        )
+    }
+
+    columns = get_ascent_columns(db)
+    boulders = get_boulders_with_ascent_count(
+        db, columns.boulder_values(columns.boulder_ascents, list(consensus))
+    )
+    return [
+        MisgradedBoulder(
+            **boulder.model_dump(),
+            votes=consensus[boulder.id].votes,
+            consensus_grade=consensus[boulder.id].consensus_grade,
+            grade_offset=consensus[boulder.id].grade_offset,
+        )
+        for boulder in boulders
+    ]
@@ -0,0 +1,190 @@
+"""
+Denormalized boulder and ascent counts of the boulders, crags and areas.
+
+The hot read paths take the counts from these columns instead of
+aggregating the ascents. A refresh step adds the ascents and boulders
+ingested since its watermarks to the scopes they belong to, moving ascents
+adjusts the counts in place and reconcile_counters() recounts everything
+to repair any drift.
+"""
+
+import logging
+from collections import Counter
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from crud.rollup import get_new_ascent_range
+from models.area import Area
+from models.ascent import Ascent
+from models.boulder import Boulder
+from models.crag import Crag
+from models.refresh_state import RefreshState
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = "counters"
+
+
+def update_counters(db: Session, data_version: str):
+    """
+    Add the ascents and boulders ingested since the last run to the counts
+    of the scopes they belong to.
+    """
+    state = RefreshState.get_for_update(db, COUNTERS)
+    last_ascent_id, max_ascent_id = get_new_ascent_range(db, state)
+    if max_ascent_id > last_ascent_id:
+        boulder_ascents, crag_ascents, area_ascents = _count_ascents(
+            db, Ascent.id > last_ascent_id, Ascent.id <= max_ascent_id
+        )
+        _increment(db, Boulder, "ascents_count", boulder_ascents)
+        _increment(db, Crag, "ascents_count", crag_ascents)
+        _increment(db, Area, "ascents_count", area_ascents)
+        state.last_ascent_id = max_ascent_id
+
+    # New boulders only ever append, changes to existing ones bump the data
+    # revision and go through reconcile_counters()
+    last_boulder_id = state.last_boulder_id or 0
+    max_boulder_id = db.scalar(select(func.max(Boulder.id))) or 0
+    if max_boulder_id > last_boulder_id:
+        crag_boulders, area_boulders = _count_boulders(
+            db, Boulder.id > last_boulder_id, Boulder.id <= max_boulder_id
+        )
+        _increment(db, Crag, "boulders_count", crag_boulders)
+        _increment(db, Area, "boulders_count", area_boulders)
+        state.last_boulder_id = max_boulder_id
+
+
+def move_ascent_counts(
+    db: Session, source: Boulder, target: Boulder, ascents: list
+):
+    """
+    Move the counts of the moved ascents from source to target.
+
+    Only the ascents at or below the counters watermark are counted yet,
+    the next update_counters() counts the others on their new boulder.
+    """
+    state = RefreshState.get_for_update(db, COUNTERS)
+    last_ascent_id = state.last_ascent_id or 0
+    moved = sum(1 for ascent in ascents if ascent.id <= last_ascent_id)
+    if not moved:
+        return
+
+    for model, source_id, target_id in (
+        (Boulder, source.id, target.id),
+        (Crag, source.crag_id, target.crag_id),
+        (Area, source.crag.area_id, target.crag.area_id),
+    ):
+        if source_id != target_id:
+            _increment(
+                db,
+                model,
+                "ascents_count",
+                {source_id: -moved, target_id: moved},
+            )
+
+
+def reconcile_counters(db: Session) -> int:
+    """
+    Recount every counter from the base tables, fixing the drifted ones.
+
+    Returns:
+        Number of rows whose counts were wrong
+    """
+    state = RefreshState.get_for_update(db, COUNTERS)
+    max_ascent_id = db.scalar(select(func.max(Ascent.id))) or 0
+    max_boulder_id = db.scalar(select(func.max(Boulder.id))) or 0
+    boulder_ascents, crag_ascents, area_ascents = _count_ascents(
+        db, Ascent.id <= max_ascent_id
+    )
+    crag_boulders, area_boulders = _count_boulders(
+        db, Boulder.id <= max_boulder_id
+    )
+
+    fixed = sum(
+        (
+            _store_changed(db, Boulder, "ascents_count", boulder_ascents),
+            _store_changed(db, Crag, "ascents_count", crag_ascents),
+            _store_changed(db, Area, "ascents_count", area_ascents),
+            _store_changed(db, Crag, "boulders_count", crag_boulders),
+            _store_changed(db, Area, "boulders_count", area_boulders),
+        )
+    )
+    state.last_ascent_id = max_ascent_id
+    state.last_boulder_id = max_boulder_id
+    db.commit()
+
+    if fixed:
+        logger.warning("Reconciled %d drifted counters", fixed)
+    return fixed
+
+
+def _count_ascents(db: Session, *conditions):
+    """Ascents per boulder, crag and area among the matching ascents."""
+    boulder_ascents = Counter()
+    crag_ascents = Counter()
+    area_ascents = Counter()
+    for boulder_id, crag_id, area_id, ascents in db.execute(
+        select(
+            Ascent.boulder_id,
+            Boulder.crag_id,
+            Crag.area_id,
+            func.count(Ascent.id),
+        )
+        .join(Boulder, Boulder.id == Ascent.boulder_id)
+        .join(Crag, Crag.id == Boulder.crag_id)
+        .where(*conditions)
+        .group_by(Ascent.boulder_id, Boulder.crag_id, Crag.area_id)
+    ):
+        boulder_ascents[boulder_id] += ascents
+        crag_ascents[crag_id] += ascents
+        area_ascents[area_id] += ascents
+    return boulder_ascents, crag_ascents, area_ascents
+
+
+def _count_boulders(db: Session, *conditions):
+    """Boulders per crag and area among the matching boulders."""
+    crag_boulders, area_boulders = Counter(), Counter()
+    for crag_id, area_id, boulders in db.execute(
+        select(Boulder.crag_id, Crag.area_id, func.count(Boulder.id))
+        .join(Crag, Crag.id == Boulder.crag_id)
+        .where(*conditions)
+        .group_by(Boulder.crag_id, Crag.area_id)
+    ):
+        crag_boulders[crag_id] += boulders
+        area_boulders[area_id] += boulders
+    return crag_boulders, area_boulders
+
+
+def _increment(db: Session, model, column: str, deltas: dict):
+    """Add {id: delta} to a counter column."""
+    if not deltas:
+        return
+    table = model.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values(
+            {
+                column: func.coalesce(table.c[column], 0)
+                + bindparam("delta")
+            }
+        ),
+        [
+            {"row_id": row_id, "delta": delta}
+            for row_id, delta in deltas.items()
+        ],
+    )
+
+
+def _store_changed(db: Session, model, column: str, counts: dict) -> int:
+    """Write the counts that differ from the stored ones, 0 if missing."""
+    counter = getattr(model, column)
+    rows = [
+        {"id": row_id, column: counts.get(row_id, 0)}
+        for row_id, stored in db.execute(select(model.id, counter))
+        if stored != counts.get(row_id, 0)
+    ]
+    if rows:
+        db.execute(update(model), rows)
+    return len(rows)
@@ -1,21 +1,64 @@
 from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, selectinload
 
+from crud.scope_stats import get_scope_stats
+from database import get_keyset_page
+from models.area import Area
 from models.country import Country
+from schemas.area import AreaCount
+from schemas.country import CountryDetailPage, CountryStats
+
+COUNTRY_PAGE_SIZE = 20
+TOP_AREAS_LIMIT = 10
 
 
 def get_countries(db: Session):
     return db.scalars(select(Country).order_by(Country.name)).all()
 
 
-def get_all_countries_with_areas(db: Session, limit: int = None):
-    return (
-        db.scalars(
-            select(Country)
-            .options(joinedload(Country.areas))
-            .order_by(Country.name)
-            .limit(limit)
-        )
-        .unique()
-        .all()
+def get_all_countries_with_areas(
+    db: Session, cursor: str = None, limit: int = COUNTRY_PAGE_SIZE
+):
+    # selectinload keeps the limit on countries, not on joined area rows
+    countries, next_cursor = get_keyset_page(
+        db,
+        select(Country).options(selectinload(Country.areas)),
+        (Country.name, Country.id),
+        cursor,
+        limit,
+    )
+    return CountryDetailPage(countries=countries, next_cursor=next_cursor)
+
+
+def get_country_stats(db: Session, slug: str):
+    """
+    Statistics of a country: the scope statistics of its areas (see
+    crud.scope_stats) and its most climbed areas, from their counters.
+    None for an unknown country or a country without areas.
+    """
+    country = Country.get_by_slug(db, slug)
+    if country is None:
+        return None
+    stats = get_scope_stats(db, "country", slug)
+    if stats is None:
+        return None
+
+    areas = db.scalars(select(Area).where(Area.country_id == country.id)).all()
+    top_areas = sorted(
+        (area for area in areas if area.ascents_count),
+        key=lambda area: (-area.ascents_count, area.id),
+    )[:TOP_AREAS_LIMIT]
+
+    return CountryStats(
+        country=country,
+        number_of_areas=len(areas),
+        number_of_boulders=stats["number_of_boulders"],
+        ascents=stats["ascents"],
+        average_grade=stats["average_grade"],
+        grade_distribution=stats["grade_distribution"],
+        top_areas=[
+            AreaCount(area=area, count=area.ascents_count)
+            for area in top_areas
+        ],
+        ascents_per_month=stats["ascents_per_month"],
     )
@@ -5,9 +5,11 @@ from sqlalchemy import and_, not_, or_, select
 from sqlalchemy.orm import selectinload
 from rapidfuzz import fuzz
 
+from crud.counters import move_ascent_counts
 from database import Session
 from models.boulder import Boulder
 from models.crag import Crag
+from models.data_revision import DataRevision
 from models.grade import Grade
 
 
@@ -20,12 +22,11 @@ def get_boulders_for_duplicate_check(
         .options(
             selectinload(Boulder.crag),
             selectinload(Boulder.grade),
-            selectinload(Boulder.ascents),
         )
         .join(Boulder.grade)
         .where(
             and_(
-                Boulder.ascents.any(),
+                Boulder.ascents_count > 0,
                 Boulder.main_boulder_id.is_(None),
                 not_(
                     or_(
@@ -188,7 +189,7 @@ def _find_connected_components(
     # Sort all boulders by ascent count (highest first) to seed groups with popular boulders
     sorted_boulder_ids = sorted(
         similarity_graph.keys(),
-        key=lambda bid: len(boulder_map[bid].ascents),
+        key=lambda bid: boulder_map[bid].ascents_count,
         reverse=True,
     )
 
@@ -259,7 +260,6 @@ def find_single_boulder_duplicates(
         .options(
             selectinload(Boulder.crag),
             selectinload(Boulder.grade),
-            selectinload(Boulder.ascents),
         )
         .where(Boulder.id == boulder_id)
     )
@@ -273,7 +273,6 @@ def find_single_boulder_duplicates(
         .options(
             selectinload(Boulder.crag),
             selectinload(Boulder.grade),
-            selectinload(Boulder.ascents),
         )
         .join(Boulder.grade)
         .join(Boulder.crag)
@@ -351,7 +350,6 @@ def get_existing_duplicates(db: Session, boulder_id: int) -> List[Boulder]:
         .options(
             selectinload(Boulder.crag),
             selectinload(Boulder.grade),
-            selectinload(Boulder.ascents),
         )
         .where(Boulder.main_boulder_id == boulder_id)
     ).all()
@@ -381,7 +379,12 @@ def remove_duplicate_relationship(db: Session, boulder_id: int) -> Boulder:
 
 def move_ascents(db, source_boulder: Boulder, target_boulder: Boulder):
     """Move all ascents from source boulder to target boulder."""
+    move_ascent_counts(
+        db, source_boulder, target_boulder, source_boulder.ascents
+    )
     for ascent in source_boulder.ascents:
         ascent.boulder_id = target_boulder.id
         db.add(ascent)
+    # Existing ascents changed boulder, invalidate the precomputed stats
+    DataRevision.bump(db)
     db.commit()
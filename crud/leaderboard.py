@@ -0,0 +1,216 @@
+"""
+Per-grade boulder leaderboards.
+
+Every leaderboard is one pass over the boulder columns of the analytics
+engine: score the boulders, mask the scope, then rank them per grade.
+Results are cached per parameter set until the engine's data moves.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+from sqlalchemy import desc, func, select, update
+from sqlalchemy.orm import Session
+
+from analytics import (
+    BAYESIAN_PRIOR_ASCENTS,
+    AscentColumns,
+    get_ascent_columns,
+)
+from crud.area import get_area_ids_from_slug
+from crud.boulder import get_boulders_by_ids, get_boulders_with_ascent_count
+from crud.crag import get_crag_ids_from_slug
+from models.boulder import Boulder
+from models.grade import Grade
+from schemas.boulder import (
+    BoulderByGrade,
+    BoulderWithAscentCount,
+    TrendingBoulder,
+)
+
+# Default window of the trending score, in days
+TRENDING_DAYS = 30
+LEADERBOARD_CACHE_SIZE = 256
+
+
+def _trending_scores(columns: AscentColumns):
+    # Same trend as get_trending_boulders()
+    return columns.trending_scores(TRENDING_DAYS, date.today())[1]
+
+
+LEADERBOARD_SCORES = {
+    "rating": lambda columns: columns.boulder_rating,
+    "ascents": lambda columns: columns.boulder_ascents,
+    "bayesian": lambda columns: columns.bayesian_rating(),
+    "trending": _trending_scores,
+}
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_leaderboard(
+    db: Session,
+    metric: str = "ascents",
+    min_ascents: int = 1,
+    area_slug: str = None,
+    crag_slug: str = None,
+    size: int = 10,
+):
+    """
+    Top boulders of each grade for a metric.
+
+    Args:
+        db: Database session
+        metric: One of LEADERBOARD_SCORES
+        min_ascents: Minimum number of ascents of a ranked boulder
+        area_slug: Only rank the boulders of this area
+        crag_slug: Only rank the boulders of this crag
+        size: Boulders per grade, all of them if None
+
+    Returns:
+        A BoulderByGrade for every grade, hardest first
+    """
+    columns = get_ascent_columns(db)
+    key = (metric, min_ascents, area_slug, crag_slug, size)
+    # Trending also moves with the day
+    version = (columns.version, date.today())
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    area_ids = get_area_ids_from_slug(db, area_slug) if area_slug else None
+    crag_ids = get_crag_ids_from_slug(db, crag_slug) if crag_slug else None
+
+    scores = LEADERBOARD_SCORES[metric](columns)
+    ascents = columns.boulder_ascents
+    candidates = columns.boulder_mask(area_ids=area_ids, crag_ids=crag_ids)
+    candidates &= ascents >= max(min_ascents, 1)
+    # Unrated boulders cannot rank on a rating
+    candidates &= ~np.isnan(scores)
+    if metric == "trending":
+        candidates &= scores > 0
+
+    top_boulders = columns.top_boulders_per_grade(
+        scores, candidates, limit=size
+    )
+    boulder_ids = [
+        boulder_id
+        for grade_boulder_ids in top_boulders.values()
+        for boulder_id in grade_boulder_ids
+    ]
+    leaderboard = group_boulders_by_grade(
+        db, columns.boulder_values(ascents, boulder_ids)
+    )
+
+    with _cache_lock:
+        if len(_cache) >= LEADERBOARD_CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = (version, leaderboard)
+    return leaderboard
+
+
+def refresh_bayesian_ratings(db: Session, data_version: str):
+    """
+    Store the Bayesian rating of the boulders whose value moved.
+
+    Computed from the stored ratings and the ascent counts the counters step
+    has just brought up to date, never from the engine's cached columns.
+    See AscentColumns.bayesian_rating() for the formula.
+    """
+    mean = db.scalar(select(func.avg(Boulder.rating)))
+    boulders = db.execute(
+        select(
+            Boulder.id,
+            Boulder.rating,
+            Boulder.ascents_count,
+            Boulder.bayesian_rating,
+        )
+    )
+
+    rows = []
+    for boulder_id, rating, ascents, stored in boulders:
+        if rating is not None:
+            ascents = ascents or 0
+            rating = round(
+                (ascents * rating + BAYESIAN_PRIOR_ASCENTS * mean)
+                / (ascents + BAYESIAN_PRIOR_ASCENTS),
+                4,
+            )
+        if stored != rating:
+            rows.append({"id": boulder_id, "bayesian_rating": rating})
+    if rows:
+        db.execute(update(Boulder), rows)
+
+
+def group_boulders_by_grade(db: Session, ascents: dict):
+    """BoulderByGrade for every grade from {boulder_id: ascents}."""
+    boulders = get_boulders_with_ascent_count(db, ascents)
+
+    grades = db.scalars(
+        select(Grade).order_by(desc(Grade.correspondence))
+    ).all()
+
+    result_map = defaultdict(list)
+    for boulder in boulders:
+        result_map[boulder.grade.id].append(boulder)
+
+    return [
+        BoulderByGrade(grade=grade, boulders=result_map.get(grade.id, []))
+        for grade in grades
+    ]
+
+
+def get_trending_boulders(
+    db: Session,
+    window_days: int = TRENDING_DAYS,
+    area_slug: str = None,
+    limit: int = 20,
+):
+    """
+    Boulders climbed the most in the last window_days days compared to
+    their long-term rate, see AscentColumns.trending_scores(). Cached with
+    the leaderboards.
+    """
+    columns = get_ascent_columns(db)
+    today = date.today()
+    key = ("trending", window_days, area_slug, limit)
+    version = (columns.version, today)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    area_ids = get_area_ids_from_slug(db, area_slug) if area_slug else None
+
+    recent, trend = columns.trending_scores(window_days, today)
+    boulder_ids = columns.top_boulders(
+        trend,
+        columns.boulder_mask(area_ids=area_ids) & (recent > 0),
+        limit=limit,
+    )
+
+    ascents = columns.boulder_values(columns.boulder_ascents, boulder_ids)
+    recent = columns.boulder_values(recent, boulder_ids)
+    trend = columns.boulder_values(trend, boulder_ids)
+    trending = [
+        TrendingBoulder(
+            **BoulderWithAscentCount.from_query_result(
+                boulder, ascents[boulder.id]
+            ).model_dump(),
+            recent_ascents=recent[boulder.id],
+            trend=round(trend[boulder.id], 2),
+        )
+        for boulder in get_boulders_by_ids(db, boulder_ids)
+    ]
+
+    with _cache_lock:
+        if len(_cache) >= LEADERBOARD_CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = (version, trending)
+    return trending
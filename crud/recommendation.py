@@ -4,7 +4,6 @@ from sqlalchemy.orm import Session, selectinload
 
 from helper import text_normalizer
 from models.area import Area
-from models.ascent import Ascent
 from models.boulder import Boulder
 from models.crag import Crag
 from models.similarity import Similarity
@@ -12,28 +11,14 @@ from schemas.boulder import BoulderWithAscentCount, RecommendationOutput
 
 
 def get_recommended_boulder(db: Session, boulder_ids: List[int]):
-    # Subquery for ascent counts to avoid join multiplication
-    ascent_subquery = (
-        select(
-            Ascent.boulder_id, func.count(Ascent.user_id).label("ascent_count")
-        )
-        .group_by(Ascent.boulder_id)
-        .subquery()
-    )
-
     result = (
         db.execute(
             select(
                 Boulder,
-                func.coalesce(
-                    func.max(ascent_subquery.c.ascent_count), 0
-                ).label("ascents"),
+                Boulder.ascents_count.label("ascents"),
                 func.sum(Similarity.score).label("score"),
             )
             .join(Similarity, Similarity.id2 == Boulder.id)
-            .outerjoin(
-                ascent_subquery, ascent_subquery.c.boulder_id == Boulder.id
-            )
             .where(Similarity.id1.in_(boulder_ids))
             .options(
                 selectinload(Boulder.grade),
@@ -69,8 +54,7 @@ def get_selected_boulder(db: Session, area_slug: str, text: str):
     normalized_text = text_normalizer(text)
     result = (
         db.execute(
-            select(Boulder, func.count(Ascent.user_id).label("ascents"))
-            .outerjoin(Ascent, Ascent.boulder_id == Boulder.id)
+            select(Boulder)
             .join(Boulder.crag)
             .join(Crag.area)
             .options(
@@ -81,16 +65,17 @@ def get_selected_boulder(db: Session, area_slug: str, text: str):
                 and_(
                     Boulder.name_normalized.ilike(f"%{normalized_text}%"),
                     Area.slug == area_slug,
-                    Boulder.ascents.any(),
+                    Boulder.ascents_count > 0,
                 )
             )
-            .group_by(Boulder)
             .limit(20)
         )
-        .unique()
+        .scalars()
         .all()
     )
     return [
-        BoulderWithAscentCount.from_query_result(boulder, ascents)
-        for boulder, ascents in result
+        BoulderWithAscentCount.from_query_result(
+            boulder, boulder.ascents_count
+        )
+        for boulder in result
     ]
@@ -0,0 +1,173 @@
+"""
+Background refresh of the precomputed statistics.
+
+The data only changes when the scraper runs, so the API serves statistics
+from precomputed structures and rebuilds them when the data version moves.
+The scraper can also call refresh_precomputed_statistics() right after an
+ingest instead of waiting for the next tick.
+
+The incremental steps only fold in the ascents above their watermark.
+They are rebuilt from scratch when the data revision moves (existing rows
+changed) and periodically by repair_precomputed_statistics().
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from analytics import ascent_analytics
+from database import engine
+from models.data_revision import DataRevision
+from models.refresh_state import RefreshState
+from crud.boulder import BAYESIAN_RATING
+from crud.counters import COUNTERS, reconcile_counters, update_counters
+from crud.climbers import (
+    CLIMBER_SKETCHES,
+    rebuild_climber_sketches,
+    update_climber_sketches,
+)
+from crud.consensus import rebuild_grade_consensus
+from crud.leaderboard import refresh_bayesian_ratings
+from crud.rollup import (
+    DAILY_ROLLUP,
+    USER_SCOPE_ROLLUP,
+    rebuild_ascent_daily_rollup,
+    rebuild_user_scope_rollup,
+    update_ascent_daily_rollup,
+    update_user_scope_rollup,
+)
+from crud.seasonality import (
+    SEASONALITY,
+    rebuild_season_histograms,
+    update_season_histograms,
+)
+from crud.snapshot import get_data_version, refresh_stats_snapshots
+from crud.stats import rebuild_grade_time_cube
+from crud.user import USER_STATS, rebuild_user_stats, update_user_stats
+from crud.style import rebuild_boulder_style_profiles
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two data version checks
+REFRESH_INTERVAL = int(os.getenv("STATS_REFRESH_INTERVAL", 600))
+# Seconds between two repairs (rebuilds from scratch) of the incrementally
+# maintained statistics
+RECONCILE_INTERVAL = int(os.getenv("COUNTERS_RECONCILE_INTERVAL", 86400))
+
+# Each step is called with (db, data_version), in order
+REFRESH_STEPS = {
+    DAILY_ROLLUP: update_ascent_daily_rollup,
+    COUNTERS: update_counters,
+    SEASONALITY: update_season_histograms,
+    CLIMBER_SKETCHES: update_climber_sketches,
+    USER_SCOPE_ROLLUP: update_user_scope_rollup,
+    # Reads the favourite areas from the user rollup above
+    USER_STATS: update_user_stats,
+    "grade_time_cube": rebuild_grade_time_cube,
+    BAYESIAN_RATING: refresh_bayesian_ratings,
+    "grade_consensus": rebuild_grade_consensus,
+    "boulder_style_profile": rebuild_boulder_style_profiles,
+    "stats_snapshot": refresh_stats_snapshots,
+}
+
+# Rebuild from scratch of the incremental steps, called with (db)
+REBUILD_STEPS = {
+    DAILY_ROLLUP: rebuild_ascent_daily_rollup,
+    COUNTERS: reconcile_counters,
+    SEASONALITY: rebuild_season_histograms,
+    CLIMBER_SKETCHES: rebuild_climber_sketches,
+    USER_SCOPE_ROLLUP: rebuild_user_scope_rollup,
+    USER_STATS: rebuild_user_stats,
+}
+
+
+def refresh_precomputed_statistics(db: Session, force: bool = False) -> bool:
+    """
+    Rebuild the precomputed statistics that are older than the data.
+
+    Args:
+        db: Database session
+        force: Rebuild every step even if the data version did not move
+
+    Returns:
+        True if something was rebuilt
+    """
+    # Read before loading the data: rows committed in between are then
+    # newer than the stamped version and picked up by the next refresh
+    data_version = get_data_version(db)
+    data_revision = DataRevision.get_revision(db)
+    # The in-memory ascent columns are per process, keep them current first
+    ascent_analytics.refresh(db)
+    refreshed = False
+
+    for name, step in REFRESH_STEPS.items():
+        state = RefreshState.get_by_name(db, name)
+        if not force and state and state.data_version == data_version:
+            continue
+
+        logger.info("Refreshing %s for data version %s", name, data_version)
+        if (
+            name in REBUILD_STEPS
+            and state is not None
+            and state.data_revision != data_revision
+        ):
+            # Existing rows changed, folding in new ascents is not enough
+            REBUILD_STEPS[name](db)
+        else:
+            step(db, data_version)
+        # Fetched after the step, which may have stored its own state
+        state = RefreshState.get_or_create(db, name)
+        state.data_version = data_version
+        state.data_revision = data_revision
+        state.refreshed_at = datetime.now()
+        db.commit()
+        refreshed = True
+
+    return refreshed
+
+
+def repair_precomputed_statistics(db: Session):
+    """
+    Rebuild every precomputed statistic from scratch.
+
+    Catches up with the changes the incremental refresh cannot see: rows
+    changed without bumping the data revision and ascents committed after
+    a refresh with an id below its watermark.
+    """
+    data_revision = DataRevision.get_revision(db)
+    ascent_analytics.rebuild(db)
+    for name, rebuild in REBUILD_STEPS.items():
+        logger.info("Rebuilding %s", name)
+        rebuild(db)
+        RefreshState.get_or_create(db, name).data_revision = data_revision
+        db.commit()
+    # The other steps read the rebuilt data
+    refresh_precomputed_statistics(db, force=True)
+
+
+def _refresh_once():
+    with Session(engine) as session:
+        refresh_precomputed_statistics(session)
+
+
+def _reconcile_once():
+    with Session(engine) as session:
+        repair_precomputed_statistics(session)
+
+
+async def run_refresh_loop(interval: int = REFRESH_INTERVAL):
+    """Periodically refresh the statistics without blocking the event loop."""
+    reconciled_at = time.monotonic()
+    while True:
+        try:
+            await asyncio.to_thread(_refresh_once)
+            if time.monotonic() - reconciled_at >= RECONCILE_INTERVAL:
+                await asyncio.to_thread(_reconcile_once)
+                reconciled_at = time.monotonic()
+        except Exception:
+            logger.exception("Statistics refresh failed")
+        await asyncio.sleep(interval)
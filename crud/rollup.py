@@ -0,0 +1,253 @@
+"""
+Rollup tables maintained incrementally from the ascents added by the scraper.
+
+Each rollup remembers the last ascent it folded in (RefreshState), so a
+refresh only reads the new ascents through the primary key index. The
+state row stays locked until the refresh commits, so concurrent refreshes
+never fold the same ascents twice.
+"""
+
+from datetime import date
+
+from sqlalchemy import delete, desc, func, select
+from sqlalchemy.orm import Session
+
+from database import upsert
+from models.ascent import Ascent
+from models.ascent_daily_rollup import AscentDailyRollup
+from models.boulder import Boulder
+from models.crag import Crag
+from models.grade import Grade
+from models.refresh_state import RefreshState
+from models.user_scope_rollup import UserScopeRollup
+
+DAILY_ROLLUP = "ascent_daily_rollup"
+USER_SCOPE_ROLLUP = "user_scope_rollup"
+ROLLUP_BATCH_SIZE = 10_000
+
+
+def get_new_ascent_range(db: Session, state: RefreshState):
+    """
+    (first excluded, last included) ascent ids not yet folded in.
+
+    The state must come from RefreshState.get_for_update(). An ascent whose
+    id is below the watermark by the time it commits is only counted by
+    the next rebuild (see crud.refresh.repair_precomputed_statistics).
+    """
+    last_ascent_id = state.last_ascent_id or 0
+    max_ascent_id = db.scalar(select(func.max(Ascent.id))) or 0
+    return last_ascent_id, max_ascent_id
+
+
+# Daily ascent rollup
+def update_ascent_daily_rollup(db: Session, data_version: str):
+    """Fold the ascents added since the last run into the daily rollup."""
+    state = RefreshState.get_for_update(db, DAILY_ROLLUP)
+    last_ascent_id, max_ascent_id = get_new_ascent_range(db, state)
+    if max_ascent_id <= last_ascent_id:
+        return
+
+    result = db.execute(
+        select(
+            Ascent.log_date,
+            Ascent.boulder_id,
+            Boulder.grade_id,
+            func.count(Ascent.id),
+        )
+        .join(Boulder, Boulder.id == Ascent.boulder_id)
+        .where(Ascent.id > last_ascent_id, Ascent.id <= max_ascent_id)
+        .group_by(Ascent.log_date, Ascent.boulder_id, Boulder.grade_id)
+        .execution_options(yield_per=ROLLUP_BATCH_SIZE)
+    )
+
+    for partition in result.partitions():
+        upsert(
+            db,
+            AscentDailyRollup,
+            [
+                {
+                    "day": day,
+                    "boulder_id": boulder_id,
+                    "grade_id": grade_id,
+                    "ascents": ascents,
+                }
+                for day, boulder_id, grade_id, ascents in partition
+            ],
+            index_elements=["day", "boulder_id"],
+            add=("ascents",),
+            replace=("grade_id",),
+        )
+
+    state.last_ascent_id = max_ascent_id
+
+
+def rebuild_ascent_daily_rollup(db: Session):
+    """Rebuild the daily rollup from scratch (e.g. after ascents moved)."""
+    state = RefreshState.get_for_update(db, DAILY_ROLLUP)
+    db.execute(delete(AscentDailyRollup))
+    state.last_ascent_id = None
+    update_ascent_daily_rollup(db, data_version=None)
+    db.commit()
+
+
+# User x area and user x crag rollup
+def update_user_scope_rollup(db: Session, data_version: str):
+    """Fold the ascents added since the last run into the user rollup."""
+    state = RefreshState.get_for_update(db, USER_SCOPE_ROLLUP)
+    last_ascent_id, max_ascent_id = get_new_ascent_range(db, state)
+    if max_ascent_id <= last_ascent_id:
+        return
+
+    for scope, scope_column in (("area", Crag.area_id), ("crag", Crag.id)):
+        result = db.execute(
+            select(
+                Ascent.user_id,
+                scope_column,
+                func.count(Ascent.id),
+                func.max(Grade.correspondence),
+            )
+            .join(Boulder, Boulder.id == Ascent.boulder_id)
+            .join(Crag, Crag.id == Boulder.crag_id)
+            .join(Grade, Grade.id == Boulder.grade_id)
+            .where(Ascent.id > last_ascent_id, Ascent.id <= max_ascent_id)
+            .group_by(Ascent.user_id, scope_column)
+            .execution_options(yield_per=ROLLUP_BATCH_SIZE)
+        )
+
+        for partition in result.partitions():
+            upsert(
+                db,
+                UserScopeRollup,
+                [
+                    {
+                        "scope": scope,
+                        "scope_id": scope_id,
+                        "user_id": user_id,
+                        "ascents": ascents,
+                        "max_grade": max_grade,
+                    }
+                    for user_id, scope_id, ascents, max_grade in partition
+                ],
+                index_elements=["scope", "scope_id", "user_id"],
+                add=("ascents",),
+                greatest=("max_grade",),
+            )
+
+    state.last_ascent_id = max_ascent_id
+
+
+def rebuild_user_scope_rollup(db: Session):
+    """Rebuild the user rollup from scratch (e.g. after ascents moved)."""
+    state = RefreshState.get_for_update(db, USER_SCOPE_ROLLUP)
+    db.execute(delete(UserScopeRollup))
+    state.last_ascent_id = None
+    update_user_scope_rollup(db, data_version=None)
+    db.commit()
+
+
+def _get_rollup_filter(
+    date_from: date = None,
+    date_to: date = None,
+    area_ids=None,
+    crag_ids=None,
+    boulder_ids=None,
+):
+    conditions = []
+    if date_from:
+        conditions.append(AscentDailyRollup.day >= date_from)
+    if date_to:
+        conditions.append(AscentDailyRollup.day <= date_to)
+    if boulder_ids is not None:
+        conditions.append(AscentDailyRollup.boulder_id.in_(boulder_ids))
+    if crag_ids is not None:
+        conditions.append(Boulder.crag_id.in_(crag_ids))
+    if area_ids is not None:
+        conditions.append(Crag.area_id.in_(area_ids))
+    return conditions
+
+
+def _join_scope(query, area_ids=None, crag_ids=None):
+    if area_ids is not None or crag_ids is not None:
+        query = query.join(Boulder, Boulder.id == AscentDailyRollup.boulder_id)
+    if area_ids is not None:
+        query = query.join(Crag, Crag.id == Boulder.crag_id)
+    return query
+
+
+def get_total_ascents_in_range(
+    db: Session,
+    date_from: date = None,
+    date_to: date = None,
+    area_ids=None,
+    crag_ids=None,
+):
+    query = _join_scope(
+        select(func.coalesce(func.sum(AscentDailyRollup.ascents), 0)),
+        area_ids=area_ids,
+        crag_ids=crag_ids,
+    )
+    return db.scalar(
+        query.where(
+            *_get_rollup_filter(
+                date_from, date_to, area_ids=area_ids, crag_ids=crag_ids
+            )
+        )
+    )
+
+
+def get_most_climbed_in_range(
+    db: Session,
+    date_from: date = None,
+    date_to: date = None,
+    area_ids=None,
+    crag_ids=None,
+    limit: int = 20,
+):
+    """List of (boulder_id, ascents) with the most ascents in the range."""
+    ascents = func.sum(AscentDailyRollup.ascents).label("ascents")
+    query = _join_scope(
+        select(AscentDailyRollup.boulder_id, ascents),
+        area_ids=area_ids,
+        crag_ids=crag_ids,
+    )
+    return db.execute(
+        query.where(
+            *_get_rollup_filter(
+                date_from, date_to, area_ids=area_ids, crag_ids=crag_ids
+            )
+        )
+        .group_by(AscentDailyRollup.boulder_id)
+        .order_by(desc(ascents), AscentDailyRollup.boulder_id)
+        .limit(limit)
+    ).all()
+
+
+def get_ascents_per_period_in_range(
+    db: Session,
+    period: str,
+    date_from: date = None,
+    date_to: date = None,
+    grade: str = None,
+    boulder_ids=None,
+) -> dict:
+    """Ascent counts keyed by month or year of the day."""
+    period_value = func.extract(period, AscentDailyRollup.day).label(period)
+    query = select(period_value, func.sum(AscentDailyRollup.ascents))
+
+    if grade:
+        grade_subquery = (
+            select(Grade.correspondence)
+            .where(Grade.value == grade)
+            .scalar_subquery()
+        )
+        query = query.join(
+            Grade, Grade.id == AscentDailyRollup.grade_id
+        ).where(Grade.correspondence >= grade_subquery)
+
+    result = db.execute(
+        query.where(
+            *_get_rollup_filter(date_from, date_to, boulder_ids=boulder_ids)
+        ).group_by(period_value)
+    ).all()
+
+    return {int(value): ascents for value, ascents in result}
@@ -0,0 +1,213 @@
+"""
+Statistics of a scope: an area, a crag or a country.
+
+The scope is resolved to its area or crag ids once, then every figure is
+read from one boulder mask over the analytics columns, the seasonal curves
+from the stored season histograms and the boulders of both rankings are
+loaded together. Results are cached per scope until the data moves, as
+plain values: ORM instances would outlive their session in the cache.
+"""
+
+import threading
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from analytics import get_ascent_columns
+from crud.boulder import (
+    BAYESIAN_RATING,
+    get_best_rated_boulder_ids,
+    get_boulders_by_ids,
+)
+from crud.rollup import (
+    DAILY_ROLLUP,
+    get_most_climbed_in_range,
+    get_total_ascents_in_range,
+)
+from crud.seasonality import SEASONALITY, get_season_curves
+from database import MONTH_LIST, WEEKDAY_LIST
+from helper import get_percentage
+from models.area import Area
+from models.country import Country
+from models.crag import Crag
+from models.grade import Grade
+from models.refresh_state import RefreshState
+from schemas.ascent import AscentsPerMonth, AscentsPerWeekday
+from schemas.boulder import BoulderWithAscentCount
+from schemas.grade import Grade as GradeSchema, GradeDistribution
+
+SCOPES = ("area", "crag", "country")
+MOST_CLIMBED_LIMIT = 20
+BEST_RATED_LIMIT = 20
+SCOPE_STATS_CACHE_SIZE = 256
+# Refresh steps storing rows the statistics read: the Bayesian ratings of
+# the best rated boulders, the histograms of the seasonal curves and the
+# daily rollup of the date range figures
+SCOPE_STATS_STEPS = (BAYESIAN_RATING, SEASONALITY, DAILY_ROLLUP)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_scope_ids(db: Session, scope: str, slug: str) -> dict:
+    """The scope as the area_ids or crag_ids of AscentColumns masks."""
+    if scope == "crag":
+        return {
+            "crag_ids": db.scalars(
+                select(Crag.id).where(Crag.slug == slug)
+            ).all()
+        }
+    if scope == "country":
+        return {
+            "area_ids": db.scalars(
+                select(Area.id).join(Area.country).where(Country.slug == slug)
+            ).all()
+        }
+    return {
+        "area_ids": db.scalars(select(Area.id).where(Area.slug == slug)).all()
+    }
+
+
+def get_scope_stats(
+    db: Session,
+    scope: str,
+    slug: str,
+    date_from: date = None,
+    date_to: date = None,
+):
+    """
+    Boulder count, grade distribution, average grade, total ascents, most
+    climbed and best rated boulders and seasonal curves of a scope. The
+    seasonal curves always count every ascent.
+
+    Args:
+        db: Database session
+        scope: One of SCOPES
+        slug: Slug of the area, crag or country
+        date_from: Only count the ascents logged from this day
+        date_to: Only count the ascents logged until this day
+
+    Returns:
+        A dict of the AreaStats/CragStats figures, None for an unknown scope
+    """
+    columns = get_ascent_columns(db)
+    version = (
+        columns.version,
+        *(_get_step_version(db, name) for name in SCOPE_STATS_STEPS),
+    )
+    key = (scope, slug, date_from, date_to)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    scope_ids = get_scope_ids(db, scope, slug)
+    if not any(scope_ids.values()):
+        return None
+
+    boulder_mask = columns.boulder_mask(**scope_ids)
+    ascents = columns.boulder_ascents
+
+    if date_from or date_to:
+        most_climbed = dict(
+            get_most_climbed_in_range(
+                db, date_from, date_to, limit=MOST_CLIMBED_LIMIT, **scope_ids
+            )
+        )
+        total_ascents = get_total_ascents_in_range(
+            db, date_from, date_to, **scope_ids
+        )
+    else:
+        most_climbed = columns.boulder_values(
+            ascents,
+            columns.top_boulders(
+                ascents, boulder_mask & (ascents > 0), limit=MOST_CLIMBED_LIMIT
+            ),
+        )
+        total_ascents = int(ascents[boulder_mask].sum())
+    best_rated = columns.boulder_values(
+        ascents,
+        get_best_rated_boulder_ids(db, limit=BEST_RATED_LIMIT, **scope_ids),
+    )
+
+    # One load for the boulders of both rankings
+    boulders = {
+        boulder.id: boulder
+        for boulder in get_boulders_by_ids(
+            db, list({**most_climbed, **best_rated})
+        )
+    }
+
+    grades = db.scalars(
+        select(Grade).where(Grade.correspondence >= 12).order_by(Grade.id)
+    ).all()
+    boulders_per_grade = columns.boulders_per_grade(boulder_mask)
+    average_grade = columns.average_grade(boulder_mask)
+    if average_grade is not None:
+        average_grade = Grade.get_by_correspondence(db, average_grade)
+    months, weekdays = get_season_curves(
+        db,
+        "crag" if "crag_ids" in scope_ids else "area",
+        *scope_ids.values(),
+    )
+
+    stats = {
+        "number_of_boulders": int(boulder_mask.sum()),
+        "average_grade": (
+            GradeSchema.model_validate(average_grade).model_dump()
+            if average_grade is not None
+            else None
+        ),
+        "ascents": total_ascents,
+        "grade_distribution": [
+            GradeDistribution(
+                grade=grade, boulders=boulders_per_grade[grade.correspondence]
+            ).model_dump()
+            for grade in grades
+            if grade.correspondence in boulders_per_grade
+        ],
+        "most_climbed_boulders": _with_ascent_count(boulders, most_climbed),
+        "best_rated_boulders": _with_ascent_count(boulders, best_rated),
+        "ascents_per_month": [
+            AscentsPerMonth(
+                month=month,
+                percentage=get_percentage(
+                    int(months[index]), int(months.sum())
+                ),
+            ).model_dump()
+            for index, month in enumerate(MONTH_LIST)
+        ],
+        "ascents_per_weekday": [
+            AscentsPerWeekday(
+                weekday=weekday,
+                percentage=get_percentage(
+                    int(weekdays[index]), int(weekdays.sum())
+                ),
+            ).model_dump()
+            for index, weekday in enumerate(WEEKDAY_LIST)
+        ],
+    }
+
+    with _cache_lock:
+        if len(_cache) >= SCOPE_STATS_CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = (version, stats)
+    return stats
+
+
+def _get_step_version(db: Session, name: str):
+    # A repair rebuilds the rows without moving the data version
+    state = RefreshState.get_by_name(db, name)
+    return (state.data_version, state.refreshed_at) if state else None
+
+
+def _with_ascent_count(boulders: dict, ascents: dict):
+    return [
+        BoulderWithAscentCount.from_query_result(
+            boulders[boulder_id], count
+        ).model_dump()
+        for boulder_id, count in ascents.items()
+        if boulder_id in boulders
+    ]
@@ -1,8 +1,7 @@
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
 from models.area import Area
-from models.ascent import Ascent
 from models.boulder import Boulder
 from models.crag import Crag
 from schemas.boulder import BoulderWithAscentCount
@@ -12,18 +11,19 @@ from schemas.search import SearchOutput
 def search(db: Session, text: str):
     boulders = (
         db.execute(
-            select(Boulder, func.count(Ascent.user_id).label("ascents"))
-            .where(Boulder.name_normalized.ilike(f"%{text}%"))
-            .join(Ascent, Ascent.boulder_id == Boulder.id)
+            select(Boulder)
+            .where(
+                Boulder.name_normalized.ilike(f"%{text}%"),
+                Boulder.ascents_count > 0,
+            )
             .options(
                 selectinload(Boulder.grade),
                 selectinload(Boulder.crag).selectinload(Crag.area),
             )
-            .group_by(Boulder.id)
             .order_by(Boulder.name)
             .limit(200)
         )
-        .unique()
+        .scalars()
         .all()
     )
 
@@ -43,8 +43,10 @@ def search(db: Session, text: str):
 
     return SearchOutput(
         boulders=[
-            BoulderWithAscentCount.from_query_result(boulder, ascents)
-            for boulder, ascents in boulders
+            BoulderWithAscentCount.from_query_result(
+                boulder, boulder.ascents_count
+            )
+            for boulder in boulders
         ],
         areas=areas,
         crags=crags,
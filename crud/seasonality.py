@@ -0,0 +1,163 @@
+"""
+Seasonal distribution of the ascents.
+
+The ascents of each boulder, crag, area and the whole database are counted
+per calendar month and per weekday in season_histogram and folded in from
+the new ascents after each ingest, so a seasonal curve is read from stored
+rows instead of grouping the ascent table.
+"""
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from crud.rollup import get_new_ascent_range
+from database import upsert
+from models.ascent import Ascent
+from models.boulder import Boulder
+from models.crag import Crag
+from models.refresh_state import RefreshState
+from models.season_histogram import SeasonHistogram
+
+SEASONALITY = "season_histogram"
+SEASON_BATCH_SIZE = 5_000
+
+
+def update_season_histograms(db: Session, data_version: str):
+    """Fold the ascents added since the last run into the histograms."""
+    state = RefreshState.get_for_update(db, SEASONALITY)
+    last_ascent_id, max_ascent_id = get_new_ascent_range(db, state)
+    if max_ascent_id <= last_ascent_id:
+        return
+
+    month = func.extract("month", Ascent.log_date)
+    # Sunday is 0 on every dialect
+    weekday = func.extract("dow", Ascent.log_date)
+    counts = np.array(
+        db.execute(
+            select(
+                Ascent.boulder_id,
+                Boulder.crag_id,
+                Crag.area_id,
+                month,
+                weekday,
+                func.count(Ascent.id),
+            )
+            .join(Boulder, Boulder.id == Ascent.boulder_id)
+            .join(Crag, Crag.id == Boulder.crag_id)
+            .where(Ascent.id > last_ascent_id, Ascent.id <= max_ascent_id)
+            .group_by(
+                Ascent.boulder_id,
+                Boulder.crag_id,
+                Crag.area_id,
+                month,
+                weekday,
+            )
+        ).all(),
+        dtype=np.int64,
+    ).reshape(-1, 6)
+
+    if len(counts):
+        months, ascents = counts[:, 3] - 1, counts[:, 5]
+        weekdays = (counts[:, 4] + 6) % 7
+        for scope, keys in (
+            ("global", np.zeros(len(counts), dtype=np.int64)),
+            ("area", counts[:, 2]),
+            ("crag", counts[:, 1]),
+            ("boulder", counts[:, 0]),
+        ):
+            scope_ids, rows = np.unique(keys, return_inverse=True)
+            month_histograms = np.zeros((len(scope_ids), 12), dtype=np.int64)
+            np.add.at(month_histograms, (rows, months), ascents)
+            weekday_histograms = np.zeros((len(scope_ids), 7), dtype=np.int64)
+            np.add.at(weekday_histograms, (rows, weekdays), ascents)
+            for start in range(0, len(scope_ids), SEASON_BATCH_SIZE):
+                end = start + SEASON_BATCH_SIZE
+                _store_season_histograms(
+                    db,
+                    scope,
+                    scope_ids[start:end].tolist(),
+                    month_histograms[start:end],
+                    weekday_histograms[start:end],
+                )
+
+    state.last_ascent_id = max_ascent_id
+
+
+def rebuild_season_histograms(db: Session):
+    """Rebuild the histograms from scratch (e.g. after ascents moved)."""
+    state = RefreshState.get_for_update(db, SEASONALITY)
+    db.execute(delete(SeasonHistogram))
+    state.last_ascent_id = None
+    update_season_histograms(db, data_version=None)
+    db.commit()
+
+
+def _store_season_histograms(
+    db: Session,
+    scope: str,
+    scope_ids: list,
+    month_histograms: np.ndarray,
+    weekday_histograms: np.ndarray,
+):
+    stored = _get_histogram_rows(db, scope, scope_ids)
+    rows = []
+    for scope_id, months, weekdays in zip(
+        scope_ids, month_histograms, weekday_histograms
+    ):
+        previous = stored.get(scope_id)
+        if previous is not None:
+            months = months + previous.month_counts
+            weekdays = weekdays + previous.weekday_counts
+        rows.append(
+            {
+                "scope": scope,
+                "scope_id": scope_id,
+                "months": months.astype(np.int32).tobytes(),
+                "weekdays": weekdays.astype(np.int32).tobytes(),
+            }
+        )
+    upsert(
+        db,
+        SeasonHistogram,
+        rows,
+        index_elements=["scope", "scope_id"],
+        replace=("months", "weekdays"),
+    )
+
+
+def get_season_histograms(db: Session, scope: str, scope_ids: list) -> dict:
+    """{scope_id: ascents per month} of the scopes with ascents."""
+    return {
+        scope_id: histogram.month_counts
+        for scope_id, histogram in _get_histogram_rows(
+            db, scope, scope_ids
+        ).items()
+    }
+
+
+def get_season_curves(db: Session, scope: str, scope_ids: list):
+    """
+    Ascents per month and per weekday of several scopes added together.
+
+    Returns:
+        (ascents per month from January, ascents per weekday from Monday)
+    """
+    months = np.zeros(12, dtype=np.int64)
+    weekdays = np.zeros(7, dtype=np.int64)
+    for histogram in _get_histogram_rows(db, scope, scope_ids).values():
+        months += histogram.month_counts
+        weekdays += histogram.weekday_counts
+    return months, weekdays
+
+
+def _get_histogram_rows(db: Session, scope: str, scope_ids: list) -> dict:
+    return {
+        histogram.scope_id: histogram
+        for histogram in db.scalars(
+            select(SeasonHistogram).where(
+                SeasonHistogram.scope == scope,
+                SeasonHistogram.scope_id.in_(scope_ids),
+            )
+        )
+    }
@@ -0,0 +1,136 @@
+from datetime import date, datetime
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models.area import Area
+from models.ascent import Ascent
+from models.boulder import Boulder
+from models.data_revision import REVISION_ID, DataRevision
+from models.stats_snapshot import StatsSnapshot
+from crud.stats import (
+    FIRST_YEAR,
+    get_general_areas_most_ascents,
+    get_general_ascents_per_grade,
+    get_general_ascents_per_month,
+    get_general_ascents_per_year,
+    get_general_best_rated_boulders,
+    get_general_grade_distribution,
+    get_general_hardest_boulders,
+    get_general_most_ascents_boulders,
+    get_general_rating_distribution,
+    get_general_statistics_home_page,
+)
+
+# Home page statistics served from the stats_snapshot table
+SNAPSHOT_BUILDERS = {
+    "general": get_general_statistics_home_page,
+    "best_rated_boulders": get_general_best_rated_boulders,
+    "most_ascents_boulders": get_general_most_ascents_boulders,
+    "grade_distribution": get_general_grade_distribution,
+    "ascents_per_grade": get_general_ascents_per_grade,
+    "ascents_per_month": get_general_ascents_per_month,
+    "ascents_per_year": get_general_ascents_per_year,
+    "hardest_boulders": get_general_hardest_boulders,
+    "rating_distribution": get_general_rating_distribution,
+    "areas_most_ascents": get_general_areas_most_ascents,
+}
+
+
+def _add_years_since_snapshot(payload):
+    """Add the years started since the snapshot was built, with 0 ascents."""
+    last_year = int(payload[-1]["year"]) if payload else FIRST_YEAR - 1
+    return payload + [
+        {"year": str(year), "ascents": 0}
+        for year in range(last_year + 1, date.today().year + 1)
+    ]
+
+
+# Snapshots that depend on the day they are read, not only on the data
+SNAPSHOT_READERS = {
+    "ascents_per_year": _add_years_since_snapshot,
+}
+
+# Snapshots served together by /stats/bundle
+BUNDLE_KEYS = (
+    "general",
+    "best_rated_boulders",
+    "most_ascents_boulders",
+    "grade_distribution",
+    "ascents_per_grade",
+    "ascents_per_month",
+    "ascents_per_year",
+)
+
+
+def get_data_version(db: Session) -> str:
+    """
+    Cheap fingerprint of the scraped data.
+
+    New rows move the highest primary keys of the scraped tables. Writes
+    that change, move or delete existing rows are not visible there, so
+    they bump DataRevision (e.g. move_ascents), which is part of the
+    version. Every lookup is a single index read.
+    """
+    ascent_id, boulder_id, area_id, revision = db.execute(
+        select(
+            select(func.max(Ascent.id)).scalar_subquery(),
+            select(func.max(Boulder.id)).scalar_subquery(),
+            select(func.max(Area.id)).scalar_subquery(),
+            select(DataRevision.revision)
+            .where(DataRevision.id == REVISION_ID)
+            .scalar_subquery(),
+        )
+    ).one()
+    return (
+        f"{ascent_id or 0}-{boulder_id or 0}-{area_id or 0}-r{revision or 0}"
+    )
+
+
+def refresh_stats_snapshots(db: Session, data_version: str):
+    """Recompute every snapshot and store it for the given data version."""
+    refreshed_at = datetime.now()
+    for key, builder in SNAPSHOT_BUILDERS.items():
+        db.merge(
+            StatsSnapshot(
+                key=key,
+                payload=to_jsonable_python(builder(db)),
+                data_version=data_version,
+                refreshed_at=refreshed_at,
+            )
+        )
+
+
+def get_stats_snapshot(db: Session, key: str):
+    """
+    Return the stored payload for a snapshot key.
+
+    Falls back to computing the statistic live when the snapshot has not
+    been built yet (e.g. right after the table was created).
+    """
+    snapshot = StatsSnapshot.get_by_key(db, key)
+    if snapshot is None:
+        return SNAPSHOT_BUILDERS[key](db)
+    return _read_payload(key, snapshot.payload)
+
+
+def get_stats_bundle(db: Session):
+    """Every home page snapshot, read in a single query."""
+    payloads = {
+        snapshot.key: snapshot.payload
+        for snapshot in StatsSnapshot.get_all_by_keys(db, BUNDLE_KEYS)
+    }
+    return {
+        key: (
+            _read_payload(key, payloads[key])
+            if key in payloads
+            else SNAPSHOT_BUILDERS[key](db)
+        )
+        for key in BUNDLE_KEYS
+    }
+
+
+def _read_payload(key: str, payload):
+    reader = SNAPSHOT_READERS.get(key)
+    return reader(payload) if reader else payload
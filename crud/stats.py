@@ -1,305 +1,284 @@
+from collections import defaultdict
 from datetime import date
 from sqlalchemy import (
-    Float,
-    Numeric,
-    and_,
     asc,
-    cast,
-    desc,
+    delete,
     func,
+    insert,
     select,
 )
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
+import numpy as np
+from analytics import get_ascent_columns
+from crud.boulder import (
+    get_best_rated_boulder_ids,
+    get_boulders_with_ascent_count,
+)
+from crud.leaderboard import get_leaderboard, group_boulders_by_grade
+from crud.rollup import get_ascents_per_period_in_range
 from database import MONTH_LIST
+from helper import get_percentage
 from models.area import Area
-from models.boulder import Boulder
-from models.crag import Crag
 from models.grade import Grade
-from models.ascent import Ascent
-from schemas.boulder import (
-    BoulderWithAscentCount,
-    BoulderByGrade,
-)
+from models.grade_cube import GradeMonthAscents, GradeYearAscents
+from schemas.area import AreaCount
+from schemas.boulder import RatingDistribution
 from schemas.general import GeneralStatistics
 from schemas.grade import GradeDistribution, GradeAscents
 from schemas.ascent import AscentsPerMonth, AscentsPerYear
 
 
+# Grade values are stored in uppercase
+HARDEST_GRADE = "8C"
+HARDEST_BOULDERS_LIMIT = 100
+# Width of the rating distribution buckets
+RATING_BUCKET = 0.5
+
+
 # Home page
 def get_general_statistics_home_page(db: Session):
-    boulder_count = db.scalar(select(func.count(Boulder.id)))
+    columns = get_ascent_columns(db)
     area_count = db.scalar(select(func.count(Area.id)))
-    ascent_count = db.scalar(select(func.count(Ascent.user_id)))
-
-    subquery = (
-        select(func.avg(Grade.correspondence)).join(
-            Boulder, Boulder.grade_id == Grade.id
-        )
-    ).scalar_subquery()
-
-    average_grade = db.scalar(
-        select(Grade).where(Grade.correspondence == func.round(subquery))
-    )
+    average_grade = Grade.get_by_correspondence(db, columns.average_grade())
 
     return GeneralStatistics(
-        boulder_count=boulder_count,
+        boulder_count=columns.boulder_count,
         area_count=area_count,
-        ascent_count=ascent_count,
+        ascent_count=columns.ascent_count,
         average_grade=average_grade,
     )
 
 
 def get_general_best_rated_boulders(db: Session):
-    # Get all boulders with a rating above 4.6 and more than 8 recorded ratings
-    boulders = (
-        db.execute(
-            select(Boulder, func.count(Ascent.user_id).label("ascents"))
-            .join(Boulder.ascents)
-            .options(
-                selectinload(Boulder.grade),
-                selectinload(Boulder.crag).selectinload(Crag.area),
-            )
-            .where(and_(Boulder.rating >= 4.6))
-            .having(func.count(Ascent.user_id) >= 8)
-            .group_by(Boulder)
-            .order_by(
-                desc(Boulder.rating),  # Order by grade
-            )
-        )
-        .unique()
-        .all()
-    )
-
-    # Group results by grade
-    grades = db.scalars(
-        select(Grade).order_by(desc(Grade.correspondence))
-    ).all()
-
-    result_map = {}
-
-    for boulder, ascents in boulders:
-        grade_id = boulder.grade_id
-        if grade_id not in result_map:
-            result_map[grade_id] = []
-
-        result_map[grade_id].append(
-            BoulderWithAscentCount(
-                id=boulder.id,
-                name=boulder.name,
-                name_normalized=boulder.name_normalized,
-                slug=boulder.slug,
-                crag=boulder.crag,
-                area=boulder.crag.area,
-                grade=boulder.grade,
-                rating=boulder.rating,
-                url=boulder.url,
-                ascents=ascents,
-            )
+    # Top 10 boulders per grade by Bayesian rating, one index scan per grade
+    grade_ids = db.scalars(select(Grade.id)).all()
+    boulder_ids = [
+        boulder_id
+        for grade_id in grade_ids
+        for boulder_id in get_best_rated_boulder_ids(
+            db, grade_id=grade_id, limit=10
         )
-
-    # Build final result
-    result = [
-        BoulderByGrade(grade=grade, boulders=result_map.get(grade.id, []))
-        for grade in grades
     ]
 
-    return result
+    columns = get_ascent_columns(db)
+    return group_boulders_by_grade(
+        db, columns.boulder_values(columns.boulder_ascents, boulder_ids)
+    )
 
 
 def get_general_most_ascents_boulders(db: Session):
-    # Subquery: Top 10 boulders per grade by ascent count
-    ranked_boulders = (
-        select(
-            Boulder.id,
-            Boulder.grade_id,
-            func.count(Ascent.user_id).label("ascents"),
-            func.row_number()
-            .over(
-                partition_by=Boulder.grade_id,
-                order_by=desc(func.count(Ascent.user_id)),
-            )
-            .label("rank"),
+    # Top 10 boulders per grade by ascent count
+    return get_leaderboard(db, metric="ascents", size=10)
+
+
+def get_general_hardest_boulders(db: Session):
+    """Boulders graded HARDEST_GRADE and above, hardest first."""
+    columns = get_ascent_columns(db)
+    hardest = Grade.get_by_value(db, HARDEST_GRADE)
+    if hardest is None:
+        return []
+    rows = np.flatnonzero(columns.boulder_grade >= hardest.correspondence)
+
+    ascents = columns.boulder_ascents
+    order = np.lexsort(
+        (
+            columns.boulder_id[rows],
+            -ascents[rows],
+            -columns.boulder_grade[rows].astype(np.int64),
         )
-        .join(Ascent, Ascent.boulder_id == Boulder.id)
-        .group_by(Boulder.id, Boulder.grade_id)
-    ).subquery()
-
-    # Main query: Get full boulder data for top 10 per grade
-    boulders = (
-        db.execute(
-            select(Boulder, ranked_boulders.c.ascents)
-            .join(ranked_boulders, Boulder.id == ranked_boulders.c.id)
-            .where(ranked_boulders.c.rank <= 10)
-            .options(
-                selectinload(Boulder.grade),
-                selectinload(Boulder.crag).selectinload(Crag.area),
-            )
-            .order_by(
-                desc(Boulder.grade_id),  # Order by grade
-                desc(
-                    ranked_boulders.c.ascents
-                ),  # Then by ascents within grade
-            )
-        )
-        .unique()
-        .all()
+    )
+    boulder_ids = columns.boulder_id[rows[order][:HARDEST_BOULDERS_LIMIT]]
+    return get_boulders_with_ascent_count(
+        db, columns.boulder_values(ascents, boulder_ids.tolist())
     )
 
-    # Group results by grade
-    grades = db.scalars(
-        select(Grade).order_by(desc(Grade.correspondence))
-    ).all()
-
-    result_map = {}
-
-    for boulder, ascents in boulders:
-        grade_id = boulder.grade_id
-        if grade_id not in result_map:
-            result_map[grade_id] = []
-
-        result_map[grade_id].append(
-            BoulderWithAscentCount(
-                id=boulder.id,
-                name=boulder.name,
-                name_normalized=boulder.name_normalized,
-                slug=boulder.slug,
-                crag=boulder.crag,
-                area=boulder.crag.area,
-                grade=boulder.grade,
-                rating=boulder.rating,
-                url=boulder.url,
-                ascents=ascents,
-            )
-        )
 
-    # Build final result
-    result = [
-        BoulderByGrade(grade=grade, boulders=result_map.get(grade.id, []))
-        for grade in grades
+def get_general_rating_distribution(db: Session):
+    boulders_per_rating = get_ascent_columns(db).boulders_per_rating(
+        RATING_BUCKET
+    )
+    return [
+        RatingDistribution(rating=rating, boulders=boulders)
+        for rating, boulders in sorted(boulders_per_rating.items())
     ]
 
-    return result
+
+def get_general_areas_most_ascents(db: Session, limit: int = 10):
+    ascents_per_area = get_ascent_columns(db).ascents_per_area()
+    area_ids = sorted(
+        ascents_per_area,
+        key=lambda area_id: (-ascents_per_area[area_id], area_id),
+    )[:limit]
+
+    areas = {
+        area.id: area
+        for area in db.scalars(select(Area).where(Area.id.in_(area_ids)))
+    }
+    return [
+        AreaCount(area=areas[area_id], count=ascents_per_area[area_id])
+        for area_id in area_ids
+    ]
 
 
 # Grade based statistics
 def get_general_grade_distribution(db: Session):
-    result = db.execute(
-        select(Grade, func.count(Boulder.id))
-        .join(Boulder, Boulder.grade_id == Grade.id)
-        .group_by(Grade)
-        .order_by(asc(Grade.correspondence))
-    ).all()
+    boulders_per_grade = get_ascent_columns(db).boulders_per_grade()
+
+    grades = db.scalars(select(Grade).order_by(asc(Grade.correspondence)))
 
     return [
-        GradeDistribution(grade=grade, boulders=boulder_count)
-        for grade, boulder_count in result
+        GradeDistribution(
+            grade=grade, boulders=boulders_per_grade[grade.correspondence]
+        )
+        for grade in grades
+        if grade.correspondence in boulders_per_grade
     ]
 
 
 def get_general_ascents_per_grade(db: Session):
-    result = db.execute(
-        select(Grade, func.count(Ascent.boulder_id))
-        .join(Boulder, Boulder.grade_id == Grade.id)
-        .join(Ascent, Boulder.id == Ascent.boulder_id)
-        .group_by(Grade.id)
-        .order_by(Grade.id)
-    ).all()
+    ascents_per_grade = get_ascent_columns(db).ascents_per_grade()
+
+    grades = db.scalars(select(Grade).order_by(Grade.id))
 
     return [
-        GradeAscents(grade=grade, ascents=ascents) for grade, ascents in result
+        GradeAscents(
+            grade=grade, ascents=ascents_per_grade[grade.correspondence]
+        )
+        for grade in grades
+        if grade.correspondence in ascents_per_grade
     ]
 
 
 # Time based statistics
-def get_general_ascents_per_month(db: Session, grade: str = None):
-    query_filter = []
-    join_clause = Ascent
+FIRST_YEAR = 1995
 
-    if grade:
-        grade_subquery = (
-            select(Grade.correspondence)
-            .where(Grade.value == grade)
-            .scalar_subquery()
-        )
 
-        query_filter.append(Grade.correspondence >= grade_subquery)
+def rebuild_grade_time_cube(db: Session, data_version: str):
+    """
+    Rebuild the grade x month and grade x year ascent cubes.
 
-        join_clause = Ascent.__table__.join(
-            Boulder, Ascent.boulder_id == Boulder.id
-        ).join(Grade, Boulder.grade_id == Grade.id)
+    Each cell also stores the suffix sum along the grade axis, so "grade >= X"
+    reads 12 (or one per year) precomputed rows instead of scanning ascents.
+    """
+    columns = get_ascent_columns(db)
+    ascents_per_month = columns.ascents_per_grade_and_month()
+    ascents_per_year = columns.ascents_per_grade_and_year()
 
-    total_repeats = (
-        select(func.count(Ascent.user_id))
-        .select_from(join_clause)
-        .where(*query_filter)
-        .scalar_subquery()
+    # Every grade gets a row so any grade filter hits the cube
+    grade_correspondences = sorted(
+        set(db.scalars(select(Grade.correspondence)).all()), reverse=True
     )
-    main_query = (
-        select(
-            func.extract("month", Ascent.log_date).label("month"),
-            func.round(
-                (
-                    func.count(Ascent.user_id)
-                    * 100
-                    / cast(total_repeats, Numeric)
-                ),
-                1,
-            ),
-        )
-        .select_from(join_clause)
-        .where(*query_filter)
-        .group_by("month")
-        .order_by("month")
-    )
-
-    result = db.execute(main_query).all()
-
-    result_dict = {month: ascents for month, ascents in result}
-
-    return [
-        AscentsPerMonth(month=month, percentage=result_dict.get(index + 1, 0))
-        for index, month in enumerate(MONTH_LIST)
-    ]
+    months = range(1, 13)
+    years = range(FIRST_YEAR, date.today().year + 1)
 
+    month_rows = _build_cumulative_rows(
+        grade_correspondences, months, ascents_per_month, "month"
+    )
+    year_rows = _build_cumulative_rows(
+        grade_correspondences, years, ascents_per_year, "year"
+    )
 
-def get_general_ascents_per_year(db: Session, grade: str = None):
+    db.execute(delete(GradeMonthAscents))
+    db.execute(delete(GradeYearAscents))
+    db.execute(insert(GradeMonthAscents), month_rows)
+    db.execute(insert(GradeYearAscents), year_rows)
+
+
+def _build_cumulative_rows(grade_correspondences, periods, ascents, period):
+    """Build cube rows with suffix sums, hardest grade first."""
+    cumulative = defaultdict(int)
+    rows = []
+    for correspondence in grade_correspondences:
+        for value in periods:
+            count = ascents.get((correspondence, value), 0)
+            cumulative[value] += count
+            rows.append(
+                {
+                    "grade_correspondence": correspondence,
+                    period: value,
+                    "ascents": count,
+                    "cumulative_ascents": cumulative[value],
+                }
+            )
+    return rows
 
-    query_filter = []
-    join_clause = Ascent
 
+def _get_grade_floor(db_table, grade: str = None):
+    """Correspondence of the cube rows answering "grade >= grade"."""
     if grade:
-        grade_subquery = (
+        return (
             select(Grade.correspondence)
             .where(Grade.value == grade)
             .scalar_subquery()
         )
+    # No filter: the easiest grade's suffix sum covers every ascent
+    return select(func.min(db_table.grade_correspondence)).scalar_subquery()
+
+
+def get_general_ascents_per_month(
+    db: Session,
+    grade: str = None,
+    date_from: date = None,
+    date_to: date = None,
+):
+    if date_from or date_to:
+        # Arbitrary date ranges are summed from the daily rollup
+        ascents_per_month = get_ascents_per_period_in_range(
+            db, "month", date_from=date_from, date_to=date_to, grade=grade
+        )
+    else:
+        ascents_per_month = dict(
+            db.execute(
+                select(
+                    GradeMonthAscents.month,
+                    GradeMonthAscents.cumulative_ascents,
+                ).where(
+                    GradeMonthAscents.grade_correspondence
+                    == _get_grade_floor(GradeMonthAscents, grade)
+                )
+            ).all()
+        )
 
-        query_filter.append(Grade.correspondence >= grade_subquery)
-
-        join_clause = Ascent.__table__.join(
-            Boulder, Ascent.boulder_id == Boulder.id
-        ).join(Grade, Boulder.grade_id == Grade.id)
+    total_repeats = sum(ascents_per_month.values())
 
-    main_query = (
-        select(
-            func.extract("year", Ascent.log_date).label("year"),
-            func.count(Ascent.user_id),
-        )
-        .select_from(join_clause)
-        .where(
-            and_(*query_filter, func.extract("year", Ascent.log_date) >= 1995)
+    return [
+        AscentsPerMonth(
+            month=month,
+            percentage=get_percentage(
+                ascents_per_month.get(index + 1, 0), total_repeats
+            ),
         )
-        .group_by("year")
-        .order_by("year")
-    )
-    result = db.execute(main_query).all()
+        for index, month in enumerate(MONTH_LIST)
+    ]
 
-    # Convert result to dictionary for lookup
-    result_dict = {int(year): ascents for year, ascents in result}
 
-    # Single pass through years - O(n)
+def get_general_ascents_per_year(
+    db: Session,
+    grade: str = None,
+    date_from: date = None,
+    date_to: date = None,
+):
     current_year = date.today().year
+
+    if date_from or date_to:
+        # Arbitrary date ranges are summed from the daily rollup
+        result_dict = get_ascents_per_period_in_range(
+            db, "year", date_from=date_from, date_to=date_to, grade=grade
+        )
+    else:
+        result_dict = dict(
+            db.execute(
+                select(
+                    GradeYearAscents.year, GradeYearAscents.cumulative_ascents
+                ).where(
+                    GradeYearAscents.grade_correspondence
+                    == _get_grade_floor(GradeYearAscents, grade),
+                    GradeYearAscents.year.between(FIRST_YEAR, current_year),
+                )
+            ).all()
+        )
+
     return [
         AscentsPerYear(year=str(year), ascents=result_dict.get(year, 0))
-        for year in range(1995, current_year + 1)
+        for year in range(FIRST_YEAR, current_year + 1)
     ]
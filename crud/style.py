@@ -0,0 +1,116 @@
+from typing import List
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from analytics import get_ascent_columns
+from crud.area import get_area_ids_from_slug
+from crud.boulder import get_boulders_with_ascent_count
+from crud.crag import get_crag_ids_from_slug
+from helper import get_percentage
+from models.boulder import Boulder
+from models.boulder_style_profile import BoulderStyleProfile
+from schemas.ascent import StyleCount, StyleDistribution
+
+
+def get_style_distribution(db: Session, ascent_mask=None):
+    """Share of the ascents flagged with each style, from the bitmasks."""
+    columns = get_ascent_columns(db)
+    styles = columns.style
+    if ascent_mask is not None:
+        styles = styles[ascent_mask]
+    total = len(styles)
+
+    return StyleDistribution(
+        ascents=total,
+        flagged_ascents=int((styles != 0).sum()),
+        styles=[
+            StyleCount(
+                style=style,
+                ascents=ascents,
+                percentage=get_percentage(ascents, total),
+            )
+            for style, ascents in columns.style_counts(ascent_mask).items()
+        ],
+    )
+
+
+def get_boulder_styles(db: Session, slug: str):
+    boulder_id = db.scalar(select(Boulder.id).where(Boulder.slug == slug))
+    if boulder_id is None:
+        return None
+
+    columns = get_ascent_columns(db)
+    return get_style_distribution(
+        db, columns.ascent_mask(boulder_ids=[boulder_id])
+    )
+
+
+def get_crag_styles(db: Session, crag_slug: str):
+    crag_ids = get_crag_ids_from_slug(db, crag_slug)
+    if not crag_ids:
+        return None
+
+    columns = get_ascent_columns(db)
+    return get_style_distribution(db, columns.ascent_mask(crag_ids=crag_ids))
+
+
+def get_area_styles(db: Session, area_slug: str):
+    area_ids = get_area_ids_from_slug(db, area_slug)
+    if not area_ids:
+        return None
+
+    columns = get_ascent_columns(db)
+    return get_style_distribution(db, columns.ascent_mask(area_ids=area_ids))
+
+
+def get_boulders_by_style(
+    db: Session,
+    styles: List[str],
+    area_slug: str = None,
+    crag_slug: str = None,
+    limit: int = 20,
+):
+    """
+    Boulders with the most ascents flagged with all the given styles, the
+    ascent count being the number of matching ascents.
+    """
+    columns = get_ascent_columns(db)
+    area_ids = get_area_ids_from_slug(db, area_slug) if area_slug else None
+    crag_ids = get_crag_ids_from_slug(db, crag_slug) if crag_slug else None
+
+    ascents = columns.ascents_per_boulder(columns.style_mask(styles))
+    boulder_ids = columns.top_boulders(
+        ascents,
+        columns.boulder_mask(area_ids=area_ids, crag_ids=crag_ids)
+        & (ascents > 0),
+        limit=limit,
+    )
+    return get_boulders_with_ascent_count(
+        db, columns.boulder_values(ascents, boulder_ids)
+    )
+
+
+def rebuild_boulder_style_profiles(db: Session, data_version: str):
+    """Rebuild the style profile of every boulder with ascents."""
+    columns = get_ascent_columns(db)
+    ascents = columns.boulder_ascents
+    climbed = ascents > 0
+    profiles = (
+        columns.boulder_style_counts()[climbed] / ascents[climbed, None]
+    ).astype(np.float32)
+
+    rows = [
+        {
+            "boulder_id": boulder_id,
+            "ascents": count,
+            "profile": profile.tobytes(),
+        }
+        for boulder_id, count, profile in zip(
+            columns.boulder_id[climbed].tolist(),
+            ascents[climbed].tolist(),
+            profiles,
+        )
+    ]
+    db.execute(delete(BoulderStyleProfile))
+    if rows:
+        db.execute(insert(BoulderStyleProfile), rows)
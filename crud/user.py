@@ -0,0 +1,217 @@
+"""
+Climber profiles.
+
+The profile statistics are kept per user in user_stats and folded in from
+the new ascents after each ingest, so a profile is one row however many
+ascents the climber logged.
+"""
+
+import numpy as np
+from sqlalchemy import delete, desc, select
+from sqlalchemy.orm import Session, selectinload
+
+from crud.rollup import get_new_ascent_range
+from database import upsert
+from helper import round_half_up
+from models.ascent import Ascent
+from models.boulder import Boulder
+from models.grade import Grade
+from models.refresh_state import RefreshState
+from models.user import User
+from models.user_scope_rollup import UserScopeRollup
+from models.user_stats import UserStats
+from schemas.grade import GradeAscents
+from schemas.user import UserProfileStats
+
+USER_STATS = "user_stats"
+USER_BATCH_SIZE = 5_000
+LOAD_BATCH_SIZE = 50_000
+
+
+def get_user(db: Session, user_id: int):
+    return db.get(User, user_id)
+
+
+def get_user_stats(db: Session, user_id: int):
+    user = db.get(User, user_id)
+    if user is None:
+        return None
+
+    stats = db.scalar(
+        select(UserStats)
+        .where(UserStats.user_id == user_id)
+        .options(
+            selectinload(UserStats.hardest_boulder),
+            selectinload(UserStats.favourite_area),
+        )
+    )
+    if stats is None:
+        return UserProfileStats(user=user, ascents=0)
+
+    grades = Grade.get_all_by_correspondence(db)
+    return UserProfileStats(
+        user=user,
+        ascents=stats.ascents,
+        average_grade=grades.get(
+            round_half_up(stats.grade_sum / stats.ascents)
+        ),
+        hardest_grade=grades.get(stats.hardest_grade),
+        hardest_boulder=stats.hardest_boulder,
+        favourite_area=stats.favourite_area,
+        favourite_area_ascents=stats.favourite_area_ascents,
+        grade_distribution=[
+            GradeAscents(grade=grades[correspondence], ascents=ascents)
+            for correspondence, ascents in enumerate(
+                stats.grade_counts.tolist()
+            )
+            if ascents and correspondence in grades
+        ],
+    )
+
+
+def update_user_stats(db: Session, data_version: str):
+    """Fold the ascents added since the last run into the user stats."""
+    state = RefreshState.get_for_update(db, USER_STATS)
+    last_ascent_id, max_ascent_id = get_new_ascent_range(db, state)
+    if max_ascent_id <= last_ascent_id:
+        return
+
+    ascents = _load_ascents(db, last_ascent_id, max_ascent_id)
+    if ascents is not None:
+        slots = max(Grade.get_all_by_correspondence(db), default=0) + 1
+        new_stats = _aggregate_ascents(ascents, slots)
+        for start in range(0, len(new_stats["user_id"]), USER_BATCH_SIZE):
+            end = start + USER_BATCH_SIZE
+            batch = {
+                name: values[start:end] for name, values in new_stats.items()
+            }
+            _store_user_stats(db, batch, slots)
+
+    state.last_ascent_id = max_ascent_id
+
+
+def rebuild_user_stats(db: Session):
+    """Rebuild the user stats from scratch (e.g. after ascents moved)."""
+    state = RefreshState.get_for_update(db, USER_STATS)
+    db.execute(delete(UserStats))
+    state.last_ascent_id = None
+    update_user_stats(db, data_version=None)
+    db.commit()
+
+
+def _load_ascents(db: Session, after_id: int, until_id: int):
+    result = db.execute(
+        select(
+            Ascent.id,
+            Ascent.user_id,
+            Ascent.boulder_id,
+            Grade.correspondence,
+        )
+        .join(Boulder, Boulder.id == Ascent.boulder_id)
+        .join(Grade, Grade.id == Boulder.grade_id)
+        .where(Ascent.id > after_id, Ascent.id <= until_id)
+        .execution_options(yield_per=LOAD_BATCH_SIZE)
+    )
+
+    chunks = [
+        np.array(partition, dtype=np.int64)
+        for partition in result.partitions()
+    ]
+    if not chunks:
+        return None
+    ids, users, boulders, grades = np.concatenate(chunks).T
+    return {
+        "id": ids,
+        "user_id": users,
+        "boulder_id": boulders,
+        "grade": grades,
+    }
+
+
+def _aggregate_ascents(ascents: dict, slots: int) -> dict:
+    """Per user stats of a set of ascents, by increasing user id."""
+    users, rows = np.unique(ascents["user_id"], return_inverse=True)
+    grades = ascents["grade"]
+
+    # First ascent (lowest id) of the hardest grade of each user
+    order = np.lexsort((ascents["id"], -grades, rows))
+    first = order[np.r_[True, rows[order][1:] != rows[order][:-1]]]
+
+    histograms = np.bincount(
+        rows * slots + grades, minlength=len(users) * slots
+    ).reshape(len(users), slots)
+    return {
+        "user_id": users,
+        "ascents": np.bincount(rows, minlength=len(users)),
+        "grade_sum": np.bincount(rows, grades, minlength=len(users)),
+        "grade_histogram": histograms,
+        "hardest_grade": grades[first],
+        "hardest_boulder_id": ascents["boulder_id"][first],
+    }
+
+
+def _store_user_stats(db: Session, batch: dict, slots: int):
+    user_ids = batch["user_id"].tolist()
+    stored = {
+        stats.user_id: stats
+        for stats in db.scalars(
+            select(UserStats).where(UserStats.user_id.in_(user_ids))
+        )
+    }
+    favourite_areas = _get_favourite_areas(db, user_ids)
+
+    rows = []
+    for index, user_id in enumerate(user_ids):
+        histogram = batch["grade_histogram"][index]
+        row = {
+            "user_id": user_id,
+            "ascents": int(batch["ascents"][index]),
+            "grade_sum": int(batch["grade_sum"][index]),
+            "hardest_grade": int(batch["hardest_grade"][index]),
+            "hardest_boulder_id": int(batch["hardest_boulder_id"][index]),
+        }
+
+        previous = stored.get(user_id)
+        if previous is not None:
+            row["ascents"] += previous.ascents
+            row["grade_sum"] += previous.grade_sum
+            counts = previous.grade_counts
+            histogram = histogram.copy()
+            histogram[: min(len(counts), slots)] += counts[:slots]
+            # Ties keep the boulder climbed first
+            if previous.hardest_grade >= row["hardest_grade"]:
+                row["hardest_grade"] = previous.hardest_grade
+                row["hardest_boulder_id"] = previous.hardest_boulder_id
+
+        area_id, area_ascents = favourite_areas.get(user_id, (None, 0))
+        row["grade_histogram"] = histogram.astype(np.int32).tobytes()
+        row["favourite_area_id"] = area_id
+        row["favourite_area_ascents"] = area_ascents
+        rows.append(row)
+
+    upsert(
+        db,
+        UserStats,
+        rows,
+        index_elements=["user_id"],
+        replace=tuple(name for name in rows[0] if name != "user_id"),
+    )
+
+
+def _get_favourite_areas(db: Session, user_ids: list) -> dict:
+    """{user_id: (area_id, ascents)} of the area each user climbed most."""
+    favourite_areas = {}
+    for user_id, area_id, ascents in db.execute(
+        select(
+            UserScopeRollup.user_id,
+            UserScopeRollup.scope_id,
+            UserScopeRollup.ascents,
+        )
+        .where(
+            UserScopeRollup.scope == "area",
+            UserScopeRollup.user_id.in_(user_ids),
+        )
+        .order_by(desc(UserScopeRollup.ascents), UserScopeRollup.scope_id)
+    ):
+        favourite_areas.setdefault(user_id, (area_id, ascents))
+    return favourite_areas
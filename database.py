@@ -1,8 +1,13 @@
+from datetime import date
+
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import case, create_engine, desc, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 import os
 
+from helper import decode_cursor, encode_cursor
+
 load_dotenv()
 
 # Use Neon PostgreSQL in production, SQLite for local development
@@ -29,7 +34,143 @@ MONTH_LIST = [
     "December",
 ]
 
+WEEKDAY_LIST = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
 
 def get_db_session():
     with Session(engine) as session:
         yield session
+
+
+# Range of the integer keys of a cursor
+BIGINT_MIN = -(2**63)
+BIGINT_MAX = 2**63 - 1
+
+
+def get_keyset_page(
+    db: Session,
+    query,
+    sort_keys: tuple,
+    cursor: str = None,
+    limit: int = 20,
+    descending: bool = False,
+):
+    """
+    One page of a query in sort_keys order, the last key unique.
+
+    The cursor holds the sort keys of the last row of the previous page, so
+    a deep page is an index range scan like the first one.
+
+    Returns:
+        (rows, cursor of the next page or None)
+
+    Raises:
+        ValueError: On a malformed cursor
+    """
+    if cursor:
+        try:
+            values = decode_cursor(cursor)
+            after = [
+                _cursor_value(key, value)
+                for key, value in zip(sort_keys, values, strict=True)
+            ]
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError("Invalid cursor")
+        if descending:
+            query = query.where(tuple_(*sort_keys) < tuple_(*after))
+        else:
+            query = query.where(tuple_(*sort_keys) > tuple_(*after))
+
+    order_by = [desc(key) for key in sort_keys] if descending else sort_keys
+    # One extra row tells whether there is a next page
+    rows = db.scalars(query.order_by(*order_by).limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(
+        *(getattr(last, key.key) for key in sort_keys)
+    )
+
+
+def _cursor_value(key, value):
+    python_type = key.type.python_type
+    # Dates are stored in the cursor as ISO strings
+    if issubclass(python_type, date):
+        value = python_type.fromisoformat(value)
+    else:
+        value = python_type(value)
+    # Out of range integers would fail in the database, not as a bad cursor
+    if isinstance(value, int) and not BIGINT_MIN <= value <= BIGINT_MAX:
+        raise ValueError("Invalid cursor")
+    return value
+
+
+# Rows fetched per round trip when streaming a response
+STREAM_BATCH_SIZE = 1_000
+
+
+def stream_ndjson(fetch, schema):
+    """
+    Serialize the rows returned by fetch(session) as NDJSON, one at a time.
+
+    A streamed response is sent after the request's session is closed, so
+    the rows are read in a session of their own.
+    """
+    with Session(engine) as session:
+        for row in fetch(session):
+            yield schema.model_validate(row).model_dump_json() + "\n"
+
+
+def upsert(
+    db: Session,
+    model,
+    rows: list,
+    index_elements: list,
+    add: tuple = (),
+    greatest: tuple = (),
+    replace: tuple = (),
+):
+    """
+    Bulk INSERT ... ON CONFLICT DO UPDATE for the rollup tables.
+
+    On conflict, the columns in `add` are summed with the stored value, the
+    columns in `greatest` keep the largest value and the columns in
+    `replace` are overwritten.
+    """
+    if not rows:
+        return
+
+    dialect = (
+        postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    )
+    statement = dialect.insert(model)
+    table = model.__table__.c
+    excluded = statement.excluded
+
+    values = {name: table[name] + excluded[name] for name in add}
+    values.update(
+        {
+            name: case(
+                (excluded[name] > table[name], excluded[name]),
+                else_=table[name],
+            )
+            for name in greatest
+        }
+    )
+    values.update({name: excluded[name] for name in replace})
+
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=index_elements, set_=values
+        ),
+        rows,
+    )
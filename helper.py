@@ -1,6 +1,11 @@
+import base64
+import json
 import os
 import string
 import unicodedata
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
 from rapidfuzz import fuzz
 
 from dotenv import load_dotenv
@@ -26,6 +31,39 @@ def text_normalizer(text: str):
     return text
 
 
+# Percentage rounded like the database's numeric round()
+def get_percentage(value: int, total: int, ndigits: int = 1) -> float:
+    if not total:
+        return 0
+    return float(
+        (Decimal(value * 100) / total).quantize(
+            Decimal(1).scaleb(-ndigits), rounding=ROUND_HALF_UP
+        )
+    )
+
+
+# Nearest integer, halves rounded up like the database's round(), of a
+# number or element-wise of an array
+def round_half_up(value):
+    rounded = np.floor(np.asarray(value) + 0.5).astype(np.int64)
+    return rounded if rounded.ndim else int(rounded)
+
+
+# Opaque pagination cursors holding the sort key of the last row of a page
+def encode_cursor(*values) -> str:
+    payload = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Sort key of an encode_cursor() cursor, ValueError if malformed."""
+    padding = "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
 # Authentication configuration - Set these in environment variables in production
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
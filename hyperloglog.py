@@ -0,0 +1,100 @@
+"""
+HyperLogLog sketches of distinct climbers.
+
+A sketch keeps, for each of REGISTER_COUNT registers, the longest run of
+trailing zero bits among the hashes routed to it. Two sketches merge with
+an element-wise max, so sketches stored per scope and month answer any
+range or roll-up without touching the ascents again.
+"""
+
+import zlib
+
+import numpy as np
+
+PRECISION = 12
+REGISTER_COUNT = 1 << PRECISION
+# Relative standard error of an estimate
+RELATIVE_ERROR = 1.04 / np.sqrt(REGISTER_COUNT)
+
+_RANK_BITS = 64 - PRECISION
+
+
+def hash_values(values) -> np.ndarray:
+    """Spread integer values over 64 bits (splitmix64 finalizer)."""
+    with np.errstate(over="ignore"):
+        x = np.asarray(values, dtype=np.uint64) + np.uint64(
+            0x9E3779B97F4A7C15
+        )
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def _register_updates(hashes: np.ndarray):
+    """Register index and rank of each hash."""
+    index = (hashes >> np.uint64(_RANK_BITS)).astype(np.intp)
+    rest = hashes & np.uint64((1 << _RANK_BITS) - 1)
+    # Isolate the lowest set bit, its exponent is the rank
+    with np.errstate(over="ignore"):
+        lowest = rest & (~rest + np.uint64(1))
+    rank = np.frexp(lowest.astype(np.float64))[1].astype(np.uint8)
+    rank[rest == 0] = _RANK_BITS + 1
+    return index, rank
+
+
+def empty() -> np.ndarray:
+    return np.zeros(REGISTER_COUNT, dtype=np.uint8)
+
+
+def sketch_groups(group_keys, hashes):
+    """
+    Build one sketch per distinct group key.
+
+    Args:
+        group_keys: int64 key of each hashed value
+        hashes: Values hashed with hash_values()
+
+    Yields:
+        (group key, registers), by increasing key
+    """
+    if not len(hashes):
+        return
+    index, rank = _register_updates(hashes)
+    order = np.argsort(group_keys, kind="stable")
+    keys, index, rank = group_keys[order], index[order], rank[order]
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        registers = empty()
+        np.maximum.at(registers, index[start:end], rank[start:end])
+        yield int(keys[start]), registers
+
+
+def merge(sketches) -> np.ndarray:
+    """Union of the sketches."""
+    registers = empty()
+    for sketch in sketches:
+        np.maximum(registers, sketch, out=registers)
+    return registers
+
+
+def estimate(registers: np.ndarray) -> int:
+    """Estimated number of distinct values added to the sketch."""
+    m = REGISTER_COUNT
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.exp2(-registers.astype(np.float64)).sum()
+    zeros = int(np.count_nonzero(registers == 0))
+    # Linear counting is more accurate for small cardinalities
+    if raw <= 2.5 * m and zeros:
+        return round(m * np.log(m / zeros))
+    return round(raw)
+
+
+def to_bytes(registers: np.ndarray) -> bytes:
+    # Sparse sketches are mostly zeros and compress to a few bytes
+    return zlib.compress(registers.tobytes())
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(data), dtype=np.uint8)
@@ -1,4 +1,6 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,11 +17,22 @@ from routers import (
     recommendation,
     auth,
     deduplicate,
+    user,
 )
+from crud.refresh import run_refresh_loop
 
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep the precomputed statistics in sync with the scraped data
+    refresh_task = asyncio.create_task(run_refresh_loop())
+    yield
+    refresh_task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,3 +54,4 @@ app.include_router(recommendation.router)
 app.include_router(crag.router)
 app.include_router(auth.router)
 app.include_router(deduplicate.router)
+app.include_router(user.router)
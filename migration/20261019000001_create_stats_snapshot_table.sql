@@ -0,0 +1,6 @@
+CREATE TABLE stats_snapshot (
+    key VARCHAR PRIMARY KEY,
+    payload JSON NOT NULL,
+    data_version VARCHAR NOT NULL,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
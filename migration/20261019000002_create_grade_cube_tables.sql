@@ -0,0 +1,21 @@
+CREATE TABLE refresh_state (
+    name VARCHAR PRIMARY KEY,
+    data_version VARCHAR NOT NULL,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE grade_month_ascents (
+    grade_correspondence SMALLINT NOT NULL,
+    month SMALLINT NOT NULL,
+    ascents INTEGER NOT NULL DEFAULT 0,
+    cumulative_ascents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (grade_correspondence, month)
+);
+
+CREATE TABLE grade_year_ascents (
+    grade_correspondence SMALLINT NOT NULL,
+    year SMALLINT NOT NULL,
+    ascents INTEGER NOT NULL DEFAULT 0,
+    cumulative_ascents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (grade_correspondence, year)
+);
@@ -0,0 +1,12 @@
+ALTER TABLE refresh_state ADD COLUMN last_ascent_id INTEGER;
+
+CREATE TABLE ascent_daily_rollup (
+    day DATE NOT NULL,
+    boulder_id INTEGER NOT NULL REFERENCES boulder(id),
+    grade_id INTEGER NOT NULL REFERENCES grade(id),
+    ascents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, boulder_id)
+);
+
+CREATE INDEX ix_ascent_daily_rollup_boulder_id_day
+ON ascent_daily_rollup(boulder_id, day);
@@ -0,0 +1,17 @@
+-- Bit i is STYLE_FLAGS[i] in models/ascent.py. The column is generated so
+-- every writer keeps it in sync, existing rows are filled by the ALTER.
+ALTER TABLE ascent ADD COLUMN style_mask INTEGER GENERATED ALWAYS AS (
+    CASE WHEN with_kneepad THEN 1 ELSE 0 END
+    + CASE WHEN is_soft THEN 2 ELSE 0 END
+    + CASE WHEN is_hard THEN 4 ELSE 0 END
+    + CASE WHEN is_overhang THEN 8 ELSE 0 END
+    + CASE WHEN is_vertical THEN 16 ELSE 0 END
+    + CASE WHEN is_slab THEN 32 ELSE 0 END
+    + CASE WHEN is_roof THEN 64 ELSE 0 END
+    + CASE WHEN is_athletic THEN 128 ELSE 0 END
+    + CASE WHEN is_endurance THEN 256 ELSE 0 END
+    + CASE WHEN is_crimpy THEN 512 ELSE 0 END
+    + CASE WHEN is_cruxy THEN 1024 ELSE 0 END
+    + CASE WHEN is_sloper THEN 2048 ELSE 0 END
+    + CASE WHEN is_technical THEN 4096 ELSE 0 END
+) STORED;
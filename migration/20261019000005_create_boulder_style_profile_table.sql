@@ -0,0 +1,6 @@
+-- One float32 per STYLE_FLAGS entry in models/ascent.py, packed in profile
+CREATE TABLE boulder_style_profile (
+    boulder_id INTEGER PRIMARY KEY REFERENCES boulder(id),
+    ascents INTEGER NOT NULL DEFAULT 0,
+    profile BYTEA NOT NULL
+);
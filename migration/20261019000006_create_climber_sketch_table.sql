@@ -0,0 +1,7 @@
+CREATE TABLE climber_sketch (
+    scope VARCHAR NOT NULL,
+    scope_id INTEGER NOT NULL,
+    month DATE NOT NULL,
+    registers BYTEA NOT NULL,
+    PRIMARY KEY (scope, scope_id, month)
+);
@@ -0,0 +1 @@
+ALTER TABLE boulder ADD COLUMN bayesian_rating FLOAT;
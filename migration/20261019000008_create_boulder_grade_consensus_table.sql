@@ -0,0 +1,10 @@
+CREATE TABLE boulder_grade_consensus (
+    boulder_id INTEGER PRIMARY KEY REFERENCES boulder(id),
+    votes INTEGER NOT NULL DEFAULT 0,
+    consensus_grade_id INTEGER REFERENCES grade(id),
+    grade_offset FLOAT NOT NULL,
+    histogram BYTEA NOT NULL
+);
+
+CREATE INDEX ix_boulder_grade_consensus_grade_offset
+ON boulder_grade_consensus(grade_offset);
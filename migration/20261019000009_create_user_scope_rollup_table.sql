@@ -0,0 +1,14 @@
+CREATE TABLE user_scope_rollup (
+    scope VARCHAR NOT NULL,
+    scope_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES "user"(id),
+    ascents INTEGER NOT NULL DEFAULT 0,
+    max_grade SMALLINT NOT NULL,
+    PRIMARY KEY (scope, scope_id, user_id)
+);
+
+CREATE INDEX ix_user_scope_rollup_scope_ascents
+ON user_scope_rollup(scope, scope_id, ascents);
+
+CREATE INDEX ix_user_scope_rollup_scope_max_grade
+ON user_scope_rollup(scope, scope_id, max_grade);
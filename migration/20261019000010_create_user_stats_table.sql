@@ -0,0 +1,13 @@
+CREATE TABLE user_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES "user"(id),
+    ascents INTEGER NOT NULL DEFAULT 0,
+    grade_sum INTEGER NOT NULL DEFAULT 0,
+    grade_histogram BYTEA NOT NULL,
+    hardest_grade SMALLINT NOT NULL,
+    hardest_boulder_id INTEGER NOT NULL REFERENCES boulder(id),
+    favourite_area_id INTEGER REFERENCES area(id),
+    favourite_area_ascents INTEGER NOT NULL DEFAULT 0
+);
+
+-- Favourite areas are read per user from the user rollup
+CREATE INDEX ix_user_scope_rollup_user_id ON user_scope_rollup(user_id);
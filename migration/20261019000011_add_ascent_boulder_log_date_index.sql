@@ -0,0 +1,3 @@
+-- Keyset pagination of the ascents of a boulder on (log_date, id)
+CREATE INDEX ix_ascent_boulder_id_log_date_id
+    ON ascent(boulder_id, log_date, id);
@@ -0,0 +1,6 @@
+CREATE TABLE season_histogram (
+    scope VARCHAR NOT NULL,
+    scope_id INTEGER NOT NULL,
+    months BYTEA NOT NULL,
+    PRIMARY KEY (scope, scope_id)
+);
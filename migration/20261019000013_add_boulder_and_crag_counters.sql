@@ -0,0 +1,38 @@
+-- Maintained by crud/counters.py, backfilled below
+ALTER TABLE boulder ADD COLUMN ascents_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE crag ADD COLUMN boulders_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE crag ADD COLUMN ascents_count INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill the counts of the existing ascents and boulders
+UPDATE boulder SET ascents_count = counts.ascents
+FROM (
+    SELECT boulder_id, COUNT(*) AS ascents FROM ascent GROUP BY boulder_id
+) AS counts
+WHERE counts.boulder_id = boulder.id;
+
+UPDATE crag
+SET boulders_count = counts.boulders, ascents_count = counts.ascents
+FROM (
+    SELECT crag_id, COUNT(*) AS boulders, SUM(ascents_count) AS ascents
+    FROM boulder GROUP BY crag_id
+) AS counts
+WHERE counts.crag_id = crag.id;
+
+UPDATE area SET boulders_count = 0, ascents_count = 0;
+UPDATE area
+SET boulders_count = counts.boulders, ascents_count = counts.ascents
+FROM (
+    SELECT
+        area_id,
+        SUM(boulders_count) AS boulders,
+        SUM(ascents_count) AS ascents
+    FROM crag
+    GROUP BY area_id
+) AS counts
+WHERE counts.area_id = area.id;
+
+-- The counters refresh step only adds the ascents above its watermark
+INSERT INTO refresh_state (name, data_version, last_ascent_id)
+SELECT 'counters', '', COALESCE(MAX(id), 0) FROM ascent
+ON CONFLICT (name) DO UPDATE SET last_ascent_id = EXCLUDED.last_ascent_id;
@@ -0,0 +1,3 @@
+-- Area histograms were added, let the refresh rebuild every histogram
+DELETE FROM season_histogram;
+DELETE FROM refresh_state WHERE name = 'season_histogram';
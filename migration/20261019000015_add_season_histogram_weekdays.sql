@@ -0,0 +1,5 @@
+-- Crag and weekday histograms were added, let the refresh rebuild every
+-- histogram
+DELETE FROM season_histogram;
+ALTER TABLE season_histogram ADD COLUMN weekdays BYTEA NOT NULL;
+DELETE FROM refresh_state WHERE name = 'season_histogram';
@@ -0,0 +1,7 @@
+CREATE TABLE data_revision (
+    id INTEGER PRIMARY KEY,
+    revision INTEGER NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO data_revision (id, revision) VALUES (1, 0);
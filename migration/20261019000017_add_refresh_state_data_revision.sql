@@ -0,0 +1 @@
+ALTER TABLE refresh_state ADD COLUMN data_revision INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1 @@
+CREATE INDEX ix_boulder_grade_id_bayesian_rating ON boulder(grade_id, bayesian_rating);
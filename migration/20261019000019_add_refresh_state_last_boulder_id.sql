@@ -0,0 +1,5 @@
+ALTER TABLE refresh_state ADD COLUMN last_boulder_id INTEGER;
+
+-- The boulder counts were recounted on every refresh so far
+UPDATE refresh_state SET last_boulder_id = (SELECT MAX(id) FROM boulder)
+WHERE name = 'counters';
@@ -28,6 +28,7 @@ class Area(Base):
     external_db_id: Mapped[Optional[int]] = mapped_column(
         Integer, nullable=True
     )
+    # Maintained by crud/counters.py
     boulders_count: Mapped[Optional[int]] = mapped_column(
         Integer, nullable=True
     )
@@ -2,16 +2,54 @@ from datetime import date
 from typing import Optional
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Boolean, Date, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    Date,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 
 from models.base import Base
 import models.boulder
 import models.user
 import models.grade
 
+# Style flags packed into ascent bitmasks: bit i is STYLE_FLAGS[i].
+# Only ever append to this tuple, the bit positions are persisted.
+STYLE_FLAGS = (
+    "with_kneepad",
+    "is_soft",
+    "is_hard",
+    "is_overhang",
+    "is_vertical",
+    "is_slab",
+    "is_roof",
+    "is_athletic",
+    "is_endurance",
+    "is_crimpy",
+    "is_cruxy",
+    "is_sloper",
+    "is_technical",
+)
+
+STYLE_MASK_EXPRESSION = " + ".join(
+    f"CASE WHEN {flag} THEN {1 << bit} ELSE 0 END"
+    for bit, flag in enumerate(STYLE_FLAGS)
+)
+
 
 class Ascent(Base):
     __tablename__ = "ascent"
+    __table_args__ = (
+        # Keyset pagination of the ascents of a boulder, newest first
+        Index(
+            "ix_ascent_boulder_id_log_date_id", "boulder_id", "log_date", "id"
+        ),
+    )
 
     # General attributes
     id: Mapped[int] = mapped_column(
@@ -48,6 +86,11 @@ class Ascent(Base):
     project: Mapped[bool] = mapped_column(Boolean, default=False)
     recommended: Mapped[bool] = mapped_column(Boolean, default=False)
 
+    # STYLE_FLAGS packed in one integer, kept in sync by the database
+    style_mask: Mapped[int] = mapped_column(
+        Integer, Computed(STYLE_MASK_EXPRESSION, persisted=True)
+    )
+
     # Foreign Keys
     boulder_id: Mapped[int] = mapped_column(
         ForeignKey("boulder.id"), index=True
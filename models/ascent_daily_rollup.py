@@ -0,0 +1,26 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Date, ForeignKey, Index, Integer
+
+from models.base import Base
+
+
+class AscentDailyRollup(Base):
+    """Number of ascents logged per day and boulder."""
+
+    __tablename__ = "ascent_daily_rollup"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    boulder_id: Mapped[int] = mapped_column(
+        ForeignKey("boulder.id"), primary_key=True
+    )
+    grade_id: Mapped[int] = mapped_column(ForeignKey("grade.id"))
+    ascents: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_ascent_daily_rollup_boulder_id_day", "boulder_id", "day"),
+    )
+
+    def __repr__(self):
+        return f"<AscentDailyRollup(day: {self.day}, boulder_id: {self.boulder_id}, ascents: {self.ascents})>"
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Integer,
     String,
     ForeignKey,
+    Index,
     select,
 )
 
@@ -20,6 +21,14 @@ import models.similarity
 
 class Boulder(Base):
     __tablename__ = "boulder"
+    __table_args__ = (
+        # Best rated boulders of a grade
+        Index(
+            "ix_boulder_grade_id_bayesian_rating",
+            "grade_id",
+            "bayesian_rating",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer, primary_key=True, autoincrement=True
@@ -34,6 +43,13 @@ class Boulder(Base):
         Integer, nullable=True
     )  # e.g., 1 for Boulder, 0 for Route
     rating: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Rating weighted by ascent count, refreshed after each ingest
+    bayesian_rating: Mapped[Optional[float]] = mapped_column(
+        Float, nullable=True
+    )
+
+    # Maintained by crud/counters.py
+    ascents_count: Mapped[int] = mapped_column(Integer, default=0)
 
     sector_slug: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     sector_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -0,0 +1,39 @@
+from typing import Optional
+
+import numpy as np
+
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Float, ForeignKey, Integer, LargeBinary
+
+from models.base import Base
+import models.grade
+
+
+class BoulderGradeConsensus(Base):
+    """Grades logged by the climbers of a boulder."""
+
+    __tablename__ = "boulder_grade_consensus"
+
+    boulder_id: Mapped[int] = mapped_column(
+        ForeignKey("boulder.id"), primary_key=True
+    )
+    votes: Mapped[int] = mapped_column(Integer, default=0)
+    # Median logged grade
+    consensus_grade_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("grade.id"), nullable=True
+    )
+    # Mean logged grade correspondence minus the boulder's
+    grade_offset: Mapped[float] = mapped_column(Float, index=True)
+    # int32 vote count per grade correspondence
+    histogram: Mapped[bytes] = mapped_column(LargeBinary)
+
+    consensus_grade: Mapped[Optional["models.grade.Grade"]] = relationship(
+        "Grade"
+    )
+
+    def __repr__(self):
+        return f"<BoulderGradeConsensus(boulder_id: {self.boulder_id}, votes: {self.votes}, grade_offset: {self.grade_offset})>"
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.frombuffer(self.histogram, dtype=np.int32)
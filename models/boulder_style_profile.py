@@ -0,0 +1,26 @@
+import numpy as np
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Integer, LargeBinary
+
+from models.base import Base
+
+
+class BoulderStyleProfile(Base):
+    """Fraction of a boulder's ascents flagged with each style."""
+
+    __tablename__ = "boulder_style_profile"
+
+    boulder_id: Mapped[int] = mapped_column(
+        ForeignKey("boulder.id"), primary_key=True
+    )
+    ascents: Mapped[int] = mapped_column(Integer, default=0)
+    # float32 per STYLE_FLAGS entry, in the bit order of models.ascent
+    profile: Mapped[bytes] = mapped_column(LargeBinary)
+
+    def __repr__(self):
+        return f"<BoulderStyleProfile(boulder_id: {self.boulder_id}, ascents: {self.ascents})>"
+
+    @property
+    def vector(self) -> np.ndarray:
+        return np.frombuffer(self.profile, dtype=np.float32)
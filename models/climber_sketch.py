@@ -0,0 +1,23 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Date, Integer, LargeBinary, String
+
+from models.base import Base
+
+
+class ClimberSketch(Base):
+    """HyperLogLog sketch of the climbers of a scope in a month."""
+
+    __tablename__ = "climber_sketch"
+
+    # "global" (scope_id 0), "area", "crag" or "boulder"
+    scope: Mapped[str] = mapped_column(String, primary_key=True)
+    scope_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # First day of the month
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    # zlib compressed registers, see hyperloglog.py
+    registers: Mapped[bytes] = mapped_column(LargeBinary)
+
+    def __repr__(self):
+        return f"<ClimberSketch(scope: {self.scope}, scope_id: {self.scope_id}, month: {self.month})>"
@@ -22,6 +22,9 @@ class Crag(Base):
         Integer, nullable=True
     )
     is_synthetic: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Maintained by crud/counters.py
+    boulders_count: Mapped[int] = mapped_column(Integer, default=0)
+    ascents_count: Mapped[int] = mapped_column(Integer, default=0)
 
     # Foreign Key
     area_id: Mapped[int] = mapped_column(
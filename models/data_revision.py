@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Integer, select, update
+
+from models.base import Base
+
+# The table holds a single row
+REVISION_ID = 1
+
+
+class DataRevision(Base):
+    """
+    Counter bumped by every write that changes or deletes existing scraped
+    rows, which the highest ids of the data version cannot see.
+    """
+
+    __tablename__ = "data_revision"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    revision: Mapped[int] = mapped_column(Integer, default=0)
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now
+    )
+
+    def __repr__(self):
+        return f"<DataRevision(revision: {self.revision})>"
+
+    @classmethod
+    def get_revision(cls, db_session) -> int:
+        """Current revision, 0 before any change."""
+        return (
+            db_session.scalar(
+                select(cls.revision).where(cls.id == REVISION_ID)
+            )
+            or 0
+        )
+
+    @classmethod
+    def bump(cls, db_session):
+        """Record a change to existing rows, in the caller's transaction."""
+        result = db_session.execute(
+            update(cls)
+            .where(cls.id == REVISION_ID)
+            .values(revision=cls.revision + 1, changed_at=datetime.now())
+        )
+        if not result.rowcount:
+            db_session.add(cls(id=REVISION_ID, revision=1))
+            db_session.flush()
@@ -42,6 +42,14 @@ class Grade(Base):
             )
         )
 
+    @classmethod
+    def get_all_by_correspondence(cls, db) -> dict:
+        """First grade (lowest id) of each correspondence."""
+        grades = {}
+        for grade in db.scalars(select(cls).order_by(cls.id)):
+            grades.setdefault(grade.correspondence, grade)
+        return grades
+
     @classmethod
     def get_by_value(cls, db, value):
         return db.scalar(select(cls).where(cls.value == value))
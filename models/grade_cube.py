@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, SmallInteger
+
+from models.base import Base
+
+
+class GradeMonthAscents(Base):
+    """Ascent counts by boulder grade and month of the year."""
+
+    __tablename__ = "grade_month_ascents"
+
+    grade_correspondence: Mapped[int] = mapped_column(
+        SmallInteger, primary_key=True
+    )
+    month: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    ascents: Mapped[int] = mapped_column(Integer, default=0)
+    # Ascents of boulders of this grade or harder (suffix sum on grade)
+    cumulative_ascents: Mapped[int] = mapped_column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<GradeMonthAscents({self.grade_correspondence}, month: {self.month}, ascents: {self.ascents})>"
+
+
+class GradeYearAscents(Base):
+    """Ascent counts by boulder grade and year."""
+
+    __tablename__ = "grade_year_ascents"
+
+    grade_correspondence: Mapped[int] = mapped_column(
+        SmallInteger, primary_key=True
+    )
+    year: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    ascents: Mapped[int] = mapped_column(Integer, default=0)
+    # Ascents of boulders of this grade or harder (suffix sum on grade)
+    cumulative_ascents: Mapped[int] = mapped_column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<GradeYearAscents({self.grade_correspondence}, year: {self.year}, ascents: {self.ascents})>"
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models.base import Base
+
+
+class RefreshState(Base):
+    """Data version each precomputed statistic was last built from."""
+
+    __tablename__ = "refresh_state"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    data_version: Mapped[str] = mapped_column(String, default="")
+    # Last ascent folded into incrementally maintained rollups
+    last_ascent_id: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True
+    )
+    # Last boulder folded into the boulder counts (see crud.counters)
+    last_boulder_id: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True
+    )
+    # DataRevision the statistic was last built at
+    data_revision: Mapped[int] = mapped_column(Integer, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now
+    )
+
+    def __repr__(self):
+        return f"<RefreshState(name: {self.name}, data_version: {self.data_version})>"
+
+    @classmethod
+    def get_by_name(cls, db_session, name: str):
+        """Retrieve a RefreshState by its name."""
+        return db_session.get(cls, name)
+
+    @classmethod
+    def get_or_create(cls, db_session, name: str):
+        """Retrieve a RefreshState by its name, creating it if needed."""
+        state = db_session.get(cls, name)
+        if state is None:
+            state = cls(name=name, data_version="")
+            db_session.add(state)
+            db_session.flush()
+        return state
+
+    @classmethod
+    def get_for_update(cls, db_session, name: str):
+        """
+        Retrieve a RefreshState locked until the end of the transaction,
+        creating it if needed, so concurrent refreshes wait for each other
+        instead of folding the same ascents twice.
+        """
+        state = db_session.get(cls, name, with_for_update=True)
+        if state is None:
+            dialect = (
+                postgresql
+                if db_session.get_bind().dialect.name == "postgresql"
+                else sqlite
+            )
+            db_session.execute(
+                dialect.insert(cls)
+                .values(name=name, data_version="")
+                .on_conflict_do_nothing()
+            )
+            state = db_session.get(cls, name, with_for_update=True)
+        return state
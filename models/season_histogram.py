@@ -0,0 +1,34 @@
+import numpy as np
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, LargeBinary, String
+
+from models.base import Base
+
+
+class SeasonHistogram(Base):
+    """
+    Ascents of a scope per calendar month and per weekday, folded in from
+    the new ascents.
+    """
+
+    __tablename__ = "season_histogram"
+
+    # "global" (scope_id 0), "area", "crag" or "boulder"
+    scope: Mapped[str] = mapped_column(String, primary_key=True)
+    scope_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # int32 ascent count of each month, January first
+    months: Mapped[bytes] = mapped_column(LargeBinary)
+    # int32 ascent count of each weekday, Monday first
+    weekdays: Mapped[bytes] = mapped_column(LargeBinary)
+
+    def __repr__(self):
+        return f"<SeasonHistogram(scope: {self.scope}, scope_id: {self.scope_id})>"
+
+    @property
+    def month_counts(self) -> np.ndarray:
+        return np.frombuffer(self.months, dtype=np.int32)
+
+    @property
+    def weekday_counts(self) -> np.ndarray:
+        return np.frombuffer(self.weekdays, dtype=np.int32)
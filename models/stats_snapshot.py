@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import JSON, DateTime, String, select
+
+from models.base import Base
+
+
+class StatsSnapshot(Base):
+    __tablename__ = "stats_snapshot"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    payload: Mapped[Any] = mapped_column(JSON)
+    # Data version the payload was computed from (see crud.snapshot)
+    data_version: Mapped[str] = mapped_column(String)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now
+    )
+
+    def __repr__(self):
+        return f"<StatsSnapshot(key: {self.key}, data_version: {self.data_version})>"
+
+    @classmethod
+    def get_by_key(cls, db_session, key: str):
+        """Retrieve a StatsSnapshot by its key."""
+        return db_session.get(cls, key)
+
+    @classmethod
+    def get_all_by_keys(cls, db_session, keys):
+        """Retrieve every StatsSnapshot matching the given keys."""
+        return db_session.scalars(select(cls).where(cls.key.in_(keys))).all()
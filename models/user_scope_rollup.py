@@ -0,0 +1,36 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index, Integer, SmallInteger, String
+
+from models.base import Base
+
+
+class UserScopeRollup(Base):
+    """Ascents and hardest grade of a climber in an area or a crag."""
+
+    __tablename__ = "user_scope_rollup"
+
+    # "area" or "crag"
+    scope: Mapped[str] = mapped_column(String, primary_key=True)
+    scope_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id"), primary_key=True
+    )
+    ascents: Mapped[int] = mapped_column(Integer, default=0)
+    # Highest boulder grade correspondence climbed in the scope
+    max_grade: Mapped[int] = mapped_column(SmallInteger)
+
+    __table_args__ = (
+        Index(
+            "ix_user_scope_rollup_scope_ascents", "scope", "scope_id", "ascents"
+        ),
+        Index(
+            "ix_user_scope_rollup_scope_max_grade",
+            "scope",
+            "scope_id",
+            "max_grade",
+        ),
+        Index("ix_user_scope_rollup_user_id", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<UserScopeRollup(scope: {self.scope}, scope_id: {self.scope_id}, user_id: {self.user_id}, ascents: {self.ascents})>"
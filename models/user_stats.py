@@ -0,0 +1,46 @@
+from typing import Optional
+
+import numpy as np
+
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import ForeignKey, Integer, LargeBinary, SmallInteger
+
+from models.base import Base
+import models.area
+import models.boulder
+
+
+class UserStats(Base):
+    """Profile statistics of a climber, folded in from the new ascents."""
+
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id"), primary_key=True
+    )
+    ascents: Mapped[int] = mapped_column(Integer, default=0)
+    # Sum of the boulder grade correspondences, for the average grade
+    grade_sum: Mapped[int] = mapped_column(Integer, default=0)
+    # int32 ascent count per boulder grade correspondence
+    grade_histogram: Mapped[bytes] = mapped_column(LargeBinary)
+    hardest_grade: Mapped[int] = mapped_column(SmallInteger)
+    # First boulder climbed at hardest_grade
+    hardest_boulder_id: Mapped[int] = mapped_column(ForeignKey("boulder.id"))
+    favourite_area_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("area.id"), nullable=True
+    )
+    favourite_area_ascents: Mapped[int] = mapped_column(Integer, default=0)
+
+    hardest_boulder: Mapped["models.boulder.Boulder"] = relationship(
+        "Boulder"
+    )
+    favourite_area: Mapped[Optional["models.area.Area"]] = relationship(
+        "Area"
+    )
+
+    def __repr__(self):
+        return f"<UserStats(user_id: {self.user_id}, ascents: {self.ascents})>"
+
+    @property
+    def grade_counts(self) -> np.ndarray:
+        return np.frombuffer(self.grade_histogram, dtype=np.int32)
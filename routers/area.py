@@ -1,27 +1,59 @@
-from typing import List
+from datetime import date
+from typing import List, Literal
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from crud.area import (
+    AREA_PAGE_SIZE,
     get_all_areas,
     get_area,
+    get_area_comparison,
     get_area_stats,
     get_boulders_from_area,
 )
-from database import get_db_session
-from schemas.area import Area, AreaDetail, AreaStats
+from crud.climbers import (
+    get_area_distinct_climbers,
+    get_area_top_climbers,
+)
+from crud.style import get_area_styles
+from database import STREAM_BATCH_SIZE, get_db_session, stream_ndjson
+from schemas.area import (
+    AreaComparison,
+    AreaDetail,
+    AreaPage,
+    AreaStats,
+)
+from schemas.ascent import StyleDistribution
+from schemas.user import DistinctClimbers, ScopeClimber
 from schemas.boulder import Boulder
 
 router = APIRouter(prefix="/area", tags=["area"])
 
+COMPARED_AREAS_LIMIT = 20
+
 
 @router.get("")
 def read_areas(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(None),
+    cursor: str = Query(None),
+    limit: int = Query(AREA_PAGE_SIZE, ge=1, le=500),
     db: Session = Depends(get_db_session),
-) -> List[Area]:
-    return get_all_areas(db=db, skip=skip, limit=limit)
+) -> AreaPage:
+    try:
+        return get_all_areas(db=db, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/compare")
+def read_area_comparison(
+    slugs: List[str] = Query(..., max_length=COMPARED_AREAS_LIMIT),
+    db: Session = Depends(get_db_session),
+) -> AreaComparison:
+    comparison = get_area_comparison(db=db, slugs=slugs)
+    if not comparison:
+        raise HTTPException(status_code=404, detail="Area not found")
+    return comparison
 
 
 @router.get("/{slug}")
@@ -37,14 +69,76 @@ def read_area(
 
 @router.get("/{slug}/boulders")
 def read_boulders_from_area(
-    slug: str, db: Session = Depends(get_db_session)
+    slug: str,
+    stream: bool = Query(False),
+    db: Session = Depends(get_db_session),
 ) -> List[Boulder]:
+    if stream:
+        # One JSON boulder per line, serialized as the rows are fetched
+        return StreamingResponse(
+            stream_ndjson(
+                lambda session: get_boulders_from_area(
+                    db=session, slug=slug, yield_per=STREAM_BATCH_SIZE
+                ),
+                Boulder,
+            ),
+            media_type="application/x-ndjson",
+        )
     boulders = get_boulders_from_area(db=db, slug=slug)
     return boulders
 
 
 @router.get("/{slug}/stats")
 def read_area_stats(
-    slug: str, db: Session = Depends(get_db_session)
+    slug: str,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
+    db: Session = Depends(get_db_session),
 ) -> AreaStats:
-    return get_area_stats(db=db, area_slug=slug)
\ No newline at end of file
+    stats = get_area_stats(
+        db=db, area_slug=slug, date_from=date_from, date_to=date_to
+    )
+    if not stats:
+        raise HTTPException(status_code=404, detail="Area not found")
+    return stats
+
+
+@router.get("/{slug}/styles")
+def read_area_styles(
+    slug: str,
+    db: Session = Depends(get_db_session),
+) -> StyleDistribution:
+    styles = get_area_styles(db=db, area_slug=slug)
+    if not styles:
+        raise HTTPException(status_code=404, detail="Area not found")
+    return styles
+
+
+@router.get("/{slug}/climbers")
+def read_area_distinct_climbers(
+    slug: str,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
+    db: Session = Depends(get_db_session),
+) -> DistinctClimbers:
+    climbers = get_area_distinct_climbers(
+        db=db, area_slug=slug, date_from=date_from, date_to=date_to
+    )
+    if not climbers:
+        raise HTTPException(status_code=404, detail="Area not found")
+    return climbers
+
+
+@router.get("/{slug}/top-climbers")
+def read_area_top_climbers(
+    slug: str,
+    rank_by: Literal["ascents", "grade"] = "ascents",
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db_session),
+) -> List[ScopeClimber]:
+    climbers = get_area_top_climbers(
+        db=db, area_slug=slug, rank_by=rank_by, limit=limit
+    )
+    if climbers is None:
+        raise HTTPException(status_code=404, detail="Area not found")
+    return climbers
@@ -1,27 +1,125 @@
+from datetime import date
 from typing import List
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from crud.boulder import get_all_boulders, get_boulder
+from crud.boulder import (
+    ASCENT_PAGE_SIZE,
+    BOULDER_PAGE_SIZE,
+    get_all_boulders,
+    get_boulder,
+    get_boulder_ascents,
+    get_boulders_batch,
+)
+from crud.climbers import get_boulder_distinct_climbers
+from crud.consensus import get_boulder_grade_consensus
+from crud.style import get_boulder_styles
 from database import get_db_session
-from schemas.boulder import Boulder, BoulderWithFullDetail
+from schemas.ascent import StyleDistribution
+from schemas.boulder import (
+    BoulderAscentPage,
+    BoulderPage,
+    BoulderWithAscentCount,
+    BoulderWithFullDetail,
+)
+from schemas.grade import GradeConsensus
+from schemas.user import DistinctClimbers
 
 router = APIRouter(prefix="/boulder", tags=["boulder"])
 
+BOULDER_BATCH_SIZE = 100
+
 
 @router.get("")
 def read_boulders(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, le=100),
+    cursor: str = Query(None),
+    limit: int = Query(BOULDER_PAGE_SIZE, ge=1, le=100),
     db: Session = Depends(get_db_session),
-) -> List[Boulder]:
-    return get_all_boulders(db=db, skip=skip, limit=limit)
+) -> BoulderPage:
+    try:
+        return get_all_boulders(db=db, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/batch")
+def read_boulders_batch(
+    ids: List[int] = Query(None, max_length=BOULDER_BATCH_SIZE),
+    slugs: List[str] = Query(None, max_length=BOULDER_BATCH_SIZE),
+    db: Session = Depends(get_db_session),
+) -> List[BoulderWithAscentCount]:
+    if bool(ids) == bool(slugs):
+        raise HTTPException(
+            status_code=400, detail="Provide either ids or slugs"
+        )
+    return get_boulders_batch(db=db, boulder_ids=ids, slugs=slugs)
 
 
 @router.get("/{slug}")
 def read_boulder(
     slug: str,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
     db: Session = Depends(get_db_session),
 ) -> BoulderWithFullDetail:
-    boulder = get_boulder(db=db, slug=slug)
+    boulder = get_boulder(
+        db=db, slug=slug, date_from=date_from, date_to=date_to
+    )
+    if not boulder:
+        raise HTTPException(status_code=404, detail="Boulder not found")
     return boulder
+
+
+@router.get("/{slug}/ascents")
+def read_boulder_ascents(
+    slug: str,
+    cursor: str = Query(None),
+    limit: int = Query(ASCENT_PAGE_SIZE, ge=1, le=200),
+    db: Session = Depends(get_db_session),
+) -> BoulderAscentPage:
+    try:
+        page = get_boulder_ascents(
+            db=db, slug=slug, cursor=cursor, limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not page:
+        raise HTTPException(status_code=404, detail="Boulder not found")
+    return page
+
+
+@router.get("/{slug}/styles")
+def read_boulder_styles(
+    slug: str,
+    db: Session = Depends(get_db_session),
+) -> StyleDistribution:
+    styles = get_boulder_styles(db=db, slug=slug)
+    if not styles:
+        raise HTTPException(status_code=404, detail="Boulder not found")
+    return styles
+
+
+@router.get("/{slug}/climbers")
+def read_boulder_distinct_climbers(
+    slug: str,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
+    db: Session = Depends(get_db_session),
+) -> DistinctClimbers:
+    climbers = get_boulder_distinct_climbers(
+        db=db, slug=slug, date_from=date_from, date_to=date_to
+    )
+    if not climbers:
+        raise HTTPException(status_code=404, detail="Boulder not found")
+    return climbers
+
+
+@router.get("/{slug}/grades")
+def read_boulder_grade_consensus(
+    slug: str,
+    db: Session = Depends(get_db_session),
+) -> GradeConsensus:
+    consensus = get_boulder_grade_consensus(db=db, slug=slug)
+    if not consensus:
+        raise HTTPException(status_code=404, detail="Boulder not found")
+    return consensus
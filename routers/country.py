@@ -1,10 +1,15 @@
 from typing import List
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from crud.country import get_all_countries_with_areas, get_countries
+from crud.country import (
+    COUNTRY_PAGE_SIZE,
+    get_all_countries_with_areas,
+    get_countries,
+    get_country_stats,
+)
 from database import get_db_session
-from schemas.country import Country, CountryDetail
+from schemas.country import Country, CountryDetailPage, CountryStats
 
 router = APIRouter(prefix="/country", tags=["country"])
 
@@ -17,7 +22,22 @@ def read_countries(
 
 @router.get("/details")
 def read_countries_with_areas(
-    limit: int = Query(None),
+    cursor: str = Query(None),
+    limit: int = Query(COUNTRY_PAGE_SIZE, ge=1, le=100),
     db: Session = Depends(get_db_session),
-) -> List[CountryDetail]:
-    return get_all_countries_with_areas(db=db, limit=limit)
\ No newline at end of file
+) -> CountryDetailPage:
+    try:
+        return get_all_countries_with_areas(db=db, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/{slug}/stats")
+def read_country_stats(
+    slug: str,
+    db: Session = Depends(get_db_session),
+) -> CountryStats:
+    stats = get_country_stats(db=db, slug=slug)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Country not found")
+    return stats
@@ -1,11 +1,20 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from crud.crag import get_boulders_from_crag, get_crag, get_crag_stats
-from database import get_db_session
+from crud.climbers import (
+    get_crag_distinct_climbers,
+    get_crag_top_climbers,
+)
+from crud.style import get_crag_styles
+from database import STREAM_BATCH_SIZE, get_db_session, stream_ndjson
+from schemas.ascent import StyleDistribution
 from schemas.boulder import Boulder
 from schemas.crag import Crag, CragStats
+from schemas.user import DistinctClimbers, ScopeClimber
 
 router = APIRouter(prefix="/crag", tags=["crag"])
 
@@ -22,15 +31,77 @@ def read_crag(
 
 
 @router.get("/{slug}/boulders")
-def read_boulders_from_area(
-    slug: str, db: Session = Depends(get_db_session)
+def read_boulders_from_crag(
+    slug: str,
+    stream: bool = Query(False),
+    db: Session = Depends(get_db_session),
 ) -> List[Boulder]:
-    boulders = get_boulders_from_crag(db=db, crag_slug=slug)
+    if stream:
+        # One JSON boulder per line, serialized as the rows are fetched
+        return StreamingResponse(
+            stream_ndjson(
+                lambda session: get_boulders_from_crag(
+                    db=session, slug=slug, yield_per=STREAM_BATCH_SIZE
+                ),
+                Boulder,
+            ),
+            media_type="application/x-ndjson",
+        )
+    boulders = get_boulders_from_crag(db=db, slug=slug)
     return boulders
 
 
 @router.get("/{slug}/stats")
 def read_area_stats(
-    slug: str, db: Session = Depends(get_db_session)
+    slug: str,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
+    db: Session = Depends(get_db_session),
 ) -> CragStats:
-    return get_crag_stats(db=db, crag_slug=slug)
+    stats = get_crag_stats(
+        db=db, crag_slug=slug, date_from=date_from, date_to=date_to
+    )
+    if not stats:
+        raise HTTPException(status_code=404, detail="Crag not found")
+    return stats
+
+
+@router.get("/{slug}/styles")
+def read_crag_styles(
+    slug: str,
+    db: Session = Depends(get_db_session),
+) -> StyleDistribution:
+    styles = get_crag_styles(db=db, crag_slug=slug)
+    if not styles:
+        raise HTTPException(status_code=404, detail="Crag not found")
+    return styles
+
+
+@router.get("/{slug}/climbers")
+def read_crag_distinct_climbers(
+    slug: str,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
+    db: Session = Depends(get_db_session),
+) -> DistinctClimbers:
+    climbers = get_crag_distinct_climbers(
+        db=db, crag_slug=slug, date_from=date_from, date_to=date_to
+    )
+    if not climbers:
+        raise HTTPException(status_code=404, detail="Crag not found")
+    return climbers
+
+
+@router.get("/{slug}/top-climbers")
+def read_crag_top_climbers(
+    slug: str,
+    rank_by: Literal["ascents", "grade"] = "ascents",
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db_session),
+) -> List[ScopeClimber]:
+    climbers = get_crag_top_climbers(
+        db=db, crag_slug=slug, rank_by=rank_by, limit=limit
+    )
+    if climbers is None:
+        raise HTTPException(status_code=404, detail="Crag not found")
+    return climbers
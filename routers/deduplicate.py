@@ -41,7 +41,7 @@ def _boulder_to_duplicate_info(
         grade_value=boulder.grade.value,
         grade_correspondence=boulder.grade.correspondence,
         crag_name=boulder.crag.name,
-        ascent_count=len(boulder.ascents),
+        ascent_count=boulder.ascents_count,
         similarity_score=similarity_score,
     )
 
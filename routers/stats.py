@@ -1,39 +1,58 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import List, Literal
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from crud.climbers import get_distinct_climbers
+from crud.consensus import MIN_GRADE_VOTES, get_misgraded_boulders
+from crud.leaderboard import (
+    TRENDING_DAYS,
+    get_leaderboard,
+    get_trending_boulders,
+)
+from crud.snapshot import get_stats_bundle, get_stats_snapshot
+from crud.style import get_boulders_by_style
 from crud.stats import (
-    get_general_best_rated_boulders,
-    get_general_most_ascents_boulders,
-    get_general_statistics_home_page,
-    get_general_grade_distribution,
-    get_general_ascents_per_grade,
     get_general_ascents_per_month,
     get_general_ascents_per_year,
 )
 from database import get_db_session
 from schemas.boulder import (
     BoulderByGrade,
+    BoulderWithAscentCount,
+    LeaderboardMetric,
+    MisgradedBoulder,
+    RatingDistribution,
+    TrendingBoulder,
 )
-from schemas.general import GeneralStatistics
+from schemas.area import AreaCount
+from schemas.general import GeneralStatistics, StatsBundle
 from schemas.grade import GradeDistribution, GradeAscents
-from schemas.ascent import AscentsPerMonth, AscentsPerYear
+from schemas.ascent import AscentsPerMonth, AscentsPerYear, StyleFlag
+from schemas.user import DistinctClimbers
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
 
+@router.get("/bundle")
+def read_stats_bundle(
+    db: Session = Depends(get_db_session),
+) -> StatsBundle:
+    return get_stats_bundle(db=db)
+
+
 @router.get("/general")
 def read_general_statistics(
     db: Session = Depends(get_db_session),
 ) -> GeneralStatistics:
-    return get_general_statistics_home_page(db=db)
+    return get_stats_snapshot(db=db, key="general")
 
 
 @router.get("/boulder/best-rated")
 def read_general_best_rated_boulders(
     db: Session = Depends(get_db_session),
 ) -> List[BoulderByGrade]:
-    boulders = get_general_best_rated_boulders(db=db)
+    boulders = get_stats_snapshot(db=db, key="best_rated_boulders")
     return boulders
 
 
@@ -41,7 +60,96 @@ def read_general_best_rated_boulders(
 def read_general_most_ascents_boulders(
     db: Session = Depends(get_db_session),
 ) -> List[BoulderByGrade]:
-    boulders = get_general_most_ascents_boulders(db=db)
+    boulders = get_stats_snapshot(db=db, key="most_ascents_boulders")
+    return boulders
+
+
+@router.get("/boulder/hardest")
+def read_general_hardest_boulders(
+    db: Session = Depends(get_db_session),
+) -> List[BoulderWithAscentCount]:
+    boulders = get_stats_snapshot(db=db, key="hardest_boulders")
+    return boulders
+
+
+@router.get("/boulder/rating/distribution")
+def read_general_rating_distribution(
+    db: Session = Depends(get_db_session),
+) -> List[RatingDistribution]:
+    ratings = get_stats_snapshot(db=db, key="rating_distribution")
+    return ratings
+
+
+@router.get("/area/most-ascents")
+def read_general_areas_most_ascents(
+    db: Session = Depends(get_db_session),
+) -> List[AreaCount]:
+    areas = get_stats_snapshot(db=db, key="areas_most_ascents")
+    return areas
+
+
+@router.get("/boulder/leaderboard")
+def read_boulder_leaderboard(
+    metric: LeaderboardMetric = "ascents",
+    min_ascents: int = Query(1, ge=1),
+    area: str = None,
+    crag: str = None,
+    size: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db_session),
+) -> List[BoulderByGrade]:
+    leaderboard = get_leaderboard(
+        db=db,
+        metric=metric,
+        min_ascents=min_ascents,
+        area_slug=area,
+        crag_slug=crag,
+        size=size,
+    )
+    return leaderboard
+
+
+@router.get("/boulder/trending")
+def read_trending_boulders(
+    window: int = Query(TRENDING_DAYS, ge=1, le=365),
+    area: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db_session),
+) -> List[TrendingBoulder]:
+    boulders = get_trending_boulders(
+        db=db, window_days=window, area_slug=area, limit=limit
+    )
+    return boulders
+
+
+@router.get("/boulder/misgraded")
+def read_misgraded_boulders(
+    direction: Literal["under", "over"] = "under",
+    min_votes: int = Query(MIN_GRADE_VOTES, ge=1),
+    area: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db_session),
+) -> List[MisgradedBoulder]:
+    boulders = get_misgraded_boulders(
+        db=db,
+        direction=direction,
+        min_votes=min_votes,
+        area_slug=area,
+        limit=limit,
+    )
+    return boulders
+
+
+@router.get("/boulder/style")
+def read_boulders_by_style(
+    style: List[StyleFlag] = Query(...),
+    area: str = None,
+    crag: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db_session),
+) -> List[BoulderWithAscentCount]:
+    boulders = get_boulders_by_style(
+        db=db, styles=style, area_slug=area, crag_slug=crag, limit=limit
+    )
     return boulders
 
 
@@ -49,7 +157,7 @@ def read_general_most_ascents_boulders(
 def read_general_grade_distribution(
     db: Session = Depends(get_db_session),
 ) -> List[GradeDistribution]:
-    boulders = get_general_grade_distribution(db=db)
+    boulders = get_stats_snapshot(db=db, key="grade_distribution")
     return boulders
 
 
@@ -57,21 +165,40 @@ def read_general_grade_distribution(
 def read_general_ascents_per_grade(
     db: Session = Depends(get_db_session),
 ) -> List[GradeAscents]:
-    grades = get_general_ascents_per_grade(db=db)
+    grades = get_stats_snapshot(db=db, key="ascents_per_grade")
     return grades
 
 
 @router.get("/time/ascent/per-month")
 def read_general_repeats_per_month(
-    db: Session = Depends(get_db_session), grade: str = None
+    db: Session = Depends(get_db_session),
+    grade: str = None,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
 ) -> List[AscentsPerMonth]:
-    ascents = get_general_ascents_per_month(db=db, grade=grade)
+    ascents = get_general_ascents_per_month(
+        db=db, grade=grade, date_from=date_from, date_to=date_to
+    )
     return ascents
 
 
 @router.get("/time/ascent/per-year")
 def read_general_repeats_per_year(
-    db: Session = Depends(get_db_session), grade: str = None
+    db: Session = Depends(get_db_session),
+    grade: str = None,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
 ) -> List[AscentsPerYear]:
-    ascents = get_general_ascents_per_year(db=db, grade=grade)
+    ascents = get_general_ascents_per_year(
+        db=db, grade=grade, date_from=date_from, date_to=date_to
+    )
     return ascents
+
+
+@router.get("/climbers")
+def read_general_distinct_climbers(
+    db: Session = Depends(get_db_session),
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
+) -> DistinctClimbers:
+    return get_distinct_climbers(db=db, date_from=date_from, date_to=date_to)
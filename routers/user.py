@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from crud.user import get_user, get_user_stats
+from database import get_db_session
+from schemas.user import User, UserProfileStats
+
+router = APIRouter(prefix="/user", tags=["user"])
+
+
+@router.get("/{user_id}")
+def read_user(
+    user_id: int,
+    db: Session = Depends(get_db_session),
+) -> User:
+    user = get_user(db=db, user_id=user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+@router.get("/{user_id}/stats")
+def read_user_stats(
+    user_id: int,
+    db: Session = Depends(get_db_session),
+) -> UserProfileStats:
+    stats = get_user_stats(db=db, user_id=user_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="User not found")
+    return stats
@@ -17,6 +17,11 @@ class Area(BaseModel):
         from_attributes = True
 
 
+class AreaPage(BaseModel):
+    areas: List[Area]
+    next_cursor: str | None = None
+
+
 class AreaDetail(BaseModel):
     id: int
     name: str
@@ -50,11 +55,27 @@ class AreaStats(BaseModel):
     grade_distribution: List["GradeDistribution"]
     most_climbed_boulders: List["BoulderWithAscentCount"]
     best_rated_boulders: List["BoulderWithAscentCount"]
+    ascents_per_month: List["AscentsPerMonth"]
+    ascents_per_weekday: List["AscentsPerWeekday"]
 
     class Config:
         from_attributes = True
 
 
+class AreaComparisonRow(BaseModel):
+    area: Area
+    number_of_boulders: int
+    ascents: int
+    average_grade: Union["Grade", None]
+    # Aligned with AreaComparison.grades
+    boulders_per_grade: List[int]
+
+
+class AreaComparison(BaseModel):
+    grades: List["Grade"]
+    areas: List[AreaComparisonRow]
+
+
 class AreaCount(BaseModel):
     area: Area
     count: int
@@ -66,3 +87,4 @@ class AreaCount(BaseModel):
 from schemas.grade import Grade, GradeDistribution
 from schemas.crag import Crag, CragWithCounts
 from schemas.boulder import BoulderWithAscentCount
+from schemas.ascent import AscentsPerMonth, AscentsPerWeekday
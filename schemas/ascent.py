@@ -1,6 +1,11 @@
 from datetime import date
+from typing import Dict, List, Literal
 from pydantic import BaseModel
 
+from models.ascent import STYLE_FLAGS
+
+StyleFlag = Literal[STYLE_FLAGS]
+
 
 class Ascent(BaseModel):
     boulder_id: int
@@ -68,6 +73,14 @@ class AscentsPerMonth(BaseModel):
         from_attributes = True
 
 
+class AscentsPerWeekday(BaseModel):
+    weekday: str
+    percentage: float
+
+    class Config:
+        from_attributes = True
+
+
 class AscentsPerMonthWithGeneral(BaseModel):
     month: str
     boulder: float
@@ -84,5 +97,38 @@ class AscentsPerYear(BaseModel):
     class Config:
         from_attributes = True
 
+
+class StyleCount(BaseModel):
+    style: str
+    ascents: int
+    percentage: float
+
+    class Config:
+        from_attributes = True
+
+
+class StyleDistribution(BaseModel):
+    ascents: int
+    flagged_ascents: int
+    styles: List[StyleCount]
+
+    class Config:
+        from_attributes = True
+
+
+class StyleProfile(BaseModel):
+    ascents: int
+    styles: Dict[str, float]
+
+    @classmethod
+    def from_vector(cls, ascents, vector):
+        return cls(
+            ascents=ascents,
+            styles={
+                style: round(float(value), 4)
+                for style, value in zip(STYLE_FLAGS, vector)
+            },
+        )
+
 from models.grade import Grade
 from schemas.user import User
\ No newline at end of file
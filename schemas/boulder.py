@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Literal
 from pydantic import BaseModel
 
+LeaderboardMetric = Literal["rating", "ascents", "bayesian", "trending"]
+
 
 class Boulder(BaseModel):
     id: int
@@ -16,12 +18,26 @@ class Boulder(BaseModel):
         from_attributes = True
 
 
+class BoulderPage(BaseModel):
+    boulders: List[Boulder]
+    next_cursor: str | None = None
+
+
 class BoulderWithFullDetail(Boulder):
     grade: "Grade"
     crag: "Crag"
     area: "Area"
+    ascent_count: int = 0
+    # First page of the ascents, newest first, see /boulder/{slug}/ascents
     ascents: List["AscentRead"] = []
+    ascents_next_cursor: str | None = None
     aggregated_ascents: List["AscentsPerMonthWithGeneral"] = []
+    style_profile: "StyleProfile | None" = None
+
+
+class BoulderAscentPage(BaseModel):
+    ascents: List["AscentRead"]
+    next_cursor: str | None = None
 
 
 class BoulderWithAscentCount(Boulder):
@@ -45,6 +61,22 @@ class RecommendationOutput(BoulderWithAscentCount):
     score: float
 
 
+class TrendingBoulder(BoulderWithAscentCount):
+    recent_ascents: int
+    trend: float
+
+
+class MisgradedBoulder(BoulderWithAscentCount):
+    votes: int
+    consensus_grade: "Grade"
+    grade_offset: float
+
+
+class RatingDistribution(BaseModel):
+    rating: float
+    boulders: int
+
+
 class BoulderByGrade(BaseModel):
     grade: "Grade"
     boulders: List["BoulderWithAscentCount"]
@@ -53,8 +85,15 @@ class BoulderByGrade(BaseModel):
 from schemas.crag import Crag
 from schemas.area import Area
 from schemas.grade import Grade
-from schemas.ascent import AscentRead, AscentsPerMonthWithGeneral
+from schemas.ascent import (
+    AscentRead,
+    AscentsPerMonthWithGeneral,
+    StyleProfile,
+)
 
 BoulderWithFullDetail.model_rebuild()
+BoulderAscentPage.model_rebuild()
 BoulderWithAscentCount.model_rebuild()
+TrendingBoulder.model_rebuild()
+MisgradedBoulder.model_rebuild()
 BoulderByGrade.model_rebuild()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Union
 from pydantic import BaseModel
 
 
@@ -25,5 +25,23 @@ class CountryDetail(BaseModel):
         from_attributes = True
 
 
+class CountryDetailPage(BaseModel):
+    countries: List[CountryDetail]
+    next_cursor: str | None = None
+
+
+class CountryStats(BaseModel):
+    country: Country
+    number_of_areas: int
+    number_of_boulders: int
+    ascents: int
+    average_grade: Union["Grade", None]
+    grade_distribution: List["GradeDistribution"]
+    top_areas: List["AreaCount"]
+    ascents_per_month: List["AscentsPerMonth"]
+
+
 from schemas.crag import Crag
-from schemas.area import Area
+from schemas.area import Area, AreaCount
+from schemas.ascent import AscentsPerMonth
+from schemas.grade import Grade, GradeDistribution
@@ -52,8 +52,11 @@ class CragStats(BaseModel):
     grade_distribution: List["GradeDistribution"]
     most_climbed_boulders: List["BoulderWithAscentCount"]
     best_rated_boulders: List["BoulderWithAscentCount"]
+    ascents_per_month: List["AscentsPerMonth"]
+    ascents_per_weekday: List["AscentsPerWeekday"]
 
 
 from schemas.area import Area
 from schemas.grade import Grade, GradeDistribution
 from schemas.boulder import BoulderWithAscentCount
+from schemas.ascent import AscentsPerMonth, AscentsPerWeekday
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from typing import List
 from pydantic import BaseModel
 
 
@@ -13,4 +14,16 @@ class GeneralStatistics(BaseModel):
         from_attributes = True
 
 
-from schemas.grade import Grade
+class StatsBundle(BaseModel):
+    general: GeneralStatistics
+    best_rated_boulders: List[BoulderByGrade]
+    most_ascents_boulders: List[BoulderByGrade]
+    grade_distribution: List[GradeDistribution]
+    ascents_per_grade: List[GradeAscents]
+    ascents_per_month: List[AscentsPerMonth]
+    ascents_per_year: List[AscentsPerYear]
+
+
+from schemas.ascent import AscentsPerMonth, AscentsPerYear
+from schemas.boulder import BoulderByGrade
+from schemas.grade import Grade, GradeAscents, GradeDistribution
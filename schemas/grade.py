@@ -1,3 +1,4 @@
+from typing import List
 from pydantic import BaseModel
 
 
@@ -25,3 +26,22 @@ class GradeAscents(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class GradeVotes(BaseModel):
+    grade: Grade
+    votes: int
+
+    class Config:
+        from_attributes = True
+
+
+class GradeConsensus(BaseModel):
+    votes: int
+    consensus_grade: Grade | None = None
+    # Mean logged grade minus the boulder grade, in grade steps
+    grade_offset: float
+    histogram: List[GradeVotes]
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,8 @@
+from typing import List
 from pydantic import BaseModel
 
+from schemas.grade import Grade, GradeAscents
+
 
 class User(BaseModel):
     id: int
@@ -19,3 +22,33 @@ class UserAscentVolume(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class DistinctClimbers(BaseModel):
+    climbers: int
+    relative_error: float
+
+    class Config:
+        from_attributes = True
+
+
+class ScopeClimber(User):
+    ascents: int
+    max_grade: Grade
+
+
+class UserProfileStats(BaseModel):
+    user: User
+    ascents: int
+    average_grade: Grade | None = None
+    hardest_grade: Grade | None = None
+    hardest_boulder: "Boulder | None" = None
+    favourite_area: "Area | None" = None
+    favourite_area_ascents: int = 0
+    grade_distribution: List[GradeAscents] = []
+
+
+from schemas.area import Area
+from schemas.boulder import Boulder
+
+UserProfileStats.model_rebuild()
@@ -0,0 +1,210 @@
+"""
+Fixtures of the test suite, run against an in-memory SQLite database
+created from the models.
+"""
+
+import importlib
+import os
+import pkgutil
+from datetime import date
+from types import SimpleNamespace
+
+# database.py creates its engine at import time
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import models  # noqa: E402
+from analytics import ascent_analytics  # noqa: E402
+from models.area import Area  # noqa: E402
+from models.ascent import Ascent  # noqa: E402
+from models.base import Base  # noqa: E402
+from models.boulder import Boulder  # noqa: E402
+from models.country import Country  # noqa: E402
+from models.crag import Crag  # noqa: E402
+from models.grade import Grade  # noqa: E402
+from models.user import User  # noqa: E402
+
+# Register every table on Base.metadata
+for module in pkgutil.iter_modules(models.__path__):
+    importlib.import_module(f"models.{module.name}")
+
+
+@pytest.fixture(autouse=True)
+def reset_ascent_analytics():
+    # The columns are kept per process, each test has its own database
+    ascent_analytics._columns = None
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def add_ascent(db):
+    """Add an ascent of a boulder by a user on a day."""
+
+    def add(boulder: Boulder, user: User, day: date) -> Ascent:
+        ascent = Ascent(
+            source=1,
+            log_date=day,
+            boulder=boulder,
+            user=user,
+            log_grade=boulder.grade,
+        )
+        db.add(ascent)
+        db.flush()
+        return ascent
+
+    return add
+
+
+@pytest.fixture
+def data(db, add_ascent):
+    """
+    Two areas of one country:
+
+    - fontainebleau: crags cuvier (b1 6A, b2 7A) and apremont (b3 7A,
+      b5 6A without ascents)
+    - annot: crag la-chambre (b4 8C)
+
+    b1 has 3 ascents, b2 1, b3 2 and b4 1.
+    """
+    grades = {
+        value: Grade(
+            value=value,
+            correspondence=correspondence,
+            eightanu_correspondence=correspondence,
+        )
+        for value, correspondence in (("6A", 10), ("7A", 14), ("8C", 24))
+    }
+    france = Country(name="France", name_normalized="france", slug="france")
+    fontainebleau = Area(
+        name="Fontainebleau",
+        name_normalized="fontainebleau",
+        slug="fontainebleau",
+        external_slug="fontainebleau",
+        url="https://example.com/fontainebleau",
+        country=france,
+    )
+    annot = Area(
+        name="Annot",
+        name_normalized="annot",
+        slug="annot",
+        external_slug="annot",
+        url="https://example.com/annot",
+        country=france,
+    )
+    cuvier = Crag(
+        name="Cuvier",
+        name_normalized="cuvier",
+        slug="cuvier",
+        url="https://example.com/cuvier",
+        area=fontainebleau,
+    )
+    apremont = Crag(
+        name="Apremont",
+        name_normalized="apremont",
+        slug="apremont",
+        url="https://example.com/apremont",
+        area=fontainebleau,
+    )
+    la_chambre = Crag(
+        name="La Chambre",
+        name_normalized="la chambre",
+        slug="la-chambre",
+        url="https://example.com/la-chambre",
+        area=annot,
+    )
+
+    def boulder(number, crag, grade, rating):
+        return Boulder(
+            id=number,
+            external_db_id=number,
+            name=f"Boulder {number}",
+            name_normalized=f"boulder {number}",
+            slug=f"boulder-{number}",
+            url=f"https://example.com/boulder-{number}",
+            rating=rating,
+            crag=crag,
+            grade=grades[grade],
+        )
+
+    b1 = boulder(1, cuvier, "6A", 4.0)
+    b2 = boulder(2, cuvier, "7A", None)
+    b3 = boulder(3, apremont, "7A", 3.5)
+    b4 = boulder(4, la_chambre, "8C", 5.0)
+    b5 = boulder(5, apremont, "6A", None)
+    users = [
+        User(
+            id=number,
+            name=f"User {number}",
+            name_normalized=f"user {number}",
+            slug=f"user-{number}",
+        )
+        for number in range(1, 4)
+    ]
+    db.add_all([b1, b2, b3, b4, b5, *users])
+    db.flush()
+
+    u1, u2, u3 = users
+    for boulder_, user, day in (
+        (b1, u1, date(2024, 1, 1)),  # Monday
+        (b1, u2, date(2024, 1, 6)),  # Saturday
+        (b1, u3, date(2024, 7, 7)),  # Sunday
+        (b2, u1, date(2024, 3, 5)),  # Tuesday
+        (b3, u2, date(2024, 3, 6)),  # Wednesday
+        (b3, u3, date(2023, 12, 31)),  # Sunday
+        (b4, u1, date(2024, 7, 4)),  # Thursday
+    ):
+        add_ascent(boulder_, user, day)
+    db.commit()
+
+    return SimpleNamespace(
+        grades=grades,
+        country=france,
+        fontainebleau=fontainebleau,
+        annot=annot,
+        cuvier=cuvier,
+        apremont=apremont,
+        la_chambre=la_chambre,
+        boulders=[b1, b2, b3, b4, b5],
+        users=users,
+    )
+
+
+@pytest.fixture
+def unloaded_boulder(db, data):
+    """
+    b6 8C in a new crag of annot, added after the analytics columns were
+    loaded, as when another process ran the refresh.
+    """
+    ascent_analytics.get_columns(db)
+    crag = Crag(
+        name="Le Nouveau",
+        name_normalized="le nouveau",
+        slug="le-nouveau",
+        url="https://example.com/le-nouveau",
+        area=data.annot,
+    )
+    boulder = Boulder(
+        id=6,
+        external_db_id=6,
+        name="Boulder 6",
+        name_normalized="boulder 6",
+        slug="boulder-6",
+        url="https://example.com/boulder-6",
+        rating=4.5,
+        crag=crag,
+        grade=data.grades["8C"],
+    )
+    db.add(boulder)
+    db.commit()
+    return boulder
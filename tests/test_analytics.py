@@ -0,0 +1,137 @@
+from datetime import date
+
+import numpy as np
+
+from analytics import AscentAnalytics
+from models.data_revision import DataRevision
+
+
+def boulder_ids(columns, mask):
+    return columns.boulder_id[mask].tolist()
+
+
+def test_boulder_rows_are_sorted_with_their_ascents(db, data):
+    columns = AscentAnalytics().get_columns(db)
+    b1, b2, b3, b4, b5 = data.boulders
+
+    assert columns.boulder_id.tolist() == [b1.id, b2.id, b3.id, b4.id, b5.id]
+    assert columns.boulder_ascents.tolist() == [3, 1, 2, 1, 0]
+    assert columns.ascent_count == 7
+    assert np.isnan(columns.boulder_rating[1])
+
+
+def test_boulder_mask_by_area_and_crag(db, data):
+    columns = AscentAnalytics().get_columns(db)
+    b1, b2, b3, b4, b5 = data.boulders
+
+    area_mask = columns.boulder_mask(area_ids=[data.fontainebleau.id])
+    assert boulder_ids(columns, area_mask) == [b1.id, b2.id, b3.id, b5.id]
+    crag_mask = columns.boulder_mask(crag_ids=[data.la_chambre.id])
+    assert boulder_ids(columns, crag_mask) == [b4.id]
+    assert not columns.boulder_mask(area_ids=[]).any()
+
+
+def test_ascent_counts_in_scope(db, data):
+    columns = AscentAnalytics().get_columns(db)
+    b1, b2, b3, b4, b5 = data.boulders
+
+    area_mask = columns.ascent_mask(area_ids=[data.fontainebleau.id])
+    assert columns.ascents_per_grade(area_mask) == {10: 3, 14: 3}
+    assert columns.ascents_per_grade(columns.ascent_mask(min_grade=14)) == {
+        14: 3,
+        24: 1,
+    }
+    assert columns.ascents_per_crag() == {
+        data.cuvier.id: 4,
+        data.apremont.id: 2,
+        data.la_chambre.id: 1,
+    }
+    assert columns.ascents_per_area() == {
+        data.fontainebleau.id: 6,
+        data.annot.id: 1,
+    }
+    assert columns.ascent_mask(boulder_ids=[b3.id]).sum() == 2
+
+
+def test_grades_of_the_boulders(db, data):
+    columns = AscentAnalytics().get_columns(db)
+    area_mask = columns.boulder_mask(area_ids=[data.fontainebleau.id])
+
+    assert columns.boulders_per_grade(area_mask) == {10: 2, 14: 2}
+    # (10 + 14 + 14 + 10) / 4 = 12
+    assert columns.average_grade(area_mask) == 12
+    # (10 + 14 + 14 + 24 + 10) / 5 = 14.4
+    assert columns.average_grade() == 14
+    assert columns.average_grade(np.zeros(5, dtype=bool)) is None
+
+    boulders, ascents = columns.area_grade_matrix(
+        [data.annot.id, data.fontainebleau.id], slots=25
+    )
+    assert boulders[0].nonzero()[0].tolist() == [24]
+    assert boulders[1][[10, 14]].tolist() == [2, 2]
+    assert ascents.tolist() == [1, 6]
+
+
+def test_top_boulders_break_ties_on_id_and_rank_nan_last(db, data):
+    columns = AscentAnalytics().get_columns(db)
+    b1, b2, b3, b4, b5 = data.boulders
+    everything = np.ones(columns.boulder_count, dtype=bool)
+
+    scores = np.array([1.0, np.nan, 2.0, 1.0, 0.5])
+    assert columns.top_boulders(scores, everything) == [
+        b3.id,
+        b1.id,
+        b4.id,
+        b5.id,
+        b2.id,
+    ]
+    assert columns.top_boulders(scores, everything, limit=2) == [
+        b3.id,
+        b1.id,
+    ]
+
+
+def test_refresh_appends_new_rows(db, data, add_ascent):
+    analytics = AscentAnalytics()
+    columns = analytics.get_columns(db)
+    b1, b2, b3, b4, b5 = data.boulders
+
+    add_ascent(b5, data.users[0], date(2024, 5, 1))
+    db.commit()
+    refreshed = analytics.refresh(db)
+
+    assert refreshed.version != columns.version
+    assert refreshed.boulder_ascents.tolist() == [3, 1, 2, 1, 1]
+    full = AscentAnalytics().get_columns(db)
+    for name in ("ascent_boulder", "user_id", "log_date", "area_id"):
+        assert (
+            getattr(refreshed, name).tolist() == getattr(full, name).tolist()
+        )
+
+
+def test_refresh_reloads_after_a_data_revision(db, data):
+    analytics = AscentAnalytics()
+    analytics.get_columns(db)
+    b1, b2, b3, b4, b5 = data.boulders
+
+    # Existing rows changed: ids do not move, the revision does
+    for ascent in b1.ascents:
+        ascent.boulder_id = b5.id
+    b4.rating = 1.0
+    DataRevision.bump(db)
+    db.commit()
+    columns = analytics.refresh(db)
+
+    assert columns.boulder_ascents.tolist() == [0, 1, 2, 1, 3]
+    assert columns.boulder_rating[3] == 1.0
+
+
+def test_boulder_values_of_boulders_without_a_row(db, data):
+    columns = AscentAnalytics().get_columns(db)
+    b1, b2, b3, b4, b5 = data.boulders
+
+    # Below, between and above the loaded ids
+    assert columns.boulder_values(
+        columns.boulder_ascents, [b3.id, 99, 0, b1.id]
+    ) == {b3.id: 2, 99: 0, 0: 0, b1.id: 3}
+    assert list(columns.boulder_values(columns.boulder_ascents, [])) == []
@@ -0,0 +1,16 @@
+from crud.boulder import get_boulders_batch
+
+
+def test_boulders_batch_keeps_the_request_order(db, data):
+    b1, b2, b3, b4, b5 = data.boulders
+
+    by_id = get_boulders_batch(db, boulder_ids=[b3.id, 999, b1.id])
+    assert [(boulder.id, boulder.ascents) for boulder in by_id] == [
+        (b3.id, 2),
+        (b1.id, 3),
+    ]
+    by_slug = get_boulders_batch(
+        db, slugs=["boulder-4", "unknown", "boulder-2"]
+    )
+    assert [boulder.id for boulder in by_slug] == [b4.id, b2.id]
+    assert get_boulders_batch(db) == []
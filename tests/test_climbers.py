@@ -0,0 +1,29 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from crud.climbers import get_distinct_climbers, update_climber_sketches
+from models.climber_sketch import ClimberSketch
+
+
+def test_climber_sketches_of_ascents_before_1970(db, data, add_ascent):
+    b1, b2, b3, b4, b5 = data.boulders
+    add_ascent(b4, data.users[1], date(1965, 5, 20))
+    update_climber_sketches(db, data_version=None)
+    db.commit()
+
+    months = db.scalars(
+        select(ClimberSketch.month)
+        .where(
+            ClimberSketch.scope == "crag",
+            ClimberSketch.scope_id == data.la_chambre.id,
+        )
+        .order_by(ClimberSketch.month)
+    ).all()
+    assert months == [date(1965, 5, 1), date(2024, 7, 1)]
+    climbers = get_distinct_climbers(db, "crag", [data.la_chambre.id])
+    assert climbers.climbers == 2
+    old_climbers = get_distinct_climbers(
+        db, "area", [data.annot.id], date_to=date(1969, 12, 31)
+    )
+    assert old_climbers.climbers == 1
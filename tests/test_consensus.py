@@ -0,0 +1,26 @@
+import numpy as np
+
+from crud.consensus import get_misgraded_boulders
+from models.boulder_grade_consensus import BoulderGradeConsensus
+
+
+def test_misgraded_boulders_not_loaded_yet(db, data, unloaded_boulder):
+    histogram = np.zeros(25, dtype=np.int32)
+    histogram[14] = 3
+    db.add(
+        BoulderGradeConsensus(
+            boulder_id=unloaded_boulder.id,
+            votes=3,
+            consensus_grade=data.grades["7A"],
+            grade_offset=-10.0,
+            histogram=histogram.tobytes(),
+        )
+    )
+    db.commit()
+
+    misgraded = get_misgraded_boulders(db, direction="over", min_votes=1)
+
+    assert [
+        (boulder.id, boulder.ascents, boulder.consensus_grade.value)
+        for boulder in misgraded
+    ] == [(unloaded_boulder.id, 0, "7A")]
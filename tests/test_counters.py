@@ -0,0 +1,104 @@
+from datetime import date
+
+from crud.area import get_area_stats
+from crud.boulder import get_boulder
+from crud.counters import reconcile_counters, update_counters
+from crud.deduplicate import move_ascents
+from models.area import Area
+from models.boulder import Boulder
+
+
+def counts(data):
+    return (
+        [boulder.ascents_count for boulder in data.boulders],
+        [
+            (crag.boulders_count, crag.ascents_count)
+            for crag in (data.cuvier, data.apremont, data.la_chambre)
+        ],
+        [
+            (area.boulders_count, area.ascents_count)
+            for area in (data.fontainebleau, data.annot)
+        ],
+    )
+
+
+def test_update_counters_agrees_with_reconcile(db, data, add_ascent):
+    b1, b2, b3, b4, b5 = data.boulders
+    update_counters(db, data_version="")
+    add_ascent(b5, data.users[0], date(2024, 8, 1))
+    update_counters(db, data_version="")
+    db.commit()
+
+    assert counts(data) == (
+        [3, 1, 2, 1, 1],
+        [(2, 4), (2, 3), (1, 1)],
+        [(4, 7), (1, 1)],
+    )
+    assert reconcile_counters(db) == 0
+
+
+def test_moved_ascents_above_the_watermark_are_counted_once(
+    db, data, add_ascent
+):
+    b1, b2, b3, b4, b5 = data.boulders
+    update_counters(db, data_version="")
+    db.commit()
+    # Not counted yet when the ascents move
+    add_ascent(b4, data.users[1], date(2024, 8, 1))
+
+    move_ascents(db, b4, b1)
+    update_counters(db, data_version="")
+    db.commit()
+
+    assert b1.ascents_count == 5
+    assert b4.ascents_count == 0
+    assert (data.annot.boulders_count, data.annot.ascents_count) == (1, 0)
+    assert reconcile_counters(db) == 0
+
+
+def test_area_stats_of_an_area_without_boulders(db, data):
+    db.add(
+        Area(
+            name="Empty",
+            name_normalized="empty",
+            slug="empty",
+            external_slug="empty",
+            url="https://example.com/empty",
+            country=data.country,
+        )
+    )
+    db.commit()
+
+    assert get_area_stats(db, "empty") is None
+
+
+def test_update_counters_adds_new_boulders(db, data):
+    update_counters(db, data_version="")
+    db.commit()
+    data.annot.boulders_count = 99
+    db.commit()
+
+    boulder = Boulder(
+        id=6,
+        external_db_id=6,
+        name="Boulder 6",
+        name_normalized="boulder 6",
+        slug="boulder-6",
+        crag=data.la_chambre,
+        grade=data.grades["6A"],
+    )
+    db.add(boulder)
+    update_counters(db, data_version="")
+    db.commit()
+
+    assert data.la_chambre.boulders_count == 2
+    # Only the new boulder is added, the drift waits for the reconcile
+    assert data.annot.boulders_count == 100
+    assert reconcile_counters(db) == 1
+    assert data.annot.boulders_count == 2
+
+
+def test_boulder_detail_reads_the_ascent_counter(db, data):
+    reconcile_counters(db)
+
+    assert get_boulder(db, "boulder-1").ascent_count == 3
@@ -0,0 +1,32 @@
+from crud.counters import reconcile_counters
+from crud.country import get_country_stats
+from crud.seasonality import rebuild_season_histograms
+
+
+def test_country_stats_of_the_areas(db, data):
+    reconcile_counters(db)
+    rebuild_season_histograms(db)
+    db.commit()
+
+    stats = get_country_stats(db, "france")
+
+    assert stats.number_of_areas == 2
+    assert stats.number_of_boulders == 5
+    assert stats.ascents == 7
+    # (10 + 10 + 14 + 14 + 24) / 5 rounds to 7A
+    assert stats.average_grade.value == "7A"
+    assert {
+        distribution.grade.value: distribution.boulders
+        for distribution in stats.grade_distribution
+    } == {"7A": 2, "8C": 1}
+    assert [(top.area.slug, top.count) for top in stats.top_areas] == [
+        ("fontainebleau", 6),
+        ("annot", 1),
+    ]
+    percentages = [month.percentage for month in stats.ascents_per_month]
+    assert percentages[0] == percentages[2] == percentages[6] == 28.6
+    assert percentages[11] == 14.3
+
+
+def test_country_stats_of_an_unknown_country(db, data):
+    assert get_country_stats(db, "unknown") is None
@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+from crud.boulder import get_boulder_ascents
+from crud.country import get_all_countries_with_areas
+from helper import encode_cursor
+
+
+def test_keyset_page_follows_the_cursor(db, data):
+    page = get_all_countries_with_areas(db, limit=1)
+    assert [country.slug for country in page.countries] == ["france"]
+    assert page.next_cursor is None
+
+    cursor = encode_cursor("Austria", 1)
+    page = get_all_countries_with_areas(db, cursor=cursor)
+    assert [country.slug for country in page.countries] == ["france"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        encode_cursor("France", 2**63),
+        encode_cursor("France", -(2**63) - 1),
+        encode_cursor("France", float("inf")),
+        encode_cursor("France"),
+        "not a cursor",
+    ],
+)
+def test_keyset_page_rejects_invalid_cursors(db, data, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        get_all_countries_with_areas(db, cursor=cursor)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        encode_cursor("2024-01-01", 2**63),
+        encode_cursor("2024-01-01", float("inf")),
+        encode_cursor("January", 1),
+    ],
+)
+def test_boulder_ascent_page_rejects_invalid_cursors(db, data, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        get_boulder_ascents(db, "boulder-1", cursor=cursor)
+
+
+def test_boulder_ascent_pages_are_newest_first(db, data):
+    first = get_boulder_ascents(db, "boulder-1", limit=2)
+    second = get_boulder_ascents(
+        db, "boulder-1", cursor=first.next_cursor, limit=2
+    )
+
+    assert [ascent.log_date for ascent in first.ascents] == [
+        date(2024, 7, 7),
+        date(2024, 1, 6),
+    ]
+    assert [ascent.log_date for ascent in second.ascents] == [date(2024, 1, 1)]
+    assert second.next_cursor is None
@@ -0,0 +1,10 @@
+import numpy as np
+
+from helper import round_half_up
+
+
+def test_round_half_up_like_the_database():
+    assert round_half_up(12.5) == 13
+    assert round_half_up(13.5) == 14
+    assert isinstance(round_half_up(np.float64(2.4)), int)
+    assert round_half_up(np.array([0.5, 1.49, 2.5])).tolist() == [1, 1, 3]
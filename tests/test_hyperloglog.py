@@ -0,0 +1,59 @@
+import numpy as np
+
+import hyperloglog
+
+
+def sketch(values):
+    return hyperloglog.merge(
+        registers
+        for _, registers in hyperloglog.sketch_groups(
+            np.zeros(len(values), dtype=np.int64),
+            hyperloglog.hash_values(values),
+        )
+    )
+
+
+def test_estimate_of_a_known_cardinality():
+    for count in (100, 1_000, 50_000):
+        values = np.arange(count)
+        # Repeated values are counted once
+        estimate = hyperloglog.estimate(sketch(np.r_[values, values]))
+        assert abs(estimate - count) <= 3 * hyperloglog.RELATIVE_ERROR * count
+    assert hyperloglog.estimate(hyperloglog.empty()) == 0
+
+
+def test_union_of_two_sketches():
+    first = sketch(np.arange(0, 6_000))
+    second = sketch(np.arange(4_000, 10_000))
+
+    union = hyperloglog.merge([first, second])
+
+    assert np.array_equal(union, sketch(np.arange(10_000)))
+    assert abs(hyperloglog.estimate(union) - 10_000) <= (
+        3 * hyperloglog.RELATIVE_ERROR * 10_000
+    )
+    round_trip = hyperloglog.from_bytes(hyperloglog.to_bytes(union))
+    assert np.array_equal(round_trip, union)
+
+
+def test_sketches_folded_per_scope_and_month():
+    # (scope, month) of each value, packed like crud.climbers does
+    scopes = np.array([2, 1, 2, 1, 1, 2])
+    months = np.array([0, 0, 1, 0, 1, 1])
+    values = np.array([10, 11, 12, 13, 11, 14])
+
+    groups = dict(
+        hyperloglog.sketch_groups(
+            (scopes << 20) | months, hyperloglog.hash_values(values)
+        )
+    )
+
+    assert list(groups) == [(1 << 20), (1 << 20) | 1, (2 << 20), (2 << 20) | 1]
+    assert np.array_equal(groups[1 << 20], sketch([11, 13]))
+    assert np.array_equal(groups[(2 << 20) | 1], sketch([12, 14]))
+    assert (
+        hyperloglog.estimate(
+            hyperloglog.merge([groups[1 << 20], groups[(1 << 20) | 1]])
+        )
+        == 2
+    )
@@ -0,0 +1,85 @@
+from datetime import date
+
+import numpy as np
+
+from analytics import AscentAnalytics, ascent_analytics
+from crud.counters import reconcile_counters
+from crud.leaderboard import (
+    get_trending_boulders,
+    refresh_bayesian_ratings,
+)
+from crud.stats import get_general_best_rated_boulders
+
+
+def test_bayesian_ratings_are_computed_from_the_database(db, data):
+    reconcile_counters(db)
+    refresh_bayesian_ratings(db, data_version="")
+    db.commit()
+
+    columns = AscentAnalytics().get_columns(db)
+    expected = columns.bayesian_rating()
+    stored = np.array(
+        [boulder.bayesian_rating for boulder in data.boulders], dtype=float
+    )
+    assert np.allclose(stored, expected, atol=1e-4, equal_nan=True)
+
+
+def test_bayesian_ratings_follow_the_counts_not_the_engine(db, data):
+    b1, b2, b3, b4, b5 = data.boulders
+    # The engine has cached the ascents before the counters moved
+    AscentAnalytics().get_columns(db)
+    b1.ascents_count, b3.ascents_count, b4.ascents_count = 0, 0, 0
+    refresh_bayesian_ratings(db, data_version="")
+
+    mean = (4.0 + 3.5 + 5.0) / 3
+    assert b1.bayesian_rating == round(mean, 4)
+    assert b2.bayesian_rating is None
+
+
+def test_best_rated_boulders_are_ranked_per_grade(db, data):
+    b1, b2, b3, b4, b5 = data.boulders
+    reconcile_counters(db)
+    refresh_bayesian_ratings(db, data_version="")
+    db.commit()
+
+    best_rated = {
+        by_grade.grade.value: [boulder.id for boulder in by_grade.boulders]
+        for by_grade in get_general_best_rated_boulders(db)
+    }
+    assert best_rated == {"8C": [b4.id], "7A": [b3.id], "6A": [b1.id]}
+
+
+def test_best_rated_boulders_not_loaded_yet(db, data, unloaded_boulder):
+    b1, b2, b3, b4, b5 = data.boulders
+    reconcile_counters(db)
+    refresh_bayesian_ratings(db, data_version="")
+    db.commit()
+
+    best_rated = {
+        by_grade.grade.value: [
+            (boulder.id, boulder.ascents) for boulder in by_grade.boulders
+        ]
+        for by_grade in get_general_best_rated_boulders(db)
+    }
+    assert best_rated["8C"] == [(b4.id, 1), (unloaded_boulder.id, 0)]
+
+
+def test_trending_boulders_are_cached_until_the_data_moves(
+    db, data, add_ascent
+):
+    b1, b2, b3, b4, b5 = data.boulders
+    add_ascent(b3, data.users[0], date.today())
+    db.commit()
+
+    trending = get_trending_boulders(db)
+    assert [boulder.id for boulder in trending] == [b3.id]
+    assert get_trending_boulders(db) is trending
+
+    add_ascent(b5, data.users[1], date.today())
+    db.commit()
+    ascent_analytics.refresh(db)
+
+    assert [boulder.id for boulder in get_trending_boulders(db)] == [
+        b5.id,
+        b3.id,
+    ]
@@ -0,0 +1,83 @@
+from datetime import date
+
+from sqlalchemy import func, select
+
+from crud.refresh import refresh_precomputed_statistics
+from crud.rollup import (
+    DAILY_ROLLUP,
+    get_new_ascent_range,
+    rebuild_ascent_daily_rollup,
+    update_ascent_daily_rollup,
+)
+from models.ascent import Ascent
+from models.ascent_daily_rollup import AscentDailyRollup
+from models.data_revision import DataRevision
+from models.refresh_state import RefreshState
+
+
+def rollup_rows(db):
+    return db.execute(
+        select(
+            AscentDailyRollup.day,
+            AscentDailyRollup.boulder_id,
+            AscentDailyRollup.ascents,
+        ).order_by(AscentDailyRollup.day, AscentDailyRollup.boulder_id)
+    ).all()
+
+
+def boulder_rollup_ascents(db, boulder):
+    return db.scalar(
+        select(func.coalesce(func.sum(AscentDailyRollup.ascents), 0)).where(
+            AscentDailyRollup.boulder_id == boulder.id
+        )
+    )
+
+
+def test_get_for_update_creates_the_state(db):
+    state = RefreshState.get_for_update(db, DAILY_ROLLUP)
+
+    assert state.name == DAILY_ROLLUP
+    assert state.last_ascent_id is None
+    assert state.data_revision == 0
+    assert RefreshState.get_for_update(db, DAILY_ROLLUP) is state
+
+
+def test_watermark_only_folds_new_ascents(db, data, add_ascent):
+    b1, b2, b3, b4, b5 = data.boulders
+    update_ascent_daily_rollup(db, data_version=None)
+    state = RefreshState.get_by_name(db, DAILY_ROLLUP)
+    max_ascent_id = db.scalar(select(func.max(Ascent.id)))
+    assert get_new_ascent_range(db, state) == (max_ascent_id, max_ascent_id)
+
+    # Same day and boulder as an ascent already folded in
+    add_ascent(b1, data.users[2], date(2024, 1, 1))
+    add_ascent(b5, data.users[0], date(2024, 2, 1))
+    update_ascent_daily_rollup(db, data_version=None)
+    # Nothing new, nothing added twice
+    update_ascent_daily_rollup(db, data_version=None)
+    db.commit()
+    incremental = rollup_rows(db)
+
+    assert (date(2024, 1, 1), b1.id, 2) in incremental
+    assert (date(2024, 2, 1), b5.id, 1) in incremental
+    assert sum(ascents for _, _, ascents in incremental) == 9
+    rebuild_ascent_daily_rollup(db)
+    assert rollup_rows(db) == incremental
+
+
+def test_refresh_rebuilds_when_the_data_revision_moves(db, data):
+    b1, b2, b3, b4, b5 = data.boulders
+    refresh_precomputed_statistics(db)
+    assert boulder_rollup_ascents(db, b1) == 3
+
+    for ascent in b1.ascents:
+        ascent.boulder_id = b5.id
+    DataRevision.bump(db)
+    db.commit()
+    refresh_precomputed_statistics(db)
+    db.expire_all()
+
+    assert boulder_rollup_ascents(db, b1) == 0
+    assert boulder_rollup_ascents(db, b5) == 3
+    assert (b1.ascents_count, b5.ascents_count) == (0, 3)
+    assert RefreshState.get_by_name(db, DAILY_ROLLUP).data_revision == 1
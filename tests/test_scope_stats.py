@@ -0,0 +1,49 @@
+from datetime import date
+
+from crud.leaderboard import refresh_bayesian_ratings
+from crud.rollup import update_ascent_daily_rollup
+from crud.scope_stats import get_scope_stats
+
+
+def test_scope_stats_are_cached_as_plain_values(db, data):
+    stats = get_scope_stats(db, "crag", "la-chambre")
+    db.close()
+
+    b1, b2, b3, b4, b5 = data.boulders
+    assert stats["average_grade"]["value"] == "8C"
+    assert stats["grade_distribution"] == [
+        {"grade": stats["average_grade"], "boulders": 1}
+    ]
+    assert [
+        (boulder["id"], boulder["ascents"])
+        for boulder in stats["most_climbed_boulders"]
+    ] == [(b4.id, 1)]
+    assert get_scope_stats(db, "crag", "la-chambre") is stats
+
+
+def test_scope_stats_of_a_boulder_not_loaded_yet(db, unloaded_boulder):
+    refresh_bayesian_ratings(db, data_version="")
+    db.commit()
+
+    stats = get_scope_stats(db, "crag", "le-nouveau")
+
+    assert stats["number_of_boulders"] == 0
+    assert [
+        (boulder["id"], boulder["ascents"])
+        for boulder in stats["best_rated_boulders"]
+    ] == [(unloaded_boulder.id, 0)]
+
+
+def test_range_stats_follow_the_daily_rollup(db, data):
+    stats = get_scope_stats(
+        db, "crag", "la-chambre", date_from=date(2024, 7, 1)
+    )
+    assert stats["ascents"] == 0
+
+    update_ascent_daily_rollup(db, data_version=None)
+    db.commit()
+    stats = get_scope_stats(
+        db, "crag", "la-chambre", date_from=date(2024, 7, 1)
+    )
+
+    assert stats["ascents"] == 1
@@ -0,0 +1,64 @@
+from datetime import date
+
+from crud.scope_stats import get_scope_stats
+from crud.seasonality import (
+    get_season_curves,
+    rebuild_season_histograms,
+    update_season_histograms,
+)
+
+
+def curves(db, scope, scope_ids):
+    months, weekdays = get_season_curves(db, scope, scope_ids)
+    return months.tolist(), weekdays.tolist()
+
+
+def test_ascents_map_to_their_month_and_weekday(db, data):
+    b1, b2, b3, b4, b5 = data.boulders
+    rebuild_season_histograms(db)
+
+    # 2023-12-31 is a Sunday, 2024-03-06 a Wednesday
+    assert curves(db, "boulder", [b3.id]) == (
+        [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+        [0, 0, 1, 0, 0, 0, 1],
+    )
+    # Weekdays from Monday: 2024-01-01 is a Monday
+    assert curves(db, "global", [0]) == (
+        [2, 0, 2, 0, 0, 0, 2, 0, 0, 0, 0, 1],
+        [1, 1, 1, 1, 0, 1, 2],
+    )
+    assert curves(db, "area", [data.annot.id]) == (
+        [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+        [0, 0, 0, 1, 0, 0, 0],
+    )
+
+
+def test_new_ascents_are_folded_in(db, data, add_ascent):
+    b1, b2, b3, b4, b5 = data.boulders
+    update_season_histograms(db, data_version=None)
+    # A Friday of February
+    add_ascent(b1, data.users[0], date(2024, 2, 2))
+    update_season_histograms(db, data_version=None)
+    incremental = curves(db, "crag", [data.cuvier.id])
+
+    assert incremental == (
+        [2, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+        [1, 1, 0, 0, 1, 1, 1],
+    )
+    rebuild_season_histograms(db)
+    assert curves(db, "crag", [data.cuvier.id]) == incremental
+
+
+def test_scope_stats_follow_the_season_histograms(db, data):
+    before = get_scope_stats(db, "crag", "la-chambre")
+    assert before["ascents_per_month"][6]["percentage"] == 0
+
+    update_season_histograms(db, data_version=None)
+    db.commit()
+    after = get_scope_stats(db, "crag", "la-chambre")
+
+    assert after["ascents_per_month"][6] == {
+        "month": "July",
+        "percentage": 100.0,
+    }
+    assert after["ascents_per_weekday"][3]["percentage"] == 100.0
@@ -0,0 +1,23 @@
+from datetime import date
+
+from crud.snapshot import get_stats_snapshot
+from models.stats_snapshot import StatsSnapshot
+
+
+def test_ascents_per_year_reach_the_current_year(db):
+    db.add(
+        StatsSnapshot(
+            key="ascents_per_year",
+            payload=[{"year": "2023", "ascents": 4}],
+            data_version="",
+        )
+    )
+    db.commit()
+
+    payload = get_stats_snapshot(db, "ascents_per_year")
+
+    assert payload[0] == {"year": "2023", "ascents": 4}
+    assert [entry["year"] for entry in payload] == [
+        str(year) for year in range(2023, date.today().year + 1)
+    ]
+    assert all(entry["ascents"] == 0 for entry in payload[1:])